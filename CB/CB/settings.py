@@ -40,10 +40,16 @@ INSTALLED_APPS = [
     'accounts',
     'community',
     'messenger',
+    'ops',
 ]
 
 MIDDLEWARE = [
+    'ops.metrics.MetricsMiddleware',  # /metrics 용 요청 시간/진행 중 요청 수 (가장 바깥에서 측정)
+    'ops.profiler.ProfilerMiddleware',  # X-Profile 헤더/표본/느린 요청 프로파일 (세션·인증·템플릿 시간 포함)
+    'ops.ratelimit.AdmissionMiddleware',  # 쓰기 요청 동시 처리 수 제한 (세션/DB 를 건드리기 전에 돌려보냄)
+    'ops.compression.CompressionMiddleware',  # HTML/JSON gzip (본문을 만지는 다른 미들웨어보다 바깥에)
     'django.middleware.security.SecurityMiddleware',
+    'ops.querybudget.QueryBudgetMiddleware',  # 요청별 쿼리 수/시간 측정 (세션/인증 쿼리도 포함되도록 앞쪽에)
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -58,8 +64,11 @@ TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [BASE_DIR / 'templates'],
-        'APP_DIRS': True,
         'OPTIONS': {
+            # 템플릿을 읽을 때 들여쓰기/빈 줄을 줄이고(ops/minify.py) 컴파일 결과는 캐시 → 요청마다 드는 비용 없음
+            'loaders': [('django.template.loaders.cached.Loader', [
+                'ops.minify.FilesystemLoader', 'ops.minify.AppDirectoriesLoader',
+            ])],
             'context_processors': [
                 'django.template.context_processors.debug',
                 'django.template.context_processors.request',
@@ -77,35 +86,44 @@ WSGI_APPLICATION = 'CB.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
 
+# DB 연결 재사용: 요청마다 새로 연결하지 않고 워커 스레드마다 연결을 유지 (ops/db 참고)
+# CONN_MAX_AGE 초가 지나면 다시 연결, 마지막 사용 후 HEALTH_CHECK_INTERVAL 초가 지났으면 재사용 전에 ping
+DB_CONN_MAX_AGE = int(os.environ.get('DB_CONN_MAX_AGE', 300))
+DB_HEALTH_CHECK_INTERVAL = int(os.environ.get('DB_HEALTH_CHECK_INTERVAL', 5))
+
 if os.environ.get('DEV') == 'True':
     # [로컬 개발 환경]
-    print("📢 현재 모드: 로컬 개발 (SQLite)")
     DEBUG = True
     ALLOWED_HOSTS = ['*'] # 개발할 땐 편하게
     
     DATABASES = {
         'default': {
-            'ENGINE': 'django.db.backends.sqlite3',
+            'ENGINE': 'ops.db.sqlite3',
             'NAME': BASE_DIR / 'db.sqlite3',
+            'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+            'CONN_HEALTH_CHECKS': True,
+            'HEALTH_CHECK_INTERVAL': DB_HEALTH_CHECK_INTERVAL,
         }
     }
 else:
     # [AWS 서버 환경]
-    print("🚀 현재 모드: AWS 배포 (MySQL/RDS)")
     DEBUG = False
     # 서버 IP나 도메인을 꼭 넣어야 함 (보안 에러 방지)
     ALLOWED_HOSTS = ['127.0.0.1', 'localhost', '여기에_EC2_퍼블릭IP'] 
 
     DATABASES = {
         'default': {
-            'ENGINE': 'django.db.backends.mysql',
+            'ENGINE': 'ops.db.mysql',
             # .env에서 실제 값을 가져오도록 수정했습니다
             'NAME': os.environ.get('DB_NAME'),     
             'USER': os.environ.get('DB_USER'),
             'PASSWORD': os.environ.get('DB_PASSWORD'),
             'HOST': os.environ.get('DB_HOST'),
             'PORT': os.environ.get('DB_PORT', '3306'),
-            'OPTIONS': {'charset': 'utf8mb4'},
+            'OPTIONS': {'charset': 'utf8mb4', 'connect_timeout': 5},
+            'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+            'CONN_HEALTH_CHECKS': True,
+            'HEALTH_CHECK_INTERVAL': DB_HEALTH_CHECK_INTERVAL,
         }
     }
 ALLOWED_HOSTS = ['*']
@@ -168,6 +186,8 @@ STATICFILES_DIRS = [
 
 # 2. 배포할 때 모이는 위치 (Nginx가 바라볼 곳)
 STATIC_ROOT = BASE_DIR / 'staticfiles'
+# nginx 가 없으면 Django 가 STATIC_ROOT 를 직접 보냄 (nginx 에 STATIC_ROOT/nginx-static.conf 를 include 했으면 False)
+STATIC_SERVE = os.environ.get('STATIC_SERVE', str(not DEBUG)) == 'True'
 
 
 # 3. 미디어 파일 (유저 업로드) 설정
@@ -175,4 +195,190 @@ STATIC_ROOT = BASE_DIR / 'staticfiles'
 MEDIA_URL = '/media/'
 
 # ROOT는 실제 파일이 저장되는 서버 경로
-MEDIA_ROOT = BASE_DIR / 'media'
\ No newline at end of file
+MEDIA_ROOT = BASE_DIR / 'media'
+
+# 3-1. 첨부파일 저장소
+# 첨부파일은 내용 해시(SHA-256)로 한 번만 저장하고, 읽을 때는 인스턴스 로컬 디스크 캐시를 먼저 봄
+# (MEDIA_ROOT 는 운영 환경에서 EFS를 bind mount 한 경로)
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        # 해시 붙은 이름 + manifest + .gz + nginx include (ops/staticstorage.py)
+        'BACKEND': 'ops.staticstorage.CompressedManifestStorage',
+    },
+    'attachments': {
+        'BACKEND': 'community.storage.ContentAddressedStorage',
+        'OPTIONS': {
+            'location': MEDIA_ROOT / 'cas',
+            'cache_location': os.environ.get('ATTACHMENT_CACHE_DIR', BASE_DIR / 'attachment_cache'),
+            'cache_max_bytes': int(os.environ.get('ATTACHMENT_CACHE_MAX_BYTES', 1024 ** 3)),  # 기본 1GB
+        },
+    },
+    # 첨부 이미지 축소본. 공개 경로(thumbs/)가 아니라 post_download?size= 로 권한 확인 뒤에만 내려줌
+    'attachment_previews': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+        'OPTIONS': {'location': MEDIA_ROOT / 'previews'},
+    },
+}
+
+# 3-2. 오브젝트 스토리지 (S3 호환) 사용 시
+# MEDIA_STORAGE=s3 로 켜면 업로드 파일(기본 저장소 + 첨부파일)을 버킷에 저장하고,
+# 다운로드는 서명 URL(presigned URL)로 스토리지에서 바로 내려받음
+# 로컬 확인용: python manage.py objectstore_standin --root /tmp/objectstore
+if os.environ.get('MEDIA_STORAGE') == 's3':
+    OBJECTSTORE_OPTIONS = {
+        'endpoint_url': os.environ.get('OBJECTSTORE_ENDPOINT', 'http://127.0.0.1:9000'),
+        'bucket': os.environ.get('OBJECTSTORE_BUCKET', 'cb-media'),
+        'access_key': os.environ.get('OBJECTSTORE_ACCESS_KEY', 'standin'),
+        'secret_key': os.environ.get('OBJECTSTORE_SECRET_KEY', 'standin-secret'),
+        'region': os.environ.get('OBJECTSTORE_REGION', 'ap-northeast-2'),
+        'max_connections': int(os.environ.get('OBJECTSTORE_MAX_CONNECTIONS', 10)),
+        'multipart_threshold': int(os.environ.get('OBJECTSTORE_MULTIPART_THRESHOLD', 8 * 1024 * 1024)),
+        'part_size': int(os.environ.get('OBJECTSTORE_PART_SIZE', 8 * 1024 * 1024)),
+        'upload_workers': int(os.environ.get('OBJECTSTORE_UPLOAD_WORKERS', 4)),
+    }
+    STORAGES['default'] = {'BACKEND': 'ops.objectstore.ObjectStorage', 'OPTIONS': OBJECTSTORE_OPTIONS}
+    STORAGES['attachments'] = {
+        'BACKEND': 'ops.objectstore.ObjectStorage',
+        'OPTIONS': {**OBJECTSTORE_OPTIONS, 'location': 'attachments'},
+    }
+    STORAGES['attachment_previews'] = {
+        'BACKEND': 'ops.objectstore.ObjectStorage',
+        'OPTIONS': {**OBJECTSTORE_OPTIONS, 'location': 'previews'},
+    }
+
+# 3-3. 쿼리 예산 (ops/querybudget.py)
+# 개발: 모든 요청을 측정하고 @query_budget 을 넘으면 예외 / 운영: 일부 요청만 측정하고 넘으면 로그
+QUERY_BUDGET_MODE = os.environ.get('QUERY_BUDGET_MODE', 'raise' if DEBUG else 'log')  # off / log / raise
+QUERY_BUDGET_SAMPLE_RATE = float(os.environ.get('QUERY_BUDGET_SAMPLE_RATE', 1.0 if DEBUG else 0.05))
+QUERY_BUDGET_REPEAT_THRESHOLD = 5     # 같은 모양의 쿼리가 이보다 많이 나오면 N+1 의심
+QUERY_BUDGET_DEFAULT_QUERIES = None   # @query_budget 이 없는 뷰의 기본 예산 (None: 검사 안 함)
+
+# 3-4. 지표 (/metrics, Prometheus 형식)
+# 워커 프로세스마다 이 폴더에 mmap 파일을 두고, /metrics 요청 때 모두 합쳐서 인스턴스 전체 값을 보여줌
+METRICS_DIR = os.environ.get('METRICS_DIR', '/tmp/cb-metrics')
+# 'Authorization: Bearer <토큰>' 헤더가 있어야 /metrics 를 볼 수 있음. 비어 있으면 DEBUG 일 때만 열림 (운영에서는 403)
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+
+# 3-5. 요청 프로파일러 (ops/profiler.py, 관리자 센터 > 성능 프로파일)
+# 기본은 꺼져 있고 관리자 화면에서 받은 토큰을 'X-Profile' 헤더로 보낸 요청만 프로파일
+PROFILER_DIR = os.environ.get('PROFILER_DIR', '/tmp/cb-profiles')
+PROFILER_KEEP = int(os.environ.get('PROFILER_KEEP', 100))                  # 보관할 프로파일 수 (넘으면 오래된 것부터 삭제)
+PROFILER_SAMPLE_RATE = float(os.environ.get('PROFILER_SAMPLE_RATE', 0))    # 무작위로 프로파일할 요청 비율 (0~1)
+PROFILER_SLOW_MS = int(os.environ.get('PROFILER_SLOW_MS', 0))              # 이보다 오래 걸린 요청은 자동 저장 (0: 끔)
+PROFILER_INTERVAL_MS = float(os.environ.get('PROFILER_INTERVAL_MS', 5))    # 호출 스택 표본 간격
+PROFILER_TOKEN_MAX_AGE = 3600                                               # 헤더 토큰 유효 시간(초)
+
+# 3-6. 알림 보관 기간 (ops/retention.py, python manage.py purge_notifications → 하루 한 번 타이머로 실행)
+# 읽은 알림은 READ 일이 지나면 삭제, 안 읽은 알림은 UNREAD 일이 지나면 사람별 요약 알림 하나로 합침
+NOTIFICATION_READ_RETENTION_DAYS = int(os.environ.get('NOTIFICATION_READ_RETENTION_DAYS', 30))
+NOTIFICATION_UNREAD_RETENTION_DAYS = int(os.environ.get('NOTIFICATION_UNREAD_RETENTION_DAYS', 90))
+NOTIFICATION_PURGE_BATCH_SIZE = int(os.environ.get('NOTIFICATION_PURGE_BATCH_SIZE', 500))   # 한 트랜잭션에서 다룰 행 수 (id 구간)
+NOTIFICATION_PURGE_SLEEP = float(os.environ.get('NOTIFICATION_PURGE_SLEEP', 0.2))           # 구간 사이 쉬는 시간(초)
+# 같은 글의 멘션처럼 종류/대상이 같은 알림은 이 시간(초) 구간 안에서 한 행으로 묶음 (Notification.coalesce)
+NOTIFICATION_COALESCE_WINDOW = int(os.environ.get('NOTIFICATION_COALESCE_WINDOW', 600))
+
+# 3-7. 게시글 보관 (ops/archive.py, python manage.py archive_posts)
+# 삭제된 글/오래된 글을 댓글과 함께 보관 테이블로 옮김. 보관된 글도 예전 링크로는 계속 볼 수 있음
+POST_ARCHIVE_AFTER_DAYS = int(os.environ.get('POST_ARCHIVE_AFTER_DAYS', 730))
+POST_ARCHIVE_DELETED_AFTER_DAYS = int(os.environ.get('POST_ARCHIVE_DELETED_AFTER_DAYS', 7))
+POST_ARCHIVE_BATCH_SIZE = int(os.environ.get('POST_ARCHIVE_BATCH_SIZE', 100))   # 한 트랜잭션에서 옮길 글 수
+POST_ARCHIVE_SLEEP = float(os.environ.get('POST_ARCHIVE_SLEEP', 0.2))           # 구간 사이 쉬는 시간(초)
+
+# 3-8. 세션/메시지 (ops/sessions.py)
+# 세션은 캐시에서 먼저 읽고, 내용이 그대로면 저장하지 않음. 로그인 유지 시간은 요청마다 연장하되 DB 에는 가끔만 씀
+SESSION_ENGINE = 'ops.sessions'
+SESSION_SAVE_EVERY_REQUEST = True
+SESSION_REFRESH_INTERVAL = int(os.environ.get('SESSION_REFRESH_INTERVAL', 15 * 60))   # 만료 시각을 DB 에 다시 쓰는 최소 간격(초)
+SESSION_CACHE_TIMEOUT = int(os.environ.get('SESSION_CACHE_TIMEOUT', 60))             # 워커별 캐시에 세션을 둘 시간(초)
+SESSION_PURGE_BATCH_SIZE = int(os.environ.get('SESSION_PURGE_BATCH_SIZE', 1000))
+SESSION_PURGE_SLEEP = float(os.environ.get('SESSION_PURGE_SLEEP', 0.1))
+# 안내 메시지(messages.success 등)는 쿠키에 담음 → 메시지 때문에 세션을 저장하지 않음
+MESSAGE_STORAGE = 'django.contrib.messages.storage.cookie.CookieStorage'
+
+# 3-9. 요청 제한 / 동시 처리 제한 (ops/ratelimit.py)
+# 뷰별 제한은 @rate_limit('10/m') 로 뷰에 직접 적음. 넘으면 429 + Retry-After
+RATELIMIT_ENABLED = os.environ.get('RATELIMIT_ENABLED', 'True') == 'True'
+RATELIMIT_CACHE_ALIAS = 'default'                                          # 합계를 셀 캐시 (공유 캐시여야 서버 전체 합계, 3-13)
+RATELIMIT_PROXY_COUNT = int(os.environ.get('RATELIMIT_PROXY_COUNT', 0))    # 앞단 프록시 수 (ALB 뒤면 1)
+# 인스턴스 전체에서 동시에 처리할 쓰기(POST 등) 요청 수. 자리가 없으면 QUEUE_TIMEOUT 초 기다린 뒤 503 (0: 끔)
+ADMISSION_DIR = os.environ.get('ADMISSION_DIR', '/tmp/cb-admission')
+ADMISSION_MAX_WRITES = int(os.environ.get('ADMISSION_MAX_WRITES', 4))
+ADMISSION_QUEUE_TIMEOUT = float(os.environ.get('ADMISSION_QUEUE_TIMEOUT', 0.5))
+
+# 3-10. 백그라운드 작업 큐 (ops/taskqueue.py, python manage.py run_worker)
+# 알림 퍼뜨리기/썸네일/정리 작업은 요청에서 작업 행만 넣고 워커가 실행. 개발 환경은 워커 없이 그 자리에서 바로 실행
+TASK_ALWAYS_EAGER = os.environ.get('TASK_ALWAYS_EAGER', str(DEBUG)) == 'True'
+TASK_POLL_INTERVAL = float(os.environ.get('TASK_POLL_INTERVAL', 1.0))     # 할 일이 없을 때 다시 확인할 간격(초)
+TASK_WORKER_THREADS = int(os.environ.get('TASK_WORKER_THREADS', 4))
+TASK_LEASE_SECONDS = 3600       # 이보다 오래 running 이면 워커가 죽은 것으로 보고 다시 대기열로
+TASK_MAX_BACKOFF = 3600         # 재시도 대기 시간 상한(초)
+TASK_KEEP_DONE_HOURS = 24       # 완료된 작업 행 보관 시간
+TASK_KEEP_FAILED_DAYS = 14      # 실패한 작업 행 보관 기간 (원인 확인용)
+
+# 3-11. 응답 크기 줄이기
+# 템플릿 공백 줄이기 (ops/minify.py, TEMPLATES 의 loaders). 원본 그대로 보고 싶으면 False
+TEMPLATE_MINIFY = os.environ.get('TEMPLATE_MINIFY', 'True') == 'True'
+# 응답 압축 (ops/compression.py)
+COMPRESS_MIN_SIZE = 1024        # 이보다 작은 응답은 압축하지 않음 (바이트)
+COMPRESS_RANDOM_BYTES = 100     # gzip 헤더에 넣는 무작위 값 최대 길이 (BREACH 완화, 0: 끔)
+# 압축할 Content-Type 과 압축 수준(1~9). 목록에 없는 종류(이미지, zip, pdf 등)는 그대로 보냄
+COMPRESS_LEVELS = {
+    'text/html': 6,
+    'application/json': 4,       # 알림 확인/분할 업로드처럼 자주 오가는 작은 응답은 CPU 를 덜 쓰게
+    'text/plain': 6,
+    'text/csv': 6,
+    'text/css': 9,
+    'text/javascript': 9,
+    'application/javascript': 9,
+    'image/svg+xml': 9,
+}
+
+# 3-12. 읽음 표시 / 새 글 배지 (community.models.ReadMarker)
+READ_MARKER_NEW_DAYS = int(os.environ.get('READ_MARKER_NEW_DAYS', 14))   # 이보다 오래된 글은 "새 글" 로 표시하지 않음
+READ_MARKER_MAX_IDS = 200            # 게시판마다 따로 기억할 읽은 글 수 (넘으면 오래된 것부터 high_water 로 접음)
+# 읽으면 그 워커의 캐시만 지워지므로 다른 워커는 이 시간 동안 예전 배지를 보여줄 수 있음 (SESSION_CACHE_TIMEOUT 과 같게)
+# 메모리 캐시면 LOCAL_CACHE_MAX_TIMEOUT 초로 더 줄어듦 (3-13)
+READ_MARKER_CACHE_TIMEOUT = int(os.environ.get('READ_MARKER_CACHE_TIMEOUT', 60))
+
+# 3-13. 캐시 (ops/caches.py)
+# 서버가 여러 대/워커가 여러 개면 CACHE_URL 로 공유 캐시를 지정해야 권한 변경 등의 캐시 삭제가 모든 워커에 전달됨
+#   redis://10.0.0.5:6379/1  또는  memcached://10.0.0.5:11211
+# 비어 있으면 워커마다 따로인 메모리 캐시 → 다른 워커의 캐시를 지울 수 없으므로 보관 시간을 LOCAL_CACHE_MAX_TIMEOUT 초로 줄임
+CACHE_URL = os.environ.get('CACHE_URL', '')
+if CACHE_URL.startswith(('redis://', 'rediss://')):
+    CACHES = {'default': {'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': CACHE_URL}}
+elif CACHE_URL.startswith('memcached://'):
+    CACHES = {'default': {'BACKEND': 'django.core.cache.backends.memcached.PyMemcacheCache',
+                          'LOCATION': CACHE_URL.removeprefix('memcached://')}}
+else:
+    CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+LOCAL_CACHE_MAX_TIMEOUT = int(os.environ.get('LOCAL_CACHE_MAX_TIMEOUT', 10))
+
+# 4. 썸네일 (프로필 사진 축소본, MEDIA_ROOT/thumbs/ 아래에 저장. 첨부 이미지 축소본은 STORAGES['attachment_previews'])
+THUMBNAIL_FORMAT = 'WEBP'
+THUMBNAIL_QUALITY = 80
+THUMBNAIL_PRESETS = [40, 70]          # 업로드 직후 미리 만들어 둘 크기(px)
+THUMBNAIL_MAX_PIXELS = 40_000_000     # 이보다 큰 이미지는 디코딩하지 않음 (압축 폭탄 방지)
+
+# 5. 첨부파일 다운로드
+# nginx 앞단이 있으면 internal location 경로를 넣어주세요. (예: '/protected-media/')
+#   location /protected-media/ { internal; alias /home/ubuntu/django_work/CB/media/; }
+# 비어 있으면 Django가 직접 파일을 보냅니다. (Range/ETag 지원)
+ATTACHMENT_X_ACCEL_PREFIX = os.environ.get('ATTACHMENT_X_ACCEL_PREFIX', '')
+ATTACHMENT_SIGNED_URL_EXPIRE = 300  # 오브젝트 스토리지 사용 시 다운로드 서명 URL 유효 시간(초)
+ATTACHMENT_PREVIEW_SIZES = [640]    # post_download?size= 로 받을 수 있는 첨부 이미지 축소본 크기(px). 업로드 직후 미리 만듦
+
+# 6. 대용량 첨부파일 분할 업로드 (조각을 로컬 임시 파일에 이어 붙인 뒤 finalize 때 저장소로 옮김)
+CHUNKED_UPLOAD_DIR = os.environ.get('CHUNKED_UPLOAD_DIR', BASE_DIR / 'upload_tmp')
+CHUNKED_UPLOAD_CHUNK_SIZE = 5 * 1024 * 1024      # 조각 하나의 최대 크기 (5MB)
+CHUNKED_UPLOAD_MAX_SIZE = 2 * 1024 ** 3          # 파일 하나의 최대 크기 (2GB)
+CHUNKED_UPLOAD_THRESHOLD = 8 * 1024 * 1024       # 이보다 큰 파일은 화면에서 분할 업로드 사용
+# 이 시간 동안 손대지 않은 업로드는 임시 파일/저장소 참조와 함께 지움 (ops/uploads.py, python manage.py purge_uploads)
+CHUNKED_UPLOAD_EXPIRE_HOURS = int(os.environ.get('CHUNKED_UPLOAD_EXPIRE_HOURS', 24))
+
+# 7. 사원 일괄 등록 (accounts/importers.py)
+# 관리자 센터에서 올린 파일의 비밀번호 해시 스레드 수 (요청 하나가 쓰는 CPU 상한). 관리 명령은 --workers 프로세스
+USER_IMPORT_WEB_THREADS = int(os.environ.get('USER_IMPORT_WEB_THREADS', 2))
@@ -14,11 +14,14 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+import re
+
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, include, re_path
 from django.conf import settings
 from django.conf.urls.static import static
 from community import views as community_views
+from ops import views as ops_views
 
 urlpatterns = [
     path('', community_views.board_list, name='home'),
@@ -26,7 +29,13 @@ urlpatterns = [
     path('accounts/', include('accounts.urls')), # 나중에 로그인용
     path('community/', include('community.urls')), # 방금 만든 커뮤니티 URL 연결
     path('messenger/', include('messenger.urls')),
+    path('healthz/', include('ops.urls')), # 로드밸런서 헬스체크 (live / ready)
+    path('metrics', ops_views.metrics_view, name='metrics'), # Prometheus 수집
 ]
 
 if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
\ No newline at end of file
+    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+
+if settings.STATIC_SERVE:
+    # nginx 없이 gunicorn 이 바로 받는 경우 정적 파일도 직접 보냄 (해시 이름은 immutable 캐시, .gz 우선)
+    urlpatterns += [re_path(r'^%s(?P<path>.+)$' % re.escape(settings.STATIC_URL.lstrip('/')), ops_views.static_file)]
\ No newline at end of file
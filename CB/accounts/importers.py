@@ -0,0 +1,263 @@
+"""
+사원 일괄 등록 (CSV / XLSX)
+
+- 파일을 한 줄씩 읽어서 batch_size 단위로 검증 → 비밀번호 해시 → bulk_create
+- 부서/직급은 이름 → id 딕셔너리로 한 번만 읽어두고 재사용
+- 비밀번호 해시(PBKDF2)는 CPU를 많이 쓰므로 풀에 나눠서 계산. 관리 명령은 프로세스 풀(processes=True),
+  웹 요청(관리자 센터)은 gunicorn 워커를 fork 하지 않도록 스레드 풀 (hashlib 의 PBKDF2 는 GIL 을 풀고 계산하므로
+  스레드로도 코어를 나눠 씀). 스레드 수는 USER_IMPORT_WEB_THREADS 로 제한
+- 배치마다 따로 커밋하므로 파일 중간이 깨져도 앞 배치는 남음 → 예외로 끝내지 않고 report.error 에 적고
+  그때까지 만든 행을 그대로 돌려줌. INSERT 가 충돌하면(검증 뒤 다른 요청이 같은 아이디를 만든 경우 등)
+  그 배치만 한 명씩 다시 저장해서 실패한 행에 오류를 적음
+"""
+import csv
+import io
+import os
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+from django.contrib.auth import password_validation
+from django.contrib.auth.hashers import make_password
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+
+from .models import User, Department, Rank
+
+try:
+    from openpyxl.utils.exceptions import InvalidFileException
+except ImportError:  # openpyxl 이 없으면 XLSX 는 _iter_xlsx 에서 ValueError
+    InvalidFileException = ValueError
+
+# 파일을 읽다가 날 수 있는 오류 (헤더 누락 ValueError, 인코딩, 손상된 XLSX/ZIP 등)
+FILE_ERRORS = (ValueError, csv.Error, zipfile.BadZipFile, InvalidFileException, KeyError)
+
+# 파일에서 읽는 컬럼 (첫 줄은 헤더)
+COLUMNS = ['username', 'nickname', 'email', 'department', 'rank', 'password']
+REQUIRED_COLUMNS = ['username', 'password']
+
+# 이 개수보다 적으면 프로세스 풀을 띄우는 비용이 더 크므로 그냥 현재 프로세스에서 해시
+POOL_THRESHOLD = 20
+
+
+@dataclass
+class RowResult:
+    line: int
+    username: str
+    errors: list = field(default_factory=list)
+
+    @property
+    def ok(self):
+        return not self.errors
+
+
+@dataclass
+class ImportReport:
+    rows: list = field(default_factory=list)
+    created: int = 0
+    error: str = ''  # 파일을 끝까지 읽지 못했을 때 (그 전까지 만든 created 명은 저장된 상태)
+
+    @property
+    def failed(self):
+        return [r for r in self.rows if not r.ok]
+
+    def write_csv(self, stream):
+        writer = csv.writer(stream)
+        writer.writerow(['line', 'username', 'status', 'errors'])
+        for r in self.rows:
+            writer.writerow([r.line, r.username, 'ok' if r.ok else 'error', ' / '.join(r.errors)])
+
+
+def iter_rows(fileobj, filename):
+    """(줄 번호, {컬럼: 값}) 를 하나씩 돌려준다. 파일 전체를 메모리에 올리지 않음."""
+    if filename.lower().endswith('.xlsx'):
+        yield from _iter_xlsx(fileobj)
+    else:
+        yield from _iter_csv(fileobj)
+
+
+def _iter_csv(fileobj):
+    if isinstance(fileobj, io.TextIOBase):
+        text = fileobj
+    else:
+        text = io.TextIOWrapper(fileobj, encoding='utf-8-sig', newline='')
+    reader = csv.DictReader(text)
+    _check_header(reader.fieldnames or [])
+    for line, row in enumerate(reader, start=2):
+        yield line, {k.strip(): (v or '').strip() for k, v in row.items() if k}
+
+
+def _iter_xlsx(fileobj):
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise ValueError("XLSX 파일을 읽으려면 openpyxl 패키지가 필요합니다. (pip install openpyxl)")
+
+    workbook = load_workbook(fileobj, read_only=True, data_only=True)
+    try:
+        sheet = workbook.worksheets[0]
+        rows = sheet.iter_rows(values_only=True)
+        header = [str(h).strip() if h is not None else '' for h in next(rows, [])]
+        _check_header(header)
+        for line, values in enumerate(rows, start=2):
+            if not any(values):
+                continue  # 빈 줄은 건너뜀
+            yield line, {
+                h: ('' if v is None else str(v).strip())
+                for h, v in zip(header, values) if h
+            }
+    finally:
+        workbook.close()
+
+
+def _check_header(header):
+    missing = [c for c in REQUIRED_COLUMNS if c not in header]
+    if missing:
+        raise ValueError(f"필수 컬럼이 없습니다: {', '.join(missing)}")
+
+
+class EmployeeImporter:
+    def __init__(self, batch_size=500, workers=None, dry_run=False, processes=False):
+        self.batch_size = batch_size
+        self.workers = workers or os.cpu_count() or 1
+        self.dry_run = dry_run
+        self.processes = processes  # 프로세스 풀은 웹 요청 밖(관리 명령)에서만
+
+        # 부서/직급 조회용 캐시 (행마다 쿼리하지 않도록 시작할 때 한 번만 읽음)
+        self.departments = dict(Department.objects.values_list('name', 'id'))
+        self.ranks = dict(Rank.objects.values_list('name', 'id'))
+        self.seen_usernames = set()
+        self._pool = None
+
+    def run(self, rows):
+        report = ImportReport()
+        try:
+            batch = []
+            for line, data in self._read(rows, report):
+                batch.append((line, data))
+                if len(batch) >= self.batch_size:
+                    report.created += self._process_batch(batch, report)
+                    batch = []
+            if batch:
+                report.created += self._process_batch(batch, report)
+        finally:
+            if self._pool is not None:
+                self._pool.shutdown()
+        return report
+
+    @staticmethod
+    def _read(rows, report):
+        """파일이 깨진 곳에서 멈추고 report.error 에 적음 (이미 읽은 행은 그대로 처리)"""
+        line = 1
+        try:
+            for line, data in rows:
+                yield line, data
+        except FILE_ERRORS as e:
+            if isinstance(e, (zipfile.BadZipFile, InvalidFileException, KeyError)):
+                message = "XLSX 파일이 아니거나 손상된 파일입니다."
+            elif isinstance(e, UnicodeDecodeError):
+                message = "UTF-8 CSV 파일이 아닙니다."
+            else:
+                message = str(e)
+            report.error = message if line == 1 else f"{line}행 다음을 읽지 못했습니다: {message}"
+
+    def _process_batch(self, batch, report):
+        # 이미 DB에 있는 아이디는 배치마다 쿼리 한 번으로 확인
+        usernames = [data.get('username', '') for _, data in batch]
+        existing = set(User.objects.filter(username__in=usernames).values_list('username', flat=True))
+
+        valid = []
+        for line, data in batch:
+            result = RowResult(line=line, username=data.get('username', ''))
+            user = self._build_user(data, result, existing)
+            report.rows.append(result)
+            if result.ok:
+                valid.append((result, user, data['password']))
+
+        if not valid or self.dry_run:
+            return 0
+
+        hashes = self._hash_passwords([pw for _, _, pw in valid])
+        for (_, user, _), hashed in zip(valid, hashes):
+            user.password = hashed
+
+        try:
+            with transaction.atomic():
+                User.objects.bulk_create([user for _, user, _ in valid], batch_size=self.batch_size)
+            return len(valid)
+        except IntegrityError:
+            return self._create_one_by_one(valid)
+
+    @staticmethod
+    def _create_one_by_one(valid):
+        created = 0
+        for result, user, _ in valid:
+            user.pk = None
+            try:
+                with transaction.atomic():
+                    User.objects.bulk_create([user])
+                created += 1
+            except IntegrityError as e:
+                result.errors.append(f"저장하지 못했습니다: {e}")
+        return created
+
+    def _build_user(self, data, result, existing):
+        username = data.get('username', '')
+        if not username:
+            result.errors.append("아이디가 비어 있습니다.")
+            return None
+
+        try:
+            User.username_validator(username)
+        except ValidationError as e:
+            result.errors.extend(e.messages)
+
+        if username in existing:
+            result.errors.append("이미 존재하는 아이디입니다.")
+        elif username in self.seen_usernames:
+            result.errors.append("파일 안에서 중복된 아이디입니다.")
+        self.seen_usernames.add(username)
+
+        user = User(
+            username=username,
+            nickname=data.get('nickname', '')[:20],
+            email=data.get('email', ''),
+        )
+
+        dept_name = data.get('department', '')
+        if dept_name:
+            user.department_id = self.departments.get(dept_name)
+            if user.department_id is None:
+                result.errors.append(f"존재하지 않는 부서입니다: {dept_name}")
+
+        rank_name = data.get('rank', '')
+        if rank_name:
+            user.rank_id = self.ranks.get(rank_name)
+            if user.rank_id is None:
+                result.errors.append(f"존재하지 않는 직급입니다: {rank_name}")
+
+        password = data.get('password', '')
+        if not password:
+            result.errors.append("비밀번호가 비어 있습니다.")
+        else:
+            try:
+                password_validation.validate_password(password, user)
+            except ValidationError as e:
+                result.errors.extend(e.messages)
+
+        return user
+
+    def _hash_passwords(self, passwords):
+        if self.workers <= 1 or len(passwords) < POOL_THRESHOLD:
+            return [make_password(pw) for pw in passwords]
+
+        if self._pool is None:
+            executor = ProcessPoolExecutor if self.processes else ThreadPoolExecutor
+            self._pool = executor(max_workers=self.workers)
+        chunksize = max(1, len(passwords) // (self.workers * 4))
+        return list(self._pool.map(make_password, passwords, chunksize=chunksize))
+
+
+def import_employees(fileobj, filename, **options):
+    importer = EmployeeImporter(**options)
+    return importer.run(iter_rows(fileobj, filename))
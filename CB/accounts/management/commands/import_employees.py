@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.importers import import_employees
+
+
+class Command(BaseCommand):
+    help = "CSV/XLSX 파일로 사원 계정을 일괄 생성합니다. (컬럼: username, nickname, email, department, rank, password)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="CSV 또는 XLSX 파일 경로")
+        parser.add_argument('--batch-size', type=int, default=500, help="한 번에 INSERT 할 행 수")
+        parser.add_argument('--workers', type=int, default=None, help="비밀번호 해시 프로세스 수 (기본: CPU 코어 수)")
+        parser.add_argument('--dry-run', action='store_true', help="검증만 하고 저장하지 않음")
+        parser.add_argument('--report', help="행별 결과를 CSV로 저장할 경로 (기본: 오류만 화면 출력)")
+
+    def handle(self, *args, **options):
+        path = options['path']
+        try:
+            with open(path, 'rb') as f:
+                report = import_employees(
+                    f, path,
+                    batch_size=options['batch_size'],
+                    workers=options['workers'],
+                    dry_run=options['dry_run'],
+                    processes=True,
+                )
+        except OSError as e:
+            raise CommandError(str(e))
+
+        if options['report']:
+            with open(options['report'], 'w', encoding='utf-8-sig', newline='') as out:
+                report.write_csv(out)
+        else:
+            for row in report.failed:
+                self.stderr.write(f"{row.line}행 [{row.username}] " + ' / '.join(row.errors))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"총 {len(report.rows)}행 / 생성 {report.created}명 / 오류 {len(report.failed)}행"
+            + (" (dry-run)" if options['dry_run'] else "")
+        ))
+        if report.error:
+            raise CommandError(f"{report.error} (위 {report.created}명은 저장됨)")
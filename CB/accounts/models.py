@@ -1,4 +1,7 @@
+from django.core.exceptions import ValidationError
 from django.db import models
+from django.db.models import F, Value
+from django.db.models.functions import Concat, Substr
 from django.contrib.auth.models import AbstractUser
 
 # 1. 직급을 관리하는 별도 테이블 (관리자가 추가 가능)
@@ -15,10 +18,70 @@ class Rank(models.Model):
 class Department(models.Model):
     name = models.CharField(max_length=50, unique=True) # 예: 개발팀, 인사팀
     description = models.TextField(blank=True)          # 예: IT 서비스 개발 전담
-    
+
+    # 상위 부서 (예: 개발본부 > 개발팀). 비어 있으면 최상위 부서
+    parent = models.ForeignKey(
+        'self',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='children',
+        verbose_name="상위 부서",
+    )
+    # 경로 문자열 (예: "000001/000004/") - "이 부서와 그 아래 전부"를 LIKE 'path%' 한 번으로 조회
+    path = models.CharField(max_length=255, db_index=True, editable=False, default='')
+    depth = models.PositiveSmallIntegerField(default=0, editable=False)
+
+    class Meta:
+        ordering = ['path'] # 트리 순서 (상위 부서 바로 아래에 하위 부서)
+
     def __str__(self):
         return self.name
 
+    def clean(self):
+        if self.pk and self.parent_id and self.parent.path.startswith(self.path):
+            raise ValidationError("자기 자신이나 하위 부서를 상위 부서로 지정할 수 없습니다.")
+
+    def save(self, *args, **kwargs):
+        if self.pk and self.parent_id and self.path and self.parent.path.startswith(self.path):
+            raise ValueError("자기 자신이나 하위 부서를 상위 부서로 지정할 수 없습니다.")
+
+        old_path, old_depth = self.path, self.depth
+        super().save(*args, **kwargs)  # 새 부서는 id가 있어야 경로를 만들 수 있음
+
+        parent_path = self.parent.path if self.parent_id else ''
+        new_path = f"{parent_path}{self.pk:06d}/"
+        if new_path == old_path:
+            return
+
+        new_depth = new_path.count('/') - 1
+        Department.objects.filter(pk=self.pk).update(path=new_path, depth=new_depth)
+
+        # 부서가 다른 곳으로 옮겨졌으면 하위 부서들의 경로도 한 번에 바꿔줌
+        if old_path:
+            Department.objects.filter(path__startswith=old_path).exclude(pk=self.pk).update(
+                path=Concat(Value(new_path), Substr('path', len(old_path) + 1), output_field=models.CharField()),
+                depth=F('depth') + (new_depth - old_depth),
+            )
+        self.path, self.depth = new_path, new_depth
+
+    def ancestor_paths(self):
+        # "000001/000004/" -> ["000001/", "000001/000004/"] (자기 자신 포함)
+        parts = self.path.split('/')[:-1]
+        return ['/'.join(parts[:i]) + '/' for i in range(1, len(parts) + 1)]
+
+    def ancestor_ids(self):
+        # 경로에 조상 부서 id가 그대로 들어 있으므로 추가 쿼리 없이 계산 가능
+        if not self.path:
+            return [self.pk]
+        return [int(part) for part in self.path.split('/')[:-1]]
+
+    def get_descendants(self, include_self=True):
+        depts = Department.objects.filter(path__startswith=self.path)
+        if not include_self:
+            depts = depts.exclude(pk=self.pk)
+        return depts
+
 class User(AbstractUser):
     nickname = models.CharField(max_length=20, blank=True)
     
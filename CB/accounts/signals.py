@@ -0,0 +1,14 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from .models import User
+from .tasks import make_profile_thumbnails
+
+
+@receiver(post_save, sender=User)
+def create_profile_thumbnails(sender, instance, **kwargs):
+    # 프로필 사진이 있으면 목록 화면용 축소본을 미리 만들어 둠 (첫 화면 요청이 느려지지 않도록)
+    update_fields = kwargs.get('update_fields')
+    if not instance.profile_image or (update_fields and 'profile_image' not in update_fields):
+        return
+    make_profile_thumbnails.enqueue(instance.pk)
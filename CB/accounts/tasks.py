@@ -0,0 +1,11 @@
+from ops.taskqueue import task
+from .models import User
+from .thumbnails import generate_presets
+
+
+@task(queue='media', max_attempts=3)
+def make_profile_thumbnails(user_id):
+    """프로필 사진의 목록 화면용 축소본을 미리 만들어 둠 (첫 화면 요청이 느려지지 않도록)"""
+    user = User.objects.filter(id=user_id).first()
+    if user is not None and user.profile_image:
+        generate_presets(user.profile_image)
@@ -0,0 +1,12 @@
+from django import template
+
+from accounts import thumbnails
+
+register = template.Library()
+
+
+# 사용법: {% load thumbnails %} ... <img src="{% thumbnail_url user.profile_image 40 %}">
+# 결과는 공개 URL 이므로 프로필 사진에만 씀. 첨부 이미지는 {% url 'post_download' post.id %}?size=640 (권한 확인)
+@register.simple_tag
+def thumbnail_url(field_file, size, crop=True):
+    return thumbnails.thumbnail_url(field_file, int(size), crop)
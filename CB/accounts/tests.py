@@ -1,3 +1,202 @@
-from django.test import TestCase
+import io
+import os
+import tempfile
+import time
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.core.files.storage import Storage, default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from PIL import Image
+
+from community.models import Board
+from ops import perfsuite
+from . import thumbnails
+from .importers import POOL_THRESHOLD, EmployeeImporter, import_employees
+from .models import Department
+
+
+# 요청당 쿼리 수 (ops/perfsuite.py). 관리자 화면은 사원이 열면 권한 확인 후 바로 로그인 화면으로 이동
+class AccountsQueryCountTests(perfsuite.QueryCountTestCase):
+    urlconf = 'accounts.urls'
+    expected = {
+        'login': {'admin': 2, 'restricted': 4, 'norank': 2},
+        'logout': 0,                                                    # GET 은 405
+        'profile': {'admin': 2, 'restricted': 4, 'norank': 2},
+        'user_update': {'admin': 7, 'restricted': 1, 'norank': 1},
+        'manage_home': {'admin': 2, 'restricted': 1, 'norank': 1},
+        'manage_users': {'admin': 6, 'restricted': 1, 'norank': 1},
+        'manage_users_export': 1,                                       # 본문은 스트리밍하면서 청크 단위로 조회
+        'user_create': {'admin': 4, 'restricted': 1, 'norank': 1},
+        'user_import': {'admin': 2, 'restricted': 1, 'norank': 1},
+        'manage_structure': {'admin': 4, 'restricted': 1, 'norank': 1},
+        'org_chart': {'admin': 4, 'restricted': 6, 'norank': 4},        # 부서 트리 + 구성원(prefetch, 직급 JOIN)
+    }
+    broken = {
+        'signup': "accounts/signup.html 템플릿이 없음",
+    }
+
+
+# 세션 저장 줄이기 (ops/sessions.py): 내용이 그대로면 DB 에 쓰지 않고, 안내 메시지는 쿠키로
+class SessionWriteTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user('session_user', password='x', nickname='session')
+        self.client.force_login(self.user)
+
+    def session_queries(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('profile'))
+        self.assertEqual(response.status_code, 200)
+        return [q['sql'] for q in ctx.captured_queries if 'django_session' in q['sql']]
+
+    def test_unchanged_session_is_not_written(self):
+        self.session_queries()
+        self.assertEqual(self.session_queries(), [])  # 캐시에서 읽고, 저장은 생략
+
+    @override_settings(SESSION_REFRESH_INTERVAL=0)
+    def test_expiry_is_refreshed_after_interval(self):
+        before = Session.objects.get().expire_date
+        queries = self.session_queries()
+        self.assertTrue(any(sql.startswith('UPDATE') for sql in queries), queries)
+        self.assertGreater(Session.objects.get().expire_date, before)
+
+    def test_flash_messages_use_cookie(self):
+        board = Board.objects.create(name='closed', slug='closed')
+        board.read_access_depts.add(Department.objects.create(name='closed-dept'))
+        self.session_queries()
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('post_list', args=[board.slug]))  # 목록으로 보내면서 안내 메시지
+        self.assertRedirects(response, reverse('board_list'), fetch_redirect_response=False)
+        self.assertIn('messages', response.cookies)
+        self.assertFalse([q['sql'] for q in ctx.captured_queries if 'django_session' in q['sql']])
+
+
+# 사원 일괄 등록 (accounts/importers.py): 배치마다 커밋하므로 중간에 실패해도 저장된 행을 결과에 남김
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class EmployeeImportTests(TestCase):
+    HEADER = 'username,nickname,email,department,rank,password\n'
+
+    def run_csv(self, body, **options):
+        return import_employees(io.BytesIO((self.HEADER + body).encode()), 'users.csv', workers=1, **options)
+
+    def test_invalid_rows_are_reported(self):
+        report = self.run_csv('kim,김,,,,Str0ng!pass\nlee,이,,없는부서,,Str0ng!pass\nkim,김2,,,,Str0ng!pass\n')
+        self.assertEqual(report.created, 1)
+        self.assertEqual([r.line for r in report.failed], [3, 4])
+        self.assertEqual(list(get_user_model().objects.values_list('username', flat=True)), ['kim'])
+
+    def test_broken_xlsx_is_reported(self):
+        report = import_employees(io.BytesIO(b'not a zip'), 'users.xlsx', workers=1)
+        self.assertEqual((report.created, report.rows), (0, []))
+        self.assertIn('XLSX', report.error)
+
+    def test_file_error_keeps_committed_rows(self):
+        def rows():
+            yield 2, {'username': 'park', 'password': 'Str0ng!pass'}
+            yield 3, {'username': 'choi', 'password': 'Str0ng!pass'}
+            raise UnicodeDecodeError('utf-8', b'\xff', 0, 1, 'invalid start byte')
+
+        report = EmployeeImporter(batch_size=1, workers=1).run(rows())
+        self.assertEqual(report.created, 2)
+        self.assertTrue(report.error.startswith('3행 다음'), report.error)
+        self.assertEqual(get_user_model().objects.count(), 2)
+
+    def test_conflicting_insert_is_reported_per_row(self):
+        # 검증(아이디 중복 확인)과 INSERT 사이에 다른 요청이 같은 아이디를 만든 경우
+        hash_passwords = EmployeeImporter._hash_passwords
+
+        def racing_hash(importer, passwords):
+            get_user_model().objects.create_user('jung', password='x', nickname='먼저')
+            return hash_passwords(importer, passwords)
+
+        with mock.patch.object(EmployeeImporter, '_hash_passwords', racing_hash):
+            report = self.run_csv('han,한,,,,Str0ng!pass\njung,정,,,,Str0ng!pass\n')
+        self.assertEqual(report.created, 1)
+        self.assertEqual([r.username for r in report.failed], ['jung'])
+        self.assertTrue(get_user_model().objects.filter(username='han').exists())
+
+    def test_view_shows_file_error(self):
+        self.client.force_login(get_user_model().objects.create_superuser('import_admin', password='x', nickname='관리자'))
+        response = self.client.post(reverse('user_import'), {'file': SimpleUploadedFile('users.xlsx', b'not a zip')})
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'XLSX 파일이 아니거나 손상된 파일입니다.')
+
+    @override_settings(USER_IMPORT_WEB_THREADS=2)
+    def test_view_hashes_in_threads(self):
+        # 웹 요청 안에서는 gunicorn 워커를 fork 하지 않음 (프로세스 풀은 관리 명령에서만)
+        self.client.force_login(get_user_model().objects.create_superuser('import_admin', password='x', nickname='관리자'))
+        body = ''.join(f'user{i},사원{i},,,,Str0ng!pass{i}\n' for i in range(POOL_THRESHOLD))
+        with mock.patch('accounts.importers.os.cpu_count', return_value=4), \
+                mock.patch('accounts.importers.ProcessPoolExecutor', side_effect=AssertionError("프로세스 풀")):
+            response = self.client.post(reverse('user_import'), {
+                'file': SimpleUploadedFile('users.csv', (self.HEADER + body).encode())})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(get_user_model().objects.filter(username__startswith='user').count(), POOL_THRESHOLD)
+
+
+# 부서 트리 (materialized path): 옮기면 하위 부서 경로도 같이 바뀌고, 상위 부서의 게시판 권한이 하위 팀에 이어짐
+class DepartmentTreeTests(TestCase):
+    def setUp(self):
+        self.division = Department.objects.create(name='개발본부')
+        self.team = Department.objects.create(name='백엔드팀', parent=self.division)
+        self.part = Department.objects.create(name='결제파트', parent=self.team)
+        self.other = Department.objects.create(name='영업본부')
+
+    def test_paths_follow_moves(self):
+        self.assertEqual(self.part.ancestor_ids(), [self.division.pk, self.team.pk, self.part.pk])
+        self.team.parent = self.other
+        self.team.save()
+        self.part.refresh_from_db()
+        self.assertEqual(self.part.ancestor_ids(), [self.other.pk, self.team.pk, self.part.pk])
+        self.assertEqual(self.part.depth, 2)
+        self.assertEqual(set(self.other.get_descendants()), {self.other, self.team, self.part})
+
+    def test_cannot_move_under_own_subtree(self):
+        self.division.parent = self.part
+        with self.assertRaises(ValueError):
+            self.division.save()
+
+    def test_board_access_is_inherited(self):
+        board = Board.objects.create(name='개발', slug='dev')
+        board.read_access_depts.add(self.division)
+        User = get_user_model()
+        member = User.objects.create_user('tree_member', password='x', nickname='m', department=self.part)
+        outsider = User.objects.create_user('tree_outsider', password='x', nickname='o', department=self.other)
+        self.assertTrue(board.can_read(member))
+        self.assertFalse(board.can_read(outsider))
+
+
+# 프로필 사진 축소본 (accounts/thumbnails.py): 캐시가 비어도 원본을 읽지 않고 이름을 정함
+class ThumbnailNameTests(TestCase):
+    def setUp(self):
+        root = tempfile.TemporaryDirectory()
+        self.addCleanup(root.cleanup)
+        media = override_settings(MEDIA_ROOT=root.name)
+        media.enable()
+        self.addCleanup(media.disable)
+        image = io.BytesIO()
+        Image.new('RGB', (300, 300), 'olive').save(image, 'PNG')
+        self.user = get_user_model().objects.create_user(
+            'thumb_user', password='x', nickname='thumb', profile_image=SimpleUploadedFile('me.png', image.getvalue()))
+        cache.clear()
+
+    def test_name_does_not_read_original(self):
+        first = thumbnails.ensure_variant(self.user.profile_image, 40)
+        cache.clear()
+        field_file = get_user_model().objects.get(pk=self.user.pk).profile_image
+        with mock.patch.object(Storage, 'open', side_effect=AssertionError("원본을 읽음")):
+            self.assertEqual(thumbnails.thumbnail_url(field_file, 40), default_storage.url(first))
+
+    def test_replaced_file_gets_new_name(self):
+        field_file = self.user.profile_image
+        first = thumbnails.ensure_variant(field_file, 40)
+        path = field_file.path
+        Image.new('RGB', (200, 100), 'red').save(path, 'PNG')
+        os.utime(path, (time.time() + 5,) * 2)
+        self.assertNotEqual(thumbnails.ensure_variant(field_file, 40), first)
@@ -0,0 +1,157 @@
+"""
+이미지 축소본(썸네일) 생성
+
+- 목록 화면(조직도, 사이드바, 게시글)에서 원본 사진 대신 작은 WebP/JPEG 파일을 내려줌
+- 파일 이름은 원본을 읽지 않고 정함 (source_digest) → 원본이 바뀌지 않으면 URL도 그대로라 브라우저 캐시에 유리
+- 업로드 직후 미리 만들거나(signals), 템플릿에서 처음 요청될 때 만듦
+- thumbs/ 는 공개 경로이므로 프로필 사진 전용. 첨부 이미지 축소본은 권한 확인 뒤에만 보이도록
+  비공개 저장소에 만들고 post_download?size= 로 내려줌 (community/storage.py attachment_preview)
+"""
+import hashlib
+import io
+import logging
+import warnings
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps, features
+
+from ops import metrics
+
+logger = logging.getLogger(__name__)
+
+THUMBNAIL_DIR = 'thumbs'
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.gif', '.webp', '.bmp')
+# 축소본을 만들 수 없을 때 나는 예외 (원본 없음/이미지 아님/너무 큼)
+RENDER_ERRORS = (OSError, ValueError, Image.DecompressionBombError, Image.DecompressionBombWarning)
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def _output_format():
+    fmt = _setting('THUMBNAIL_FORMAT', 'WEBP').upper()
+    if fmt == 'WEBP' and not features.check('webp'):
+        fmt = 'JPEG'  # WebP 미지원 Pillow 빌드면 JPEG로 대체
+    return fmt
+
+
+def is_image_name(name):
+    return bool(name) and name.lower().endswith(IMAGE_EXTENSIONS)
+
+
+def source_digest(field_file):
+    """
+    축소본 이름의 기준값. 캐시가 비었을 때 요청 안에서 큰 원본을 NFS 에서 끝까지 읽어 해시하지 않도록 원본을 읽지 않음
+    - 내용 주소 저장소(community/storage.py)는 저장된 이름에 이미 내용 해시가 있음 (content_digest)
+    - 그 밖에는 저장된 이름 + 크기 + 수정 시각의 해시 → 같은 이름으로 다른 파일이 다시 저장돼도 다른 축소본
+    """
+    storage, name = field_file.storage, field_file.name
+    digest = getattr(storage, 'content_digest', None)
+    if digest and digest(name):
+        return digest(name)
+    try:
+        modified = storage.get_modified_time(name).timestamp()
+    except NotImplementedError:
+        modified = ''
+    return hashlib.sha256(f"{name}:{storage.size(name)}:{modified}".encode()).hexdigest()
+
+
+def variant_name(digest, size, crop):
+    ext = 'webp' if _output_format() == 'WEBP' else 'jpg'
+    mode = 'c' if crop else 'f'
+    return f"{THUMBNAIL_DIR}/{digest[:2]}/{digest}_{size}{mode}.{ext}"
+
+
+def render_variant(source, size, crop=True):
+    """
+    원본 파일 객체 → 축소본 bytes
+    size는 화면에 보이는 크기(px). 고해상도 화면을 위해 2배로 만든다.
+    """
+    max_pixels = _setting('THUMBNAIL_MAX_PIXELS', 40_000_000)
+    target = (size * 2, size * 2)
+
+    # 압축 폭탄 방지: 헤더만 읽고 크기를 먼저 확인, Pillow 경고도 예외로 처리
+    with warnings.catch_warnings():
+        warnings.simplefilter('error', Image.DecompressionBombWarning)
+        img = Image.open(source)
+        width, height = img.size
+        if width * height > max_pixels:
+            raise ValueError(f"이미지가 너무 큽니다: {width}x{height}")
+
+        # JPEG는 디코딩 단계에서 미리 축소 (전체 해상도로 풀지 않아 훨씬 빠름)
+        img.draft('RGB', target)
+        img = ImageOps.exif_transpose(img)
+
+        if crop:
+            img = ImageOps.fit(img, target, Image.Resampling.LANCZOS)
+        else:
+            img.thumbnail(target, Image.Resampling.LANCZOS)
+
+    fmt = _output_format()
+    if fmt == 'JPEG' and img.mode not in ('RGB', 'L'):
+        img = img.convert('RGB')
+    elif img.mode not in ('RGB', 'RGBA', 'L'):
+        img = img.convert('RGBA')
+
+    options = {'quality': _setting('THUMBNAIL_QUALITY', 80)}
+    if fmt == 'WEBP':
+        options['method'] = 4
+    else:
+        options.update(optimize=True, progressive=True)
+
+    out = io.BytesIO()
+    img.save(out, fmt, **options)
+    return out.getvalue()
+
+
+def ensure_variant(field_file, size, crop=True, storage=None):
+    """축소본이 없으면 만들고, 저장소 상의 이름을 돌려준다. storage 를 주지 않으면 공개 저장소(default_storage)"""
+    storage = storage or default_storage
+    name = variant_name(source_digest(field_file), size, crop)
+    if not storage.exists(name):
+        field_file.open('rb')
+        try:
+            data = render_variant(field_file, size, crop)
+        finally:
+            field_file.close()
+        storage.save(name, ContentFile(data))
+    return name
+
+
+def thumbnail_url(field_file, size, crop=True):
+    """
+    템플릿에서 쓰는 진입점. 만들 수 없으면(원본 없음/이미지 아님) 원본 URL을 그대로 돌려준다.
+    원본 이름 → 축소본 URL 매핑은 캐시에 저장해서 두 번째부터는 파일을 다시 읽지 않음
+    """
+    if not field_file:
+        return ''
+
+    key = f"thumb:{field_file.name}:{size}:{int(crop)}"
+    url = cache.get(key)
+    metrics.cache_result('thumbnail', bool(url))
+    if url:
+        return url
+
+    try:
+        url = default_storage.url(ensure_variant(field_file, size, crop))
+    except RENDER_ERRORS as e:
+        logger.warning("썸네일 생성 실패 (%s): %s", field_file.name, e)
+        try:
+            url = field_file.url
+        except ValueError:
+            url = ''
+        cache.set(key, url, 60 * 60)  # 실패한 파일을 요청마다 다시 읽지 않도록 잠시 기억
+        return url
+
+    cache.set(key, url, None)
+    return url
+
+
+def generate_presets(field_file, crop=True, sizes=None):
+    """업로드 직후 자주 쓰는 크기의 축소본을 미리 만들어 둔다."""
+    for size in sizes or _setting('THUMBNAIL_PRESETS', [40, 70]):
+        thumbnail_url(field_file, size, crop)
@@ -1,11 +1,17 @@
 from django.urls import path
 from django.contrib.auth import views as auth_views
+from ops.ratelimit import rate_limit
 from . import views
 
 urlpatterns = [
     # 1. 로그인 (Django 제공 기능 사용)
     # template_name을 지정해줘야 우리가 만든 HTML을 씁니다.
-    path('login/', auth_views.LoginView.as_view(template_name='accounts/login.html'), name='login'),
+    # 같은 IP 에서 분당 20번, 같은 아이디로 분당 5번까지만 로그인 시도 (ops/ratelimit.py)
+    path('login/', rate_limit('5/m', key='username', scope='login:username')(
+        rate_limit('20/m', key='ip', scope='login:ip')(
+            auth_views.LoginView.as_view(template_name='accounts/login.html'),
+        ),
+    ), name='login'),
     
     # 2. 로그아웃 (Django 제공 기능 사용)
     # 로그아웃 후에는 다시 로그인 페이지로 튕기게 설정(next_page)
@@ -20,7 +26,9 @@ urlpatterns = [
     path('manage/update/<int:user_id>/', views.user_update, name='user_update'),
     path('manage/', views.manage_home, name='manage_home'),           # 관리자 홈
     path('manage/users/', views.manage_users, name='manage_users'),   # 사원 목록
+    path('manage/users/export/', views.manage_users_export, name='manage_users_export'),  # 사원 목록 내보내기
     path('manage/create/', views.user_create, name='user_create'),    # 사원 추가
+    path('manage/import/', views.user_import, name='user_import'),    # 사원 일괄 등록
     path('manage/structure/', views.manage_structure, name='manage_structure'), #부서 관리
     path('org/', views.org_chart, name='org_chart'),
 
@@ -21,22 +21,150 @@ def signup(request):
 # 2. 내 프로필 보기 (My Page) - 내 직급 확인용
 @login_required
 def profile(request):
-    return render(request, 'accounts/profile.html', {'user': request.user})
+    return render(request, 'accounts/profile.html')
 
+import csv
+import json
+
+from django.conf import settings
 from django.contrib.auth.decorators import user_passes_test
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib import messages
+from django.core import signing
+from django.db.models import Prefetch, Q, Value
+from django.db.models.functions import Coalesce
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from ops.querybudget import query_budget
 from .models import User, Department, Rank
 
 # 1. 관리자 여부 체크 함수 (True면 통과, False면 튕김)
 def is_manager(user):
     return user.is_superuser
 
+# 한 페이지에 보여줄 사원 수 / 내보내기 시 DB에서 한 번에 가져올 행 수
+MANAGE_USERS_PAGE_SIZE = 50
+EXPORT_CHUNK_SIZE = 2000
+
+
+def _filtered_users(params):
+    """
+    관리자 목록/내보내기 공용 필터 (부서, 직급, 이름 앞글자)
+    부서/직급은 JOIN으로 한 번에 가져오고, 정렬 키(부서명, 직급 레벨, id)를 annotate 해둔다.
+    """
+    users = User.objects.select_related('department', 'rank').annotate(
+        dept_key=Coalesce('department__name', Value('')),  # 무소속은 맨 앞으로
+        rank_key=Coalesce('rank__level', Value(0)),
+    )
+
+    dept_id = params.get('department')
+    if dept_id and dept_id.isdigit():
+        users = users.filter(department_id=dept_id)
+
+    rank_id = params.get('rank')
+    if rank_id and rank_id.isdigit():
+        users = users.filter(rank_id=rank_id)
+
+    name = params.get('q', '').strip()
+    if name:
+        users = users.filter(Q(nickname__startswith=name) | Q(username__startswith=name))
+
+    return users.order_by('dept_key', 'rank_key', 'id')
+
+
 # 2. 회원 관리 목록 페이지
 @user_passes_test(is_manager) 
+@query_budget(queries=12, repeats=2)
 def manage_users(request):
-    users = User.objects.all().order_by('department', 'rank') # 부서별, 직급별 정렬
-    return render(request, 'accounts/manage_users.html', {'users': users})
+    users = _filtered_users(request.GET)
+    total = users.count()
+
+    # 키셋 페이지네이션: OFFSET 대신 "마지막으로 본 (부서명, 직급 레벨, id)" 다음부터 읽는다.
+    cursor = request.GET.get('after')
+    if cursor:
+        try:
+            dept_key, rank_key, last_id = signing.loads(cursor, salt='manage_users')
+        except (signing.BadSignature, ValueError, TypeError):
+            dept_key = None
+        if dept_key is not None:
+            users = users.filter(
+                Q(dept_key__gt=dept_key)
+                | Q(dept_key=dept_key, rank_key__gt=rank_key)
+                | Q(dept_key=dept_key, rank_key=rank_key, id__gt=last_id)
+            )
+
+    page = list(users[:MANAGE_USERS_PAGE_SIZE + 1])  # 1개 더 읽어서 다음 페이지 유무 확인
+    next_cursor = None
+    if len(page) > MANAGE_USERS_PAGE_SIZE:
+        page = page[:MANAGE_USERS_PAGE_SIZE]
+        last = page[-1]
+        next_cursor = signing.dumps([last.dept_key, last.rank_key, last.id], salt='manage_users')
+
+    # 페이지 이동 시 필터 조건 유지용
+    filters = request.GET.copy()
+    filters.pop('after', None)
+
+    return render(request, 'accounts/manage_users.html', {
+        'users': page,
+        'total': total,
+        'next_cursor': next_cursor,
+        'filter_query': filters.urlencode(),
+        'departments': Department.objects.all(),
+        'ranks': Rank.objects.all(),
+        'selected_dept': request.GET.get('department', ''),
+        'selected_rank': request.GET.get('rank', ''),
+        'query': request.GET.get('q', ''),
+    })
+
+
+class _Echo:
+    """csv.writer가 쓴 한 줄을 그대로 돌려주는 가짜 버퍼 (StreamingHttpResponse용)"""
+    def write(self, value):
+        return value
+
+
+EXPORT_FIELDS = ['id', 'username', 'nickname', 'email', 'department', 'rank', 'rank_level', 'date_joined', 'is_active']
+
+
+def _export_rows(users):
+    # 모델 인스턴스 대신 값 튜플만 청크 단위로 읽어서 메모리를 일정하게 유지
+    rows = users.values_list(
+        'id', 'username', 'nickname', 'email', 'department__name', 'rank__name', 'rank__level',
+        'date_joined', 'is_active',
+    )
+    for row in rows.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        row = list(row)
+        row[7] = row[7].isoformat() if row[7] else ''
+        yield row
+
+
+# 2-1. 사원 목록 내보내기 (CSV / JSONL 스트리밍)
+@user_passes_test(is_manager)
+def manage_users_export(request):
+    users = _filtered_users(request.GET)
+    fmt = request.GET.get('format', 'csv')
+    stamp = timezone.localdate().strftime('%Y%m%d')
+
+    if fmt == 'jsonl':
+        lines = (
+            json.dumps(dict(zip(EXPORT_FIELDS, row)), ensure_ascii=False) + '\n'
+            for row in _export_rows(users)
+        )
+        response = StreamingHttpResponse(lines, content_type='application/x-ndjson; charset=utf-8')
+        response['Content-Disposition'] = f'attachment; filename="employees_{stamp}.jsonl"'
+        return response
+
+    writer = csv.writer(_Echo())
+
+    def csv_lines():
+        yield '\ufeff'  # 엑셀에서 한글이 깨지지 않도록 BOM 추가
+        yield writer.writerow(EXPORT_FIELDS)
+        for row in _export_rows(users):
+            yield writer.writerow(row)
+
+    response = StreamingHttpResponse(csv_lines(), content_type='text/csv; charset=utf-8')
+    response['Content-Disposition'] = f'attachment; filename="employees_{stamp}.csv"'
+    return response
 
 # 3. 회원 정보 수정 (부서/직급 변경)
 @user_passes_test(is_manager)
@@ -70,6 +198,7 @@ def user_update(request, user_id):
 
 # accounts/views.py (기존 import 밑에 추가)
 from .forms import EmployeeCreationForm # 방금 만든 폼 import
+from .importers import import_employees
 from .models import Department, Rank
 
 # 1. 관리자 홈 (메뉴판)
@@ -91,6 +220,26 @@ def user_create(request):
         
     return render(request, 'accounts/user_create.html', {'form': form})
 
+# 2-2. 사원 일괄 등록 (CSV/XLSX 업로드)
+@user_passes_test(is_manager)
+def user_import(request):
+    report = None
+    if request.method == 'POST':
+        upload = request.FILES.get('file')
+        if not upload:
+            messages.error(request, "업로드할 파일을 선택해주세요.")
+            return redirect('user_import')
+        # 요청 안에서는 워커 프로세스를 fork 하지 않고 정해진 수의 스레드로만 해시 (accounts/importers.py)
+        report = import_employees(upload.file, upload.name, dry_run='dry_run' in request.POST,
+                                  workers=settings.USER_IMPORT_WEB_THREADS)
+        if report.error:
+            # 앞부분은 이미 저장됐을 수 있으므로 결과 화면을 그대로 보여줌
+            messages.error(request, report.error)
+        if report.created:
+            messages.success(request, f"🎉 {report.created}명의 사원 계정이 생성되었습니다.")
+
+    return render(request, 'accounts/user_import.html', {'report': report})
+
 # 3. 부서/직급 관리 (추가/삭제)
 @user_passes_test(is_manager)
 def manage_structure(request):
@@ -98,8 +247,10 @@ def manage_structure(request):
     if request.method == 'POST':
         if 'add_dept' in request.POST:
             name = request.POST.get('dept_name')
+            parent_id = request.POST.get('parent')
             if name:
-                Department.objects.create(name=name)
+                parent = Department.objects.filter(id=parent_id).first() if parent_id else None
+                Department.objects.create(name=name, parent=parent)
                 messages.success(request, f"부서 '{name}' 추가 완료")
         
         elif 'add_rank' in request.POST:
@@ -162,7 +313,11 @@ def user_update(request, user_id):
 # accounts/views.py
 
 @login_required
+@query_budget(queries=10, repeats=2)
 def org_chart(request):
     # [수정] 'user_set' -> 'members'
-    departments = Department.objects.prefetch_related('members').all()
+    # 사원 목록을 가져올 때 직급까지 JOIN 해서 사원마다 직급 쿼리가 나가지 않도록 함
+    # 부서는 path 순서로 한 번에 읽으면 그대로 트리 순서(상위 → 하위)가 됨
+    members = User.objects.select_related('rank').order_by('-rank__level', 'nickname')
+    departments = Department.objects.order_by('path').prefetch_related(Prefetch('members', queryset=members))
     return render(request, 'accounts/org_chart.html', {'departments': departments})
\ No newline at end of file
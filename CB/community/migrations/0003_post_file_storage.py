@@ -0,0 +1,19 @@
+# Generated by Django 6.0 on 2026-10-19 12:23
+
+import community.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('community', '0002_post_is_active'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='post',
+            name='file',
+            field=models.FileField(blank=True, max_length=255, null=True, storage=community.storage.get_attachment_storage, upload_to='community/files/%Y/%m/%d/'),
+        ),
+    ]
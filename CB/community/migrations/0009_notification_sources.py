@@ -0,0 +1,18 @@
+# Generated by Django 6.0 on 2026-10-19 15:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('community', '0008_read_marker'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notification',
+            name='sources',
+            field=models.JSONField(blank=True, default=list),
+        ),
+    ]
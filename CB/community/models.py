@@ -1,4 +1,10 @@
-from django.db import models
+import os
+import uuid
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.db import models, transaction
+from django.db.models import Q
+from django.utils import timezone
 from django.conf import settings  # 커스텀 유저 모델을 가져오기 위함
 
 # 1. 게시판 카테고리 (권한 관리의 핵심)
@@ -6,6 +12,10 @@ from django.db import models
 from django.conf import settings
 # accounts 앱의 모델을 가져옵니다.
 from accounts.models import Rank, Department 
+from accounts.thumbnails import is_image_name
+from django.core.cache import cache
+from ops import caches, metrics
+from .storage import get_attachment_storage
 
 class Board(models.Model):
     name = models.CharField(max_length=50, unique=True)
@@ -47,43 +57,88 @@ class Board(models.Model):
     def __str__(self):
         return self.name
         
-    # 헬퍼 메서드: 이 유저가 읽을 수 있나?
-    def can_read(self, user):
-        # 관리자는 프리패스
-        if user.is_superuser: return True
-        
+    # 권한 규칙 캐시 (게시판마다 부서/직급 id 목록을 한 번만 읽어서 재사용)
+    # 권한이 바뀌면 signals.py 에서 캐시를 지운다.
+    # 메모리 캐시면 다른 워커의 캐시는 지울 수 없으므로 몇 초만 보관 (ops/caches.py)
+    ACL_CACHE_TIMEOUT = 60 * 60
+    ACL_FIELDS = {
+        'read_depts': 'read_access_depts',
+        'read_ranks': 'read_access_ranks',
+        'write_depts': 'write_access_depts',
+        'write_ranks': 'write_access_ranks',
+    }
+
+    @staticmethod
+    def acl_cache_key(board_id):
+        return f"board_acl:{board_id}"
+
+    def access_rules(self):
+        key = self.acl_cache_key(self.pk)
+        rules = cache.get(key)
+        metrics.cache_result('board_acl', rules is not None)
+        if rules is None:
+            rules = {
+                rule: frozenset(getattr(self, field).values_list('id', flat=True))
+                for rule, field in self.ACL_FIELDS.items()
+            }
+            cache.set(key, rules, caches.timeout(self.ACL_CACHE_TIMEOUT))
+        return rules
+
+    @classmethod
+    def prime_acl_cache(cls):
+        """모든 게시판의 권한 규칙을 중간 테이블 4번 조회로 한꺼번에 캐시에 올림 (게시판마다 4번 → 전체 4번)"""
+        collected = {pk: {rule: set() for rule in cls.ACL_FIELDS} for pk in cls.objects.values_list('pk', flat=True)}
+        for rule, field_name in cls.ACL_FIELDS.items():
+            field = cls._meta.get_field(field_name)
+            rows = field.remote_field.through.objects.values_list(field.m2m_column_name(), field.m2m_reverse_name())
+            for board_id, target_id in rows:
+                if board_id in collected:
+                    collected[board_id][rule].add(target_id)
+        cache.set_many({
+            cls.acl_cache_key(pk): {rule: frozenset(ids) for rule, ids in rules.items()}
+            for pk, rules in collected.items()
+        }, caches.timeout(cls.ACL_CACHE_TIMEOUT))
+        return len(collected)
+
+    @staticmethod
+    def _allowed(dept_ids, rank_ids, user):
         # 1. 부서 체크 (설정된 부서가 있는데, 내 부서가 거기에 없으면 탈락)
-        if self.read_access_depts.exists():
-            if not user.department or user.department not in self.read_access_depts.all():
+        #    상위 부서에 권한이 있으면 그 아래 팀들도 모두 허용 (path에 조상 id가 들어 있음)
+        if dept_ids:
+            if not user.department_id or dept_ids.isdisjoint(user.department.ancestor_ids()):
                 return False
-                
+
         # 2. 직급 체크 (설정된 직급이 있는데, 내 직급이 거기에 없으면 탈락)
-        if self.read_access_ranks.exists():
-            if not user.rank or user.rank not in self.read_access_ranks.all():
-                return False
-                
+        if rank_ids and user.rank_id not in rank_ids:
+            return False
+
         return True # 모든 관문 통과
 
+    # 헬퍼 메서드: 이 유저가 읽을 수 있나?
+    def can_read(self, user):
+        # 관리자는 프리패스
+        if user.is_superuser: return True
+
+        rules = self.access_rules()
+        return self._allowed(rules['read_depts'], rules['read_ranks'], user)
+
     # 헬퍼 메서드: 이 유저가 쓸 수 있나?
     def can_write(self, user):
         if user.is_superuser: return True
-        
+
         # 읽지도 못하는 사람은 당연히 못 씀
         if not self.can_read(user): return False
-        
-        # 1. 부서 체크
-        if self.write_access_depts.exists():
-            if not user.department or user.department not in self.write_access_depts.all():
-                return False
-                
-        # 2. 직급 체크
-        if self.write_access_ranks.exists():
-            if not user.rank or user.rank not in self.write_access_ranks.all():
-                return False
-                
-        return True
+
+        rules = self.access_rules()
+        return self._allowed(rules['write_depts'], rules['write_ranks'], user)
 
 # 2. 게시글
+class ActivePostManager(models.Manager):
+    # 기본 매니저: 삭제(숨김) 처리된 글은 목록/상세/게시판별 글(board.posts) 어디에도 나오지 않음
+    def get_queryset(self):
+        return super().get_queryset().filter(is_active=True)
+
+
 class Post(models.Model):
     board = models.ForeignKey(Board, on_delete=models.CASCADE, related_name='posts')
     author = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
@@ -92,7 +147,14 @@ class Post(models.Model):
     is_active = models.BooleanField(default=True) # True: 정상, False: 삭제됨
     
     # 파일 업로드 (공지사항엔 첨부파일이 필수죠)
-    file = models.FileField(upload_to='community/files/%Y/%m/%d/', blank=True, null=True)
+    # 저장 위치는 settings.STORAGES['attachments'] (내용 해시 기반 중복 제거 저장소)
+    file = models.FileField(
+        upload_to='community/files/%Y/%m/%d/',
+        storage=get_attachment_storage,
+        max_length=255,
+        blank=True,
+        null=True,
+    )
     
     # 조회수
     view_count = models.PositiveIntegerField(default=0)
@@ -100,12 +162,27 @@ class Post(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = ActivePostManager()
+    all_objects = models.Manager()  # 삭제된 글 포함 (관리/보관 작업용)
+
+    is_archived = False  # 보관 테이블의 글(ArchivedPost)과 같은 템플릿을 씀
+
     class Meta:
         ordering = ['-created_at'] # 최신글이 위로
+        base_manager_name = 'all_objects'  # comment.post 처럼 FK 로 따라갈 때는 숨김 여부와 관계없이 찾음
+        indexes = [
+            # 게시판별 최신글 목록 (post_list)
+            models.Index(fields=['board', 'is_active', 'created_at'], name='post_board_list_idx'),
+        ]
 
     def __str__(self):
         return f"[{self.board.name}] {self.title}"
 
+    @property
+    def is_image_file(self):
+        # 첨부파일이 이미지면 상세 화면에서 축소본 미리보기를 보여줌
+        return bool(self.file) and is_image_name(self.file.name)
+
 # 3. 댓글
 class Comment(models.Model):
     post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='comments')
@@ -116,6 +193,56 @@ class Comment(models.Model):
     def __str__(self):
         return f"{self.author}님의 댓글"
 
+# 3-1. 보관(archive) 테이블
+# 삭제된 글과 아주 오래된 글은 댓글과 함께 이쪽으로 옮겨서 (ops/archive.py) 게시글 테이블/인덱스를 작게 유지
+# id 는 원래 글/댓글의 id 를 그대로 씀 → 예전 링크(/community/post/<id>/)로 들어와도 이 테이블에서 찾아서 보여줌
+class ArchivedPost(models.Model):
+    REASON_DELETED = 'deleted'
+    REASON_OLD = 'old'
+    REASON_CHOICES = [(REASON_DELETED, '삭제된 글'), (REASON_OLD, '오래된 글')]
+
+    id = models.BigIntegerField(primary_key=True)
+    board = models.ForeignKey(Board, on_delete=models.CASCADE, related_name='archived_posts')
+    author = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
+    title = models.CharField(max_length=200)
+    content = models.TextField()
+    is_active = models.BooleanField(default=True)
+    file = models.FileField(
+        upload_to='community/files/%Y/%m/%d/',
+        storage=get_attachment_storage,
+        max_length=255,
+        blank=True,
+        null=True,
+    )
+    view_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+    reason = models.CharField(max_length=10, choices=REASON_CHOICES)
+
+    is_archived = True  # 템플릿에서 댓글 쓰기/삭제 버튼을 숨길 때 사용
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"[보관] {self.title}"
+
+    @property
+    def is_image_file(self):
+        return bool(self.file) and is_image_name(self.file.name)
+
+
+class ArchivedComment(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    post = models.ForeignKey(ArchivedPost, on_delete=models.CASCADE, related_name='comments')
+    author = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
+    content = models.TextField()
+    created_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.author}님의 댓글 (보관)"
+
 # 4. 알림 (Notification) - 사내 메신저 역할
 class Notification(models.Model):
     recipient = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='notifications')
@@ -126,13 +253,70 @@ class Notification(models.Model):
     
     is_read = models.BooleanField(default=False) # 읽음 여부 (빨간 점 표시용)
     created_at = models.DateTimeField(auto_now_add=True)
+    # 0이 아니면 오래된 안 읽은 알림 여러 개를 합친 요약 행 (ops/retention.py)
+    rollup_count = models.PositiveIntegerField(default=0)
+
+    # 묶음 알림 (coalesce): 같은 종류/대상 알림이 같은 시간 구간에 또 오면 새 행 대신 이 행의 count/actors 를 늘림
+    group_key = models.CharField(max_length=100, null=True, blank=True)   # 예: 'mention:post:12' (NULL: 묶지 않음)
+    window_start = models.DateTimeField(null=True, blank=True)           # 묶는 시간 구간의 시작
+    count = models.PositiveIntegerField(default=1)                        # 합쳐진 알림 수
+    actors = models.JSONField(default=list, blank=True)                   # 보낸 사람 닉네임 (최근 순, ACTORS_LIMIT 명까지)
+    sources = models.JSONField(default=list, blank=True)                  # 합쳐진 원본 id (예: 댓글 id, 최근 SOURCES_LIMIT 개)
+
+    ACTORS_LIMIT = 20
+    SOURCES_LIMIT = 200
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # 받은 사람별 목록 / 안 읽은 알림 수 / 보관 기간 정리
+            models.Index(fields=['recipient', 'is_read', 'created_at'], name='notification_recipient_idx'),
+        ]
+        constraints = [
+            # 묶음 알림의 upsert 기준. group_key 가 NULL 인 일반 알림은 겹쳐도 됨 (NULL 은 서로 다른 값으로 취급)
+            models.UniqueConstraint(fields=['recipient', 'group_key', 'window_start'], name='notification_coalesce_key'),
+        ]
 
     def __str__(self):
         return f"{self.recipient}에게: {self.message}"
 
+    @classmethod
+    def coalesce(cls, recipient, sender, group_key, render, link=None, window=None, source=None):
+        """
+        묶음 알림 upsert. render(actors, count) 가 돌려준 문구로 저장하고 (행, 새로 만들었는지) 를 돌려줌
+        - 같은 (받는 사람, group_key, 시간 구간) 행이 있으면 잠그고 count/actors 만 갱신 → 알림 폭주 시에도 행은 구간당 하나
+        - 동시에 처음 만들려는 요청이 겹치면 unique 제약에 걸린 쪽이 기존 행을 잠그고 갱신 (get_or_create)
+        - 이미 읽은 묶음에 새 알림이 오면 처음부터 다시 셈 (안 읽은 상태로)
+        - source(원본 id)가 이미 합쳐져 있으면 아무것도 바꾸지 않음 → 작업이 재시도되어도 두 번 세지 않음
+        """
+        window = window or settings.NOTIFICATION_COALESCE_WINDOW
+        now = timezone.now()
+        window_start = datetime.fromtimestamp(int(now.timestamp()) // window * window, tz=dt_timezone.utc)
+        actor = sender.nickname
+        with transaction.atomic():
+            sources = [source] if source is not None else []
+            notification, created = cls.objects.select_for_update().get_or_create(
+                recipient=recipient, group_key=group_key, window_start=window_start,
+                defaults={'sender': sender, 'link': link, 'actors': [actor], 'sources': sources,
+                          'message': render([actor], 1)[:255]},
+            )
+            if created:
+                return notification, True
+            if source is not None:
+                if source in notification.sources:
+                    return notification, False
+                notification.sources = [source, *notification.sources][:cls.SOURCES_LIMIT]
+            if notification.is_read:
+                notification.count, notification.actors, notification.is_read = 1, [actor], False
+            else:
+                notification.count += 1
+                others = [name for name in notification.actors if name != actor]
+                notification.actors = [actor, *others][:cls.ACTORS_LIMIT]
+            notification.sender = sender
+            notification.message = render(notification.actors, notification.count)[:255]
+            notification.save(update_fields=['count', 'actors', 'sources', 'is_read', 'sender', 'message'])
+        return notification, False
+
 class Message(models.Model):
     sender = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='sent_messages')
     recipient = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='received_messages')
@@ -145,4 +329,137 @@ class Message(models.Model):
         ordering = ['-created_at'] # 최신 쪽지부터
 
     def __str__(self):
-        return f"{self.sender} -> {self.recipient}: {self.content[:10]}..."
\ No newline at end of file
+        return f"{self.sender} -> {self.recipient}: {self.content[:10]}..."
+
+# 5. 대용량 첨부파일 분할 업로드 (init → 조각 PUT → finalize)
+class UploadSession(models.Model):
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='upload_sessions')
+    board = models.ForeignKey(Board, on_delete=models.CASCADE, related_name='upload_sessions')
+
+    filename = models.CharField(max_length=255)
+    size = models.BigIntegerField()                       # 전체 파일 크기 (바이트)
+    received = models.BigIntegerField(default=0)          # 지금까지 받은 바이트 (= 다음 조각의 offset)
+    stored_name = models.CharField(max_length=255, blank=True)  # finalize 후 저장소에 들어간 이름
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.filename} ({self.received}/{self.size})"
+
+    @property
+    def temp_path(self):
+        return os.path.join(settings.CHUNKED_UPLOAD_DIR, f"{self.pk}.part")
+
+    @property
+    def is_complete(self):
+        return self.received == self.size
+
+# 6. 읽음 표시 (게시판별 "새 글" 배지)
+# 사람×게시판마다 한 줄: high_water 이하 id 의 글은 모두 읽은 것으로 보고, 그보다 큰 id 중 읽은 글만 read_ids 에 적음.
+# 글마다 읽음 행을 만들지 않으므로 표가 작고, 사람의 모든 게시판 표시를 한 번에 읽어 캐시에 둠
+class ReadMarker(models.Model):
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='read_markers')
+    board = models.ForeignKey(Board, on_delete=models.CASCADE, related_name='read_markers')
+    high_water = models.BigIntegerField(default=0)            # 이 id 까지는 모두 읽음
+    read_ids = models.JSONField(default=list, blank=True)     # high_water 보다 큰 id 중 읽은 글 (오름차순)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            # (user, board) 인덱스의 앞부분으로 "이 사람의 모든 게시판 표시" 도 한 번에 찾음
+            models.UniqueConstraint(fields=['user', 'board'], name='read_marker_user_board'),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id}@{self.board_id} ≤{self.high_water} +{len(self.read_ids)}"
+
+    @staticmethod
+    def cache_key(user_id):
+        return f"read_markers:{user_id}"
+
+    @staticmethod
+    def new_since():
+        # 이보다 오래된 글은 읽지 않았어도 "새 글" 이 아님 (처음 들어온 사람에게 모든 글이 새 글로 보이지 않게)
+        return timezone.now() - timedelta(days=settings.READ_MARKER_NEW_DAYS)
+
+    @classmethod
+    def for_user(cls, user):
+        """{게시판 id: (high_water, 읽은 id frozenset)}. 캐시에 없으면 (user, board) 인덱스로 한 번 조회"""
+        if not user.is_authenticated:
+            return {}
+        key = cls.cache_key(user.pk)
+        markers = cache.get(key)
+        metrics.cache_result('read_markers', markers is not None)
+        if markers is None:
+            markers = {
+                board_id: (high_water, frozenset(read_ids))
+                for board_id, high_water, read_ids in cls.objects.filter(user=user).values_list(
+                    'board_id', 'high_water', 'read_ids')
+            }
+            cache.set(key, markers, caches.timeout(settings.READ_MARKER_CACHE_TIMEOUT))
+        return markers
+
+    @staticmethod
+    def is_new(markers, post, user, since):
+        if post.author_id == user.pk or post.created_at < since:
+            return False
+        high_water, read_ids = markers.get(post.board_id, (0, frozenset()))
+        return post.id > high_water and post.id not in read_ids
+
+    @classmethod
+    def flag_new(cls, posts, user):
+        """목록의 글마다 is_new 를 붙임 (추가 쿼리 없음, 표시는 캐시에서)"""
+        markers = cls.for_user(user)
+        since = cls.new_since()
+        for post in posts:
+            post.is_new = user.is_authenticated and cls.is_new(markers, post, user, since)
+        return posts
+
+    @classmethod
+    def unread_filter(cls, user):
+        """Board 에 Count(filter=...) 로 붙일 "안 읽은 새 글" 조건. 게시판별 high_water 를 OR 로 묶어서 쿼리 하나로 셈"""
+        markers = cls.for_user(user)
+        condition = Q(posts__is_active=True, posts__created_at__gte=cls.new_since()) & ~Q(posts__author_id=user.pk)
+        marked = {board_id: high_water for board_id, (high_water, _) in markers.items() if high_water}
+        if marked:
+            above = ~Q(id__in=list(marked))  # 표시가 없는 게시판은 high_water 0
+            for board_id, high_water in marked.items():
+                above |= Q(id=board_id, posts__id__gt=high_water)
+            condition &= above
+        read_ids = set().union(*(ids for _, ids in markers.values())) if markers else set()
+        if read_ids:
+            condition &= ~Q(posts__id__in=sorted(read_ids))
+        return condition
+
+    @classmethod
+    def mark_read(cls, user, post):
+        """글을 읽음으로 표시. 이미 읽은 글이면 DB 를 건드리지 않음 (상세 화면을 다시 열 때마다 쓰지 않게)"""
+        if not user.is_authenticated or not cls.is_new(cls.for_user(user), post, user, cls.new_since()):
+            return False
+        with transaction.atomic():
+            # 이 게시판에서 처음 읽는 글이면 행을 만듦. 두 요청이 동시에 처음 읽으면 unique 제약에 걸린 쪽이
+            # 먼저 만든 행을 잠그고 이어서 갱신 (get_or_create)
+            marker, created = cls.objects.select_for_update().get_or_create(
+                user=user, board_id=post.board_id, defaults={'read_ids': [post.id]})
+            if not created:
+                if post.id <= marker.high_water or post.id in marker.read_ids:
+                    return False
+                read_ids = sorted(set(marker.read_ids) | {post.id})
+                # 너무 길어지면 작은 id 부터 high_water 로 접어 넣음 (그 사이 안 읽은 오래된 글은 읽은 것으로 봄)
+                overflow = len(read_ids) - settings.READ_MARKER_MAX_IDS
+                if overflow > 0:
+                    marker.high_water = read_ids[overflow - 1]
+                    read_ids = read_ids[overflow:]
+                marker.read_ids = read_ids
+                marker.save()
+        cache.delete(cls.cache_key(user.pk))
+        return True
+
+    @classmethod
+    def mark_board_read(cls, user, board):
+        """게시판의 지금까지 글을 모두 읽음으로 (high_water 를 최신 글 id 로 올리고 read_ids 는 비움)"""
+        latest = Post.all_objects.filter(board=board).aggregate(latest=models.Max('id'))['latest'] or 0
+        cls.objects.update_or_create(user=user, board=board, defaults={'high_water': latest, 'read_ids': []})
+        cache.delete(cls.cache_key(user.pk))
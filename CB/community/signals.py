@@ -1,29 +1,67 @@
-from django.db.models.signals import post_save
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete, pre_delete, m2m_changed
 from django.dispatch import receiver
-from django.contrib.auth import get_user_model
-from .models import Post, Notification
-
-User = get_user_model()
+from accounts.models import Department, Rank
+from .models import ArchivedPost, Board, Post
+from .tasks import fan_out_notice, make_attachment_thumbnail
 
+# 공지 알림/첨부 썸네일은 작업 큐에 넣기만 함 (community/tasks.py).
+# 작업 행도 글과 같은 트랜잭션에서 INSERT 되므로, 글 저장이 취소되면 작업도 남지 않음
 @receiver(post_save, sender=Post)
 def create_notice_notification(sender, instance, created, **kwargs):
-    if created and instance.board.name == '공지사항':
-        # ★ 변경점: 작성자에게 직급이 있을 때만 로직 실행
-        if instance.author.rank:
-            author_level = instance.author.rank.level
-            
-            # ★ 변경점: DB 쿼리 수정 (rank__level__lt 사용)
-            # "유저의 rank의 level이 작성자의 level보다 작은 사람"
-            recipients = User.objects.filter(rank__level__lt=author_level)
-            
-            notifications = []
-            for user in recipients:
-                notifications.append(
-                    Notification(
-                        recipient=user,
-                        sender=instance.author,
-                        message=f"📢 [공지] {instance.title}",
-                        link=f"/community/post/{instance.id}/"
-                    )
-                )
-            Notification.objects.bulk_create(notifications)
\ No newline at end of file
+    if created and instance.board.name == '공지사항' and instance.author.rank_id:
+        fan_out_notice.enqueue(instance.id, key=f"notice:{instance.id}")
+
+# 이미지 첨부파일은 업로드 직후 상세 화면용 축소본을 미리 만들어 둠
+@receiver(post_save, sender=Post)
+def create_attachment_thumbnail(sender, instance, created, **kwargs):
+    if created and instance.is_image_file:
+        make_attachment_thumbnail.enqueue(instance.id)
+
+
+# 첨부파일 참조 반납: 글이 지워지면 저장소 참조 횟수를 내림 (같은 내용의 마지막 글이면 파일도 삭제, community/storage.py).
+# 트랜잭션이 취소되면 글이 남으므로 커밋 뒤에 지움.
+# 보관(ops/archive.py)으로 옮겨진 글은 ArchivedPost 가 같은 파일을 계속 쓰므로 반납하지 않음
+@receiver(post_delete, sender=Post)
+@receiver(post_delete, sender=ArchivedPost)
+def release_attachment(sender, instance, **kwargs):
+    if not instance.file:
+        return
+    if sender is Post and ArchivedPost.objects.filter(pk=instance.pk, file=instance.file.name).exists():
+        return
+    file = instance.file
+    transaction.on_commit(lambda: file.delete(save=False))
+
+
+# 게시판 권한 캐시 무효화 (Board.access_rules)
+@receiver(post_save, sender=Board)
+@receiver(post_delete, sender=Board)
+def clear_board_acl_on_save(sender, instance, **kwargs):
+    cache.delete(Board.acl_cache_key(instance.pk))
+
+
+@receiver(m2m_changed, sender=Board.read_access_depts.through)
+@receiver(m2m_changed, sender=Board.read_access_ranks.through)
+@receiver(m2m_changed, sender=Board.write_access_depts.through)
+@receiver(m2m_changed, sender=Board.write_access_ranks.through)
+def clear_board_acl_on_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        board_ids = [instance.pk]
+    elif pk_set is not None:
+        board_ids = pk_set # 부서/직급 쪽에서 게시판 목록을 바꾼 경우
+    else:
+        # 역방향 clear는 어떤 게시판이었는지 알 수 없으므로 전부 지움 (드문 경우)
+        board_ids = Board.objects.values_list('id', flat=True)
+    cache.delete_many([Board.acl_cache_key(board_id) for board_id in board_ids])
+
+
+# 부서/직급이 삭제되면 연결된 권한 행도 같이 지워지지만 m2m_changed 신호는 오지 않으므로 직접 지워줌
+@receiver(pre_delete, sender=Department)
+@receiver(pre_delete, sender=Rank)
+def clear_board_acl_on_delete(sender, instance, **kwargs):
+    board_ids = set(instance.read_boards.values_list('id', flat=True))
+    board_ids |= set(instance.write_boards.values_list('id', flat=True))
+    cache.delete_many([Board.acl_cache_key(board_id) for board_id in board_ids])
@@ -0,0 +1,280 @@
+"""
+첨부파일 저장소 (내용 주소 방식 + 로컬 읽기 캐시)
+
+- 파일은 SHA-256 해시 이름으로 한 번만 저장 → 같은 PDF를 여러 게시판에 올려도 EFS에는 1개
+- 참조 횟수(refs)를 세어서 마지막 게시글이 지워질 때만 실제 파일 삭제
+- EFS(NFS)는 느리므로 읽을 때는 인스턴스 로컬 디스크 캐시(LRU, 최대 용량 제한)를 먼저 봄
+- location / cache_location 은 일반 디렉터리라면 무엇이든 가능 (테스트 시 EFS 대신 임시 폴더 사용)
+
+저장되는 이름: "cas/<sha256>/<원래 파일명>"
+예전 방식으로 저장된 파일(community/files/...)은 legacy_location(MEDIA_ROOT)에서 그대로 읽는다.
+"""
+import hashlib
+import os
+import re
+import shutil
+import tempfile
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage, Storage, storages
+from django.utils.deconstruct import deconstructible
+from django.utils.encoding import filepath_to_uri
+
+from accounts.thumbnails import ensure_variant
+
+try:
+    import fcntl
+except ImportError:  # Windows 개발 환경
+    fcntl = None
+
+CAS_NAME_RE = re.compile(r'^cas/([0-9a-f]{64})/(.+)$')
+MAX_BASENAME = 150  # "cas/<해시 64자>/" + 파일명이 FileField max_length(255) 안에 들어가도록
+
+
+def get_attachment_storage():
+    # Post.file 에서 사용. settings.STORAGES 에 'attachments' 가 없으면 기본 저장소 사용
+    if 'attachments' in settings.STORAGES:
+        return storages['attachments']
+    return storages['default']
+
+
+def get_preview_storage():
+    # 첨부 이미지 축소본. 권한 확인 없이 열리는 thumbs/(기본 저장소) 에는 두지 않음
+    return storages['attachment_previews']
+
+
+def attachment_preview(field_file, size):
+    """첨부 이미지 축소본의 (저장소, 이름). 없으면 만듦. 원본 이름 → 축소본 이름은 캐시해서 두 번째부터는 원본을 읽지 않음"""
+    storage = get_preview_storage()
+    key = f"attachment_preview:{field_file.name}:{size}"
+    name = cache.get(key)
+    if name is None:
+        name = ensure_variant(field_file, size, crop=False, storage=storage)
+        cache.set(key, name, None)  # 이름이 원본 내용 해시라 바뀌지 않음
+    return storage, name
+
+
+@deconstructible
+class ContentAddressedStorage(Storage):
+    def __init__(self, location=None, base_url=None, cache_location=None,
+                 cache_max_bytes=1024 ** 3, legacy_location=None):
+        self.location = os.path.abspath(location or os.path.join(settings.MEDIA_ROOT, 'cas'))
+        self.base_url = base_url if base_url is not None else settings.MEDIA_URL
+        self.cache_location = os.path.abspath(cache_location) if cache_location else None
+        self.cache_max_bytes = cache_max_bytes
+        self.legacy = FileSystemStorage(location=legacy_location or settings.MEDIA_ROOT)
+
+        self._cache_lock = threading.Lock()
+        self._cache_bytes = None  # 처음 쓸 때 디렉터리를 훑어서 계산
+
+    # ---------- 경로 ----------
+    def _blob_path(self, digest):
+        return os.path.join(self.location, 'blobs', digest[:2], digest)
+
+    def _ref_path(self, digest):
+        return os.path.join(self.location, 'refs', digest[:2], digest)
+
+    def _cache_path(self, digest):
+        return os.path.join(self.cache_location, digest[:2], digest)
+
+    def _split(self, name):
+        m = CAS_NAME_RE.match(name.replace('\\', '/'))
+        return m.group(1) if m else None
+
+    # ---------- 참조 횟수 ----------
+    @contextmanager
+    def _locked_refs(self, digest):
+        """refs 파일을 잠그고 (현재 값, 저장 함수)를 넘겨줌. 저장과 삭제가 동시에 일어나도 안전"""
+        path = self._ref_path(digest)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if fcntl:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+            raw = os.read(fd, 32).strip()
+            count = int(raw) if raw else 0
+
+            def write(value):
+                os.lseek(fd, 0, os.SEEK_SET)
+                os.ftruncate(fd, 0)
+                os.write(fd, str(value).encode())
+                os.fsync(fd)
+
+            yield count, write
+        finally:
+            os.close(fd)  # close 하면 잠금도 풀림
+
+    def ref_count(self, name):
+        digest = self._split(name)
+        try:
+            with open(self._ref_path(digest)) as f:
+                return int(f.read().strip() or 0)
+        except (FileNotFoundError, ValueError, TypeError):
+            return 0
+
+    # ---------- 저장 ----------
+    def get_available_name(self, name, max_length=None):
+        return name  # 실제 이름은 _save 에서 내용 해시로 정해짐
+
+    def _save(self, name, content):
+        basename = os.path.basename(name)
+        if len(basename) > MAX_BASENAME:
+            root, ext = os.path.splitext(basename)
+            basename = root[:MAX_BASENAME - len(ext)] + ext
+        # 1) 로컬 임시 파일에 조금씩 쓰면서 동시에 해시 계산 (메모리에 전체를 올리지 않음)
+        tmp_dir = self.cache_location or os.path.join(self.location, 'tmp')
+        os.makedirs(tmp_dir, exist_ok=True)
+        sha = hashlib.sha256()
+        size = 0
+        fd, tmp_path = tempfile.mkstemp(dir=tmp_dir, suffix='.upload')
+        try:
+            with os.fdopen(fd, 'wb') as tmp:
+                if hasattr(content, 'seek'):
+                    content.seek(0)
+                for chunk in content.chunks():
+                    sha.update(chunk)
+                    tmp.write(chunk)
+                    size += len(chunk)
+            digest = sha.hexdigest()
+
+            # 2) 같은 내용이 이미 있으면 EFS에 다시 쓰지 않고 참조 횟수만 올림
+            with self._locked_refs(digest) as (count, write_refs):
+                blob = self._blob_path(digest)
+                if not os.path.exists(blob):
+                    os.makedirs(os.path.dirname(blob), exist_ok=True)
+                    remote_tmp = f"{blob}.{os.getpid()}.{threading.get_ident()}.tmp"
+                    shutil.copyfile(tmp_path, remote_tmp)
+                    os.replace(remote_tmp, blob)
+                write_refs(count + 1)
+
+            # 3) 방금 올린 파일은 곧 읽힐 가능성이 높으므로 로컬 캐시로 옮겨둠
+            if self.cache_location and size <= self.cache_max_bytes:
+                cached = self._cache_path(digest)
+                os.makedirs(os.path.dirname(cached), exist_ok=True)
+                os.replace(tmp_path, cached)
+                tmp_path = None
+                self._account_cache(size)
+        finally:
+            if tmp_path and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+        return f"cas/{digest}/{basename}"
+
+    def delete(self, name):
+        digest = self._split(name)
+        if digest is None:
+            return self.legacy.delete(name)
+
+        with self._locked_refs(digest) as (count, write_refs):
+            if count > 1:
+                write_refs(count - 1)
+                return
+            # refs 파일은 0 으로 두고 지우지 않음. 잠금을 푼 뒤 지우면 그 사이 같은 내용을 저장하던 쪽이
+            # 지워질 파일(inode)을 잠그고 1 을 써서 참조가 사라짐
+            write_refs(0)
+            for path in (self._blob_path(digest), self._cache_path(digest) if self.cache_location else None):
+                if path and os.path.exists(path):
+                    os.remove(path)
+
+    # ---------- 읽기 ----------
+    def _open(self, name, mode='rb'):
+        digest = self._split(name)
+        if digest is None:
+            return self.legacy.open(name, mode)
+        # FieldFile 은 닫았다가 다시 열 때 file.open() 을 부르므로 실제 경로를 가진 django File 로 감쌈
+        return File(open(self._read_path(digest), mode))
+
+    def _read_path(self, digest):
+        blob = self._blob_path(digest)
+        if not self.cache_location:
+            return blob
+
+        cached = self._cache_path(digest)
+        try:
+            os.utime(cached)  # 최근 사용 시각 갱신 (LRU 기준)
+            return cached
+        except FileNotFoundError:
+            pass
+
+        size = os.path.getsize(blob)
+        if size > self.cache_max_bytes:
+            return blob  # 캐시보다 큰 파일은 그냥 EFS에서 읽음
+
+        os.makedirs(os.path.dirname(cached), exist_ok=True)
+        tmp = f"{cached}.{os.getpid()}.{threading.get_ident()}.tmp"
+        shutil.copyfile(blob, tmp)
+        os.replace(tmp, cached)
+        self._account_cache(size)
+        return cached
+
+    def _account_cache(self, added):
+        with self._cache_lock:
+            if self._cache_bytes is None:
+                self._cache_bytes = sum(size for _, size, _ in self._scan_cache())
+            else:
+                self._cache_bytes += added
+            if self._cache_bytes > self.cache_max_bytes:
+                self._evict()
+
+    def _scan_cache(self):
+        for root, _, files in os.walk(self.cache_location):
+            for filename in files:
+                if filename.endswith(('.tmp', '.upload')):
+                    continue
+                path = os.path.join(root, filename)
+                try:
+                    st = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                yield path, st.st_size, st.st_mtime
+
+    def _evict(self):
+        # 오래 안 쓴 파일부터 지워서 최대 용량의 90%까지 줄임 (다른 워커가 쓴 파일도 포함해서 다시 계산)
+        entries = sorted(self._scan_cache(), key=lambda e: e[2])
+        total = sum(size for _, size, _ in entries)
+        target = self.cache_max_bytes * 0.9
+        for path, size, _ in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except FileNotFoundError:
+                pass
+        self._cache_bytes = total
+
+    # ---------- 정보 ----------
+    def content_digest(self, name):
+        """저장된 이름에 들어 있는 내용 해시 (예전 방식 파일은 None). 축소본 이름에 씀 (accounts/thumbnails.py)"""
+        return self._split(name)
+
+    def exists(self, name):
+        digest = self._split(name)
+        if digest is None:
+            return self.legacy.exists(name)
+        return os.path.exists(self._blob_path(digest))
+
+    def path(self, name):
+        digest = self._split(name)
+        if digest is None:
+            return self.legacy.path(name)
+        return self._blob_path(digest)
+
+    def size(self, name):
+        return os.path.getsize(self.path(name))
+
+    def get_modified_time(self, name):
+        return datetime.fromtimestamp(os.path.getmtime(self.path(name)), tz=timezone.utc)
+
+    def url(self, name):
+        digest = self._split(name)
+        if digest is None:
+            return self.legacy.url(name)
+        # 실제 blob 위치를 MEDIA_URL 기준으로 돌려줌 (보통은 post_download 뷰를 거쳐서 내려받음)
+        relative = os.path.relpath(self._blob_path(digest), self.legacy.location)
+        return self.base_url.rstrip('/') + '/' + filepath_to_uri(relative)
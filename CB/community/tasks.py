@@ -0,0 +1,94 @@
+"""
+게시판 백그라운드 작업 (ops/taskqueue.py)
+
+요청/신호에서는 .enqueue(...) 로 넣기만 하고, 받는 사람이 많은 공지 알림이나 이미지 축소처럼 오래 걸리는 일은 워커가 처리.
+워커가 중간에 죽으면 같은 작업이 다시 실행될 수 있으므로 두 번 실행해도 결과가 같게 작성
+"""
+import logging
+import re
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+
+from accounts.thumbnails import RENDER_ERRORS
+from ops import metrics
+from ops.taskqueue import task
+from .models import Comment, Notification, Post
+from .storage import attachment_preview
+
+logger = logging.getLogger(__name__)
+User = get_user_model()
+
+MENTION_PATTERN = re.compile(r'@(\w+)')
+
+
+@task(queue='notifications')
+def fan_out_notice(post_id):
+    """공지 글 알림을 작성자보다 직급이 낮은 사원 모두에게 보냄"""
+    post = Post.objects.select_related('author__rank').filter(id=post_id).first()
+    if post is None or post.author.rank is None:
+        return
+    # 받는 사람 id 만 읽어서 한 번에 INSERT. 글마다 group_key/window_start 가 같아서(고유 제약)
+    # 다시 실행되면 이미 받은 사람은 건너뜀
+    recipient_ids = list(User.objects.filter(rank__level__lt=post.author.rank.level).values_list('id', flat=True))
+    with transaction.atomic():
+        Notification.objects.bulk_create([
+            Notification(
+                recipient_id=recipient_id,
+                sender_id=post.author_id,
+                message=f"📢 [공지] {post.title}",
+                link=f"/community/post/{post.id}/",
+                group_key=f"notice:{post.id}",
+                window_start=post.created_at,
+            )
+            for recipient_id in recipient_ids
+        ], batch_size=1000, ignore_conflicts=True)
+    metrics.NOTIFICATION_FANOUT.observe(len(recipient_ids), kind='notice')
+
+
+def mention_message(actors, count, excerpt):
+    if count == 1:
+        return f"💬 {actors[0]}님이 댓글에서 언급했습니다: {excerpt}..."
+    if len(actors) == 1:
+        return f"💬 {actors[0]}님이 댓글에서 {count}번 언급했습니다"
+    return f"💬 {actors[0]}님 외 {len(actors) - 1}명이 댓글에서 언급했습니다"
+
+
+@task(queue='notifications')
+def notify_mentions(comment_id):
+    """댓글의 @닉네임 에게 알림. 같은 글에서 짧은 시간에 여러 번 언급되면 알림 한 줄로 묶음 ("김부장님 외 4명이 ...")"""
+    comment = Comment.objects.select_related('author').filter(id=comment_id).first()
+    if comment is None:
+        return
+    nicknames = set(MENTION_PATTERN.findall(comment.content))
+    # 본인이 본인을 멘션한 건 알림 제외, 없는 닉네임은 무시
+    targets = User.objects.filter(nickname__in=nicknames).exclude(pk=comment.author_id)
+    excerpt = comment.content[:20]
+    notified = 0
+    for target_user in targets:
+        Notification.coalesce(
+            recipient=target_user,
+            sender=comment.author,
+            group_key=f"mention:post:{comment.post_id}",
+            render=lambda actors, count: mention_message(actors, count, excerpt),
+            link=f"/community/post/{comment.post_id}/",
+            source=comment.id,  # 중간에 실패해서 다시 실행돼도 이미 받은 사람은 세지 않음
+        )
+        notified += 1
+    if notified:
+        metrics.NOTIFICATION_FANOUT.observe(notified, kind='mention')
+
+
+@task(queue='media', max_attempts=3)
+def make_attachment_thumbnail(post_id):
+    """이미지 첨부파일의 상세 화면용 축소본을 미리 만들어 둠 (이미 있으면 건너뜀)"""
+    post = Post.all_objects.filter(id=post_id).first()
+    if post is None or not post.is_image_file:
+        return
+    for size in settings.ATTACHMENT_PREVIEW_SIZES:
+        try:
+            attachment_preview(post.file, size)
+        except RENDER_ERRORS as e:  # 깨진/너무 큰 이미지는 다시 해도 같으므로 재시도하지 않음 (화면은 원본을 보여줌)
+            logger.warning("첨부 축소본 생성 실패 (%s): %s", post.file.name, e)
+            return
@@ -1,3 +1,997 @@
-from django.test import TestCase
+import gzip
+import hashlib
+import io
+import json
+import os
+import shutil
+import subprocess
+import sys
+import urllib.error
+import urllib.request
+import tempfile
+import threading
+import time
+import uuid
+import zlib
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import DatabaseError
+from django.db.models import QuerySet
+from django.http import HttpResponse, StreamingHttpResponse
+from django.templatetags.static import static
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from PIL import Image
+
+from accounts.models import Department, Rank
+from ops import archive, caches, compression, metrics, minify, perfsuite, querybudget, ratelimit, retention, taskqueue, uploads
+from ops.objectstore import ObjectStorage, ObjectStoreError
+from ops.objectstore_standin import make_server
+from ops.views import static_file
+from ops.models import Task
+from .models import ArchivedComment, ArchivedPost, Board, Comment, Notification, Post, ReadMarker, UploadSession
+from .storage import ContentAddressedStorage, attachment_preview
+from .tasks import fan_out_notice, notify_mentions
+
+
+# 요청당 쿼리 수 (ops/perfsuite.py). 사원(restricted)은 사이드바의 부서/직급 조회 2개가 더 붙음
+class CommunityQueryCountTests(perfsuite.QueryCountTestCase):
+    urlconf = 'community.urls'
+    expected = {
+        # 게시판 + 글 수/새 글 수(annotate) + 읽기 부서(prefetch) + 읽음 표시(캐시가 비어 있을 때 1번, 다른 화면은 캐시)
+        'board_list': {'admin': 5, 'restricted': 7, 'norank': 5},
+        'post_list': {'admin': 5, 'restricted': 7, 'norank': 5},        # 글 수 COUNT + 한 페이지 (작성자/소속/댓글 수 JOIN)
+        'post_create': {'admin': 3, 'restricted': 5, 'norank': 3},
+        'board_mark_read': 1,                                           # GET 은 405
+        'upload_init': 1,                                               # GET 은 405
+        'upload_chunk': 2,
+        'upload_finalize': 1,                                           # GET 은 405
+        'post_detail': {'admin': 5, 'restricted': 7, 'norank': 5},      # 글(JOIN) + 조회수 UPDATE + 댓글(JOIN)
+        'post_download': 2,                                             # 첨부 없음 → 404
+        'comment_create': 3,                                            # GET 은 상세로 이동
+        'comment_delete': 5,
+        'post_delete': 5,
+        'all_posts': {'admin': 4, 'restricted': 6, 'norank': 4},
+    }
+    # 예전 쪽지 화면: 템플릿이 없고, URL 이름이 messenger 앱과 같아서 reverse 로는 messenger 화면이 나옴
+    broken = {
+        'inbox': "community/inbox.html 템플릿이 없음",
+        'send_message': "community/send_message.html 템플릿이 없음",
+        'view_message': "community/view_message.html 템플릿이 없음",
+    }
+
+
+# 알림 보관 기간 정리 (ops/retention.py)
+class NotificationRetentionTests(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.alice = User.objects.create_user('retention_alice', password='x', nickname='alice')
+        self.bob = User.objects.create_user('retention_bob', password='x', nickname='bob')
+
+    def notify(self, recipient, days_ago, is_read):
+        # created_at 은 auto_now_add 라서 만든 뒤 UPDATE 로 옮김 (id 순서 = 오래된 순서가 되도록 호출)
+        n = Notification.objects.create(recipient=recipient, message='알림', is_read=is_read)
+        Notification.objects.filter(pk=n.pk).update(created_at=timezone.now() - timedelta(days=days_ago))
+        return n
+
+    def test_purges_read_and_rolls_up_unread(self):
+        for _ in range(3):
+            self.notify(self.alice, 200, is_read=False)
+        self.notify(self.bob, 200, is_read=False)
+        self.notify(self.alice, 100, is_read=True)
+        kept_unread = self.notify(self.alice, 40, is_read=False)   # 요약 기준(90일)보다 최근
+        self.notify(self.bob, 40, is_read=True)
+        kept_read = self.notify(self.bob, 5, is_read=True)          # 삭제 기준(30일)보다 최근
+
+        result = retention.run(read_days=30, unread_days=90, batch_size=2, sleep=0)
+
+        self.assertEqual((result.purged, result.rolled_up, result.summaries), (2, 4, 2))
+        alice_summary = Notification.objects.get(recipient=self.alice, rollup_count__gt=0)
+        self.assertEqual(alice_summary.rollup_count, 3)
+        self.assertEqual(alice_summary.message, retention.summary_message(3))
+        self.assertEqual(
+            set(Notification.objects.filter(rollup_count=0).values_list('pk', flat=True)),
+            {kept_unread.pk, kept_read.pk},
+        )
+
+    def test_second_run_adds_to_existing_summary(self):
+        self.notify(self.alice, 200, is_read=False)
+        retention.run(read_days=30, unread_days=90, sleep=0)
+        self.notify(self.alice, 150, is_read=False)
+        self.notify(self.alice, 120, is_read=False)
+        retention.run(read_days=30, unread_days=90, sleep=0)
+
+        summary = Notification.objects.get(recipient=self.alice)
+        self.assertEqual(summary.rollup_count, 3)
+
+    def test_dry_run_deletes_nothing(self):
+        self.notify(self.alice, 200, is_read=True)
+        self.notify(self.alice, 200, is_read=False)
+        result = retention.run(read_days=30, unread_days=90, sleep=0, dry_run=True)
+        self.assertEqual((result.purged, result.rolled_up), (1, 1))
+        self.assertEqual(Notification.objects.count(), 2)
+# 묶음 알림 (Notification.coalesce): 같은 글의 멘션, 받은 쪽지는 시간 구간마다 한 행
+
+# 묶음 알림 (Notification.coalesce): 같은 글의 멘션은 시간 구간마다 한 행
+class MentionCoalescingTests(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.alice = User.objects.create_user('coalesce_alice', password='x', nickname='alice')
+        self.bob = User.objects.create_user('coalesce_bob', password='x', nickname='bob')
+        self.carol = User.objects.create_user('coalesce_carol', password='x', nickname='carol')
+        board = Board.objects.create(name='coalesce', slug='coalesce')
+        self.post = Post.objects.create(board=board, author=self.alice, title='t', content='c')
+        ratelimit.reset()
+        cache.clear()
+
+    def mention(self, author, text='@alice 확인 부탁'):
+        self.client.force_login(author)
+        self.client.post(reverse('comment_create', args=[self.post.id]), {'content': text})
+
+    def test_burst_merges_into_one_row(self):
+        for _ in range(3):
+            self.mention(self.bob)
+        self.mention(self.carol)
+        self.mention(self.alice)  # 자기 자신 멘션은 알림 없음
+
+        notification = Notification.objects.get(recipient=self.alice)
+        self.assertEqual(notification.count, 4)
+        self.assertEqual(notification.actors, ['carol', 'bob'])
+        self.assertEqual(notification.message, "💬 carol님 외 1명이 댓글에서 언급했습니다")
+
+    def test_retried_task_does_not_double_count(self):
+        self.mention(self.bob)
+        comment = Comment.objects.get(author=self.bob)
+        notify_mentions(comment.id)  # 워커가 죽어서 같은 작업이 다시 실행된 경우
+        self.mention(self.carol)
+        notify_mentions(comment.id)
+
+        notification = Notification.objects.get(recipient=self.alice)
+        self.assertEqual((notification.count, notification.actors), (2, ['carol', 'bob']))
+
+    def test_read_group_starts_over(self):
+        self.mention(self.bob)
+        self.mention(self.bob)
+        Notification.objects.filter(recipient=self.alice).update(is_read=True)
+        self.mention(self.carol, '@alice 새 소식')
+
+        notification = Notification.objects.get(recipient=self.alice)
+        self.assertEqual((notification.count, notification.actors, notification.is_read), (1, ['carol'], False))
+        self.assertEqual(notification.message, "💬 carol님이 댓글에서 언급했습니다: @alice 새 소식...")
+
+
+    def test_messages_merge_into_one_row(self):
+        for author in (self.bob, self.bob, self.carol):
+            self.client.force_login(author)
+            # URL 이름 send_message 는 messenger 앱이 가져가므로 경로로 보냄
+            self.client.post('/community/send/', {'recipient': self.alice.id, 'content': '확인 부탁'})
+
+        notification = Notification.objects.get(recipient=self.alice)
+        self.assertEqual((notification.count, notification.actors), (3, ['carol', 'bob']))
+        self.assertEqual(notification.message, "📩 carol님 외 1명이 쪽지를 3통 보냈습니다.")
+        self.assertEqual(len(notification.sources), 3)
+
+
+# 게시글 보관 (ops/archive.py): 숨김 글은 목록에서 빠지고, 보관된 오래된 글은 예전 링크로 계속 열림
+class PostArchiveTests(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.user = User.objects.create_user('archive_user', password='x', nickname='archiver')
+        self.board = Board.objects.create(name='archive', slug='archive')
+        self.client.force_login(self.user)
+
+    def post(self, title, days_ago=0, is_active=True):
+        post = Post.objects.create(board=self.board, author=self.user, title=title, content='본문', is_active=is_active)
+        Comment.objects.create(post=post, author=self.user, content=f'{title} 댓글')
+        moment = timezone.now() - timedelta(days=days_ago)
+        Post.all_objects.filter(pk=post.pk).update(created_at=moment, updated_at=moment)
+        return post
+
+    def test_inactive_posts_are_hidden(self):
+        self.post('보이는 글')
+        hidden = self.post('숨긴 글', is_active=False)
+        self.assertEqual(list(self.board.posts.values_list('title', flat=True)), ['보이는 글'])
+        self.assertNotContains(self.client.get(reverse('post_list', args=[self.board.slug])), '숨긴 글')
+        self.assertEqual(self.client.get(reverse('post_detail', args=[hidden.id])).status_code, 404)
+
+    def test_archiver_moves_old_and_deleted_posts(self):
+        recent = self.post('최근 글', days_ago=1)
+        old = self.post('오래된 글', days_ago=1000)
+        deleted = self.post('삭제된 글', days_ago=30, is_active=False)
+
+        result = archive.run(old_days=730, deleted_days=7, batch_size=1, sleep=0)
+
+        self.assertEqual((result.posts, result.comments), (2, 2))
+        self.assertEqual(list(Post.all_objects.values_list('id', flat=True)), [recent.id])
+        self.assertEqual(ArchivedPost.objects.get(id=old.id).reason, ArchivedPost.REASON_OLD)
+        self.assertEqual(ArchivedPost.objects.get(id=deleted.id).reason, ArchivedPost.REASON_DELETED)
+        # 다시 실행해도 옮길 글이 없음
+        self.assertEqual(archive.run(old_days=730, deleted_days=7, sleep=0).posts, 0)
+
+        response = self.client.get(reverse('post_detail', args=[old.id]))
+        self.assertContains(response, '오래된 글 댓글')
+        self.assertContains(response, '보관된 글')
+        self.assertEqual(self.client.get(reverse('post_detail', args=[deleted.id])).status_code, 404)
+
+    def test_conflicting_archive_ids_stay_in_place(self):
+        post = self.post('재사용된 id', days_ago=1000)
+        clash = self.post('댓글 id 충돌', days_ago=1000)
+        moment = timezone.now()
+        ArchivedPost.objects.create(id=post.id, board=self.board, author=self.user, title='예전 글', content='c',
+                                    created_at=moment, updated_at=moment, reason=ArchivedPost.REASON_OLD)
+        other = ArchivedPost.objects.create(id=post.id + 1000, board=self.board, author=self.user, title='다른 글',
+                                            content='c', created_at=moment, updated_at=moment,
+                                            reason=ArchivedPost.REASON_OLD)
+        ArchivedComment.objects.create(id=clash.comments.get().id, post=other, author=self.user, content='c',
+                                       created_at=moment)
+
+        result = archive.run(old_days=730, deleted_days=7, sleep=0)
+
+        self.assertEqual((result.posts, result.skipped), (0, 2))
+        self.assertEqual(Post.all_objects.filter(id__in=[post.id, clash.id]).count(), 2)
+        self.assertEqual(Comment.objects.filter(post_id__in=[post.id, clash.id]).count(), 2)
+        self.assertEqual(ArchivedPost.objects.get(id=post.id).title, '예전 글')
+
+
+# 요청 제한 (ops/ratelimit.py): 댓글은 사용자별로 연달아 5개, 이후 분당 20개
+class RateLimitTests(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.user = User.objects.create_user('ratelimit_user', password='x', nickname='limited')
+        self.other = User.objects.create_user('ratelimit_other', password='x', nickname='other')
+        board = Board.objects.create(name='ratelimit', slug='ratelimit')
+        self.post = Post.objects.create(board=board, author=self.user, title='t', content='c')
+        self.url = reverse('comment_create', args=[self.post.id])
+        ratelimit.reset()
+        cache.clear()
+
+    def comment(self, user):
+        self.client.force_login(user)
+        return self.client.post(self.url, {'content': '댓글'})
+
+    def test_burst_then_429_with_retry_after(self):
+        statuses = [self.comment(self.user).status_code for _ in range(6)]
+        self.assertEqual(statuses, [302] * 5 + [429])
+        response = self.comment(self.user)
+        self.assertGreaterEqual(int(response['Retry-After']), 1)
+        self.assertEqual(Comment.objects.count(), 5)
+        self.assertEqual(self.comment(self.other).status_code, 302)  # 다른 사용자는 따로 셈
+
+    def test_bucket_refills(self):
+        bucket = ratelimit.LocalBuckets()
+        self.assertEqual([bucket.take('k', 1.0, 2, now=0) for _ in range(3)], [0, 0, 1.0])
+        self.assertEqual(bucket.take('k', 1.0, 2, now=1.5), 0)
+
+    @override_settings(ADMISSION_MAX_WRITES=1, ADMISSION_QUEUE_TIMEOUT=0)
+    def test_writes_are_shed_when_slots_are_full(self):
+        self.client.force_login(self.user)
+        slots = ratelimit.AdmissionMiddleware(lambda request: None).slots
+        held = slots.acquire(0)
+        try:
+            response = self.client.post(self.url, {'content': '댓글'})
+        finally:
+            slots.release(held)
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response['Retry-After'], '1')
+        self.assertEqual(self.client.post(self.url, {'content': '댓글'}).status_code, 302)
+
+
+# 백그라운드 작업 큐 (ops/taskqueue.py): 요청은 작업 행만 넣고, 워커가 가져가서 실행
+@override_settings(TASK_ALWAYS_EAGER=False)
+class TaskQueueTests(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.boss = User.objects.create_user('task_boss', password='x', nickname='boss',
+                                             rank=Rank.objects.create(name='부장', level=50))
+        staff = Rank.objects.create(name='사원', level=10)
+        for i in range(3):
+            User.objects.create_user(f'task_staff{i}', password='x', nickname=f'staff{i}', rank=staff)
+        self.board = Board.objects.create(name='공지사항', slug='notice')
+        self.calls = []
+
+    def tearDown(self):
+        taskqueue.REGISTRY.pop('tests.flaky', None)
+
+    def work(self):
+        return [taskqueue.execute(t) for t in taskqueue.claim(['default', 'notifications'], 10, 'test')]
+
+    def test_notice_fan_out_runs_in_worker_once(self):
+        post = Post.objects.create(board=self.board, author=self.boss, title='점검 안내', content='c')
+        self.assertEqual(Notification.objects.count(), 0)  # 요청 안에서는 작업 행만 넣음
+        fan_out_notice.enqueue(post.id, key=f"notice:{post.id}")  # 같은 키는 다시 들어가지 않음
+        self.assertEqual(Task.objects.filter(name=fan_out_notice.name).count(), 1)
+
+        self.assertEqual(self.work(), ['done'])
+        self.assertEqual(self.work(), [])
+        self.assertEqual(Notification.objects.filter(message="📢 [공지] 점검 안내").count(), 3)
+        fan_out_notice(post.id)  # 워커가 죽어서 다시 실행돼도 알림은 그대로
+        self.assertEqual(Notification.objects.count(), 3)
+
+    def test_failed_task_backs_off_then_gives_up(self):
+        @taskqueue.task(name='tests.flaky', max_attempts=2, backoff=60)
+        def flaky(value):
+            self.calls.append(value)
+            raise ValueError(value)
+
+        flaky.enqueue('x')
+        with self.assertLogs('ops.taskqueue', 'WARNING'):
+            self.assertEqual(self.work(), ['retry'])
+        task = Task.objects.get(name='tests.flaky')
+        self.assertEqual((task.status, task.attempts), (Task.QUEUED, 1))
+        self.assertGreater(task.run_at, timezone.now() + timedelta(seconds=50))
+        self.assertIn('ValueError', task.last_error)
+        self.assertEqual(self.work(), [])  # 대기 시간이 지나기 전에는 가져가지 않음
+
+        Task.objects.update(run_at=timezone.now())
+        with self.assertLogs('ops.taskqueue', 'ERROR'):
+            self.assertEqual(self.work(), ['failed'])
+        self.assertEqual(Task.objects.get(name='tests.flaky').status, Task.FAILED)
+        self.assertEqual(self.calls, ['x', 'x'])
+
+    def test_periodic_task_is_enqueued_once_per_slot(self):
+        @taskqueue.task(name='tests.flaky', every=3600)
+        def hourly():
+            pass
+
+        now = timezone.now()
+        taskqueue.schedule_periodic(now)
+        taskqueue.schedule_periodic(now)  # 다른 워커가 같은 구간에 넣어도 한 행
+        self.assertEqual(Task.objects.filter(name='tests.flaky').count(), 1)
+        taskqueue.schedule_periodic(now + timedelta(hours=1))
+        self.assertEqual(Task.objects.filter(name='tests.flaky').count(), 2)
+
+    def test_stale_running_task_is_requeued(self):
+        fan_out_notice.enqueue(0)
+        self.assertEqual(len(taskqueue.claim(['notifications'], 10, 'dead-worker')), 1)
+        self.assertEqual(taskqueue.claim(['notifications'], 10, 'test'), [])
+        Task.objects.update(locked_at=timezone.now() - timedelta(hours=2))
+        self.assertEqual(taskqueue.requeue_stale(), 1)
+        self.assertEqual(self.work(), ['done'])
+
+    def test_stale_task_out_of_attempts_fails(self):
+        # 실행할 때마다 워커를 죽이는 작업이 계속 다시 들어가지 않게
+        fan_out_notice.enqueue(0)
+        Task.objects.update(max_attempts=1)
+        taskqueue.claim(['notifications'], 10, 'dead-worker')
+        Task.objects.update(locked_at=timezone.now() - timedelta(hours=2))
+        with self.assertLogs('ops.taskqueue', 'ERROR'):
+            self.assertEqual(taskqueue.requeue_stale(), 0)
+        task_row = Task.objects.get()
+        self.assertEqual((task_row.status, task_row.attempts), (Task.FAILED, 1))
+        self.assertTrue(task_row.last_error)
+
+    @override_settings(TASK_ALWAYS_EAGER=True)
+    def test_eager_mode_runs_inline(self):
+        Post.objects.create(board=self.board, author=self.boss, title='바로', content='c')
+        self.assertEqual(Task.objects.count(), 0)
+        self.assertEqual(Notification.objects.count(), 3)
+
+
+# 응답 크기 줄이기: 템플릿 공백 줄이기(ops/minify.py) + gzip(ops/compression.py)
+class ResponseSizeTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user('gzip_user', password='x', nickname='gzip')
+        board = Board.objects.create(name='gzip', slug='gzip')
+        for i in range(30):
+            Post.objects.create(board=board, author=self.user, title=f'글 {i}', content='c')
+        self.client.force_login(self.user)
+
+    def test_html_is_minified_and_compressed(self):
+        plain = self.client.get(reverse('all_posts'))
+        self.assertNotIn('Content-Encoding', plain)
+        self.assertNotIn('\n    <', plain.content.decode())  # 들여쓰기 없음
+
+        response = self.client.get(reverse('all_posts'), HTTP_ACCEPT_ENCODING='gzip, deflate, br')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertLess(len(response.content), len(plain.content) / 3)
+        body = gzip.decompress(response.content).decode()
+        self.assertIn('글 29', body)
+        self.assertEqual(int(response['Content-Length']), len(response.content))
+
+    def test_protected_blocks_keep_whitespace(self):
+        source = "<div>\n    <textarea>\n  a\n</textarea> <b>x</b>\n    {% if y %}\n\n  <i>y</i>\n    {% endif %}\n</div>"
+        self.assertEqual(minify.minify(source), "<div>\n<textarea>\n  a\n</textarea> <b>x</b>\n{% if y %}<i>y</i>\n{% endif %}</div>")
+
+    def test_streaming_is_flushed_per_chunk(self):
+        request = RequestFactory().get('/', HTTP_ACCEPT_ENCODING='gzip')
+        chunks = [b'<p>' + b'x' * 2000 + b'</p>', b'<p>end</p>']
+        middleware = compression.CompressionMiddleware(
+            lambda request: StreamingHttpResponse(iter(chunks), content_type='text/html'))
+        response = middleware(request)
+        parts = list(response.streaming_content)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(b''.join(parts)), b''.join(chunks))
+        # 첫 조각은 다음 조각을 기다리지 않고 바로 풀 수 있어야 함 (flush)
+        self.assertIn(b'x' * 2000, zlib.decompressobj(31).decompress(b''.join(parts[:2])))
+
+    def test_small_and_binary_responses_are_left_alone(self):
+        request = RequestFactory().get('/', HTTP_ACCEPT_ENCODING='gzip')
+        for response in (HttpResponse(b'<p>short</p>'), HttpResponse(b'0' * 5000, content_type='image/png')):
+            self.assertNotIn('Content-Encoding', compression.CompressionMiddleware(lambda request: response)(request))
+
+
+# 정적 파일 (ops/staticstorage.py): 해시 이름 + manifest + .gz + nginx include, nginx 가 없으면 static_file 뷰
+class StaticAssetTests(TestCase):
+    def test_collectstatic_writes_hashed_compressed_files(self):
+        with tempfile.TemporaryDirectory() as root, override_settings(STATIC_ROOT=root):
+            call_command('collectstatic', interactive=False, verbosity=0)
+            with open(os.path.join(root, 'staticfiles.json')) as f:
+                css = json.load(f)['paths']['css/style.css']
+            self.assertRegex(css, r'^css/style\.[0-9a-f]{12}\.css$')
+            self.assertTrue(os.path.exists(os.path.join(root, css + '.gz')))
+            self.assertLessEqual(os.path.getsize(os.path.join(root, 'img', 'logo.png')),
+                                 os.path.getsize(os.path.join('static', 'img', 'logo.png')))
+            with open(os.path.join(root, 'nginx-static.conf')) as f:
+                self.assertIn('immutable', f.read())
+
+            self.assertTrue(static('css/style.css').endswith(css))  # 템플릿의 {% static %} 도 해시 이름
+
+            request = RequestFactory().get('/', HTTP_ACCEPT_ENCODING='gzip')
+            response = static_file(request, css)
+            self.assertEqual(response['Cache-Control'], 'public, max-age=31536000, immutable')
+            self.assertEqual(response['Content-Encoding'], 'gzip')
+            response.close()
+            response = static_file(RequestFactory().get('/'), 'css/style.css')
+            self.assertEqual(response['Cache-Control'], 'public, max-age=3600')
+            self.assertNotIn('Content-Encoding', response)
+            response.close()
+
+
+# 읽음 표시 (ReadMarker): 게시판별 high_water + 그 위에서 읽은 id 목록으로 "새 글" 배지/게시판별 새 글 수
+class ReadMarkerTests(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.reader = User.objects.create_user('marker_reader', password='x', nickname='reader')
+        self.writer = User.objects.create_user('marker_writer', password='x', nickname='writer')
+        self.board = Board.objects.create(name='marker', slug='marker')
+        self.posts = [Post.objects.create(board=self.board, author=self.writer, title=f't{i}', content='c') for i in range(3)]
+        old = Post.objects.create(board=self.board, author=self.writer, title='old', content='c')
+        Post.objects.filter(pk=old.pk).update(created_at=timezone.now() - timedelta(days=30))
+        Post.objects.create(board=self.board, author=self.reader, title='mine', content='c')
+        cache.clear()
+        Board.prime_acl_cache()
+        self.client.force_login(self.reader)
+
+    def new_count(self):
+        boards = self.client.get(reverse('board_list')).context['boards']
+        return next(board.new_count for board in boards if board.pk == self.board.pk)
+
+    def new_titles(self):
+        posts = self.client.get(reverse('post_list', args=[self.board.slug])).context['posts']
+        return sorted(post.title for post in posts if post.is_new)
+
+    def test_reading_clears_badge_without_rewriting(self):
+        # 오래된 글/내 글은 새 글이 아님
+        self.assertEqual(self.new_titles(), ['t0', 't1', 't2'])
+        self.assertEqual(self.new_count(), 3)
+
+        self.client.get(reverse('post_detail', args=[self.posts[1].id]))
+        self.assertEqual(self.new_titles(), ['t0', 't2'])
+        self.assertEqual(self.new_count(), 2)
+
+        marker = ReadMarker.objects.get(user=self.reader, board=self.board)
+        self.client.get(reverse('post_detail', args=[self.posts[1].id]))  # 다시 열면 쓰지 않음
+        self.assertEqual(ReadMarker.objects.get(pk=marker.pk).updated_at, marker.updated_at)
+
+    @override_settings(READ_MARKER_MAX_IDS=1)
+    def test_read_ids_fold_into_high_water(self):
+        for post in self.posts[1:]:
+            self.client.get(reverse('post_detail', args=[post.id]))
+        marker = ReadMarker.objects.get(user=self.reader, board=self.board)
+        self.assertEqual((marker.high_water, marker.read_ids), (self.posts[1].id, [self.posts[2].id]))
+        self.assertEqual(self.new_titles(), [])  # t0 은 high_water 아래로 접혀서 읽은 것으로 봄
+
+    def test_detail_requires_login(self):
+        self.client.logout()
+        url = reverse('post_detail', args=[self.posts[0].id])
+        response = self.client.get(url)
+        self.assertRedirects(response, f"{reverse('login')}?next={url}", fetch_redirect_response=False)
+        self.assertFalse(ReadMarker.objects.exists())
+
+    @override_settings(READ_MARKER_CACHE_TIMEOUT=60, LOCAL_CACHE_MAX_TIMEOUT=10)
+    def test_markers_cached_briefly_on_local_cache(self):
+        # 다른 워커에서 읽은 표시는 그 워커의 캐시만 지우므로, 메모리 캐시면 몇 초 안에 다시 읽어야 함
+        cache.clear()
+        with mock.patch.object(cache, 'set', wraps=cache.set) as cache_set:
+            ReadMarker.for_user(self.reader)
+        self.assertEqual(cache_set.call_args.args[2], 10)
+
+    def test_mark_board_read(self):
+        self.client.post(reverse('board_mark_read', args=[self.board.slug]))
+        self.assertEqual(self.new_count(), 0)
+        newer = Post.objects.create(board=self.board, author=self.writer, title='newer', content='c')
+        self.assertEqual(self.new_titles(), ['newer'])
+        self.assertTrue(ReadMarker.mark_read(self.reader, newer))
+        self.assertEqual(ReadMarker.objects.get(user=self.reader, board=self.board).read_ids, [newer.id])
+
+    def test_concurrent_first_read(self):
+        # 다른 탭이 방금 표시 행을 만든 경우: 조회에서는 안 보였지만 INSERT 가 unique 제약에 걸림
+        ReadMarker.objects.create(user=self.reader, board=self.board, read_ids=[self.posts[0].id])
+        real_get = QuerySet.get
+        missed = []
+
+        def get(queryset, *args, **kwargs):
+            if queryset.model is ReadMarker and not missed:
+                missed.append(True)
+                raise ReadMarker.DoesNotExist
+            return real_get(queryset, *args, **kwargs)
+
+        with mock.patch.object(QuerySet, 'get', get):
+            self.assertTrue(ReadMarker.mark_read(self.reader, self.posts[1]))
+        self.assertTrue(missed)
+        marker = ReadMarker.objects.get(user=self.reader, board=self.board)
+        self.assertEqual(marker.read_ids, [self.posts[0].id, self.posts[1].id])
+
+
+# 메모리 캐시는 워커마다 따로라서 다른 워커의 캐시를 지울 수 없음 → 짧게만 보관하고 운영에서는 경고 (ops/caches.py)
+class CacheSharingTests(TestCase):
+    REDIS = {'default': {'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': 'redis://127.0.0.1:6379/1'}}
+
+    @override_settings(LOCAL_CACHE_MAX_TIMEOUT=10)
+    def test_local_cache_keeps_acl_briefly(self):
+        self.assertFalse(caches.is_shared())
+        self.assertEqual(caches.timeout(Board.ACL_CACHE_TIMEOUT), 10)
+        with override_settings(CACHES=self.REDIS):
+            self.assertTrue(caches.is_shared())
+            self.assertEqual(caches.timeout(Board.ACL_CACHE_TIMEOUT), Board.ACL_CACHE_TIMEOUT)
+
+    def test_check_warns_without_shared_cache(self):
+        with override_settings(DEBUG=False):
+            self.assertEqual([e.id for e in caches.check_shared_cache(None)], ['ops.W001'])
+            self.assertEqual([e.id for e in caches.check_ratelimit_cache(None)], ['ops.W002'])
+            with override_settings(CACHES=self.REDIS):
+                self.assertEqual(caches.check_shared_cache(None), [])
+                self.assertEqual(caches.check_ratelimit_cache(None), [])
+        with override_settings(DEBUG=True):
+            self.assertEqual(caches.check_shared_cache(None), [])
+
+
+# 첨부파일 테스트 공통: MEDIA_ROOT/첨부 저장소를 임시 폴더로 바꾸고, 과장만 읽을 수 있는 게시판을 만듦
+class AttachmentTestCase(TestCase):
+    def setUp(self):
+        root = tempfile.TemporaryDirectory()
+        self.addCleanup(root.cleanup)
+        self.root = root.name
+        media = override_settings(MEDIA_ROOT=self.root, STORAGES={
+            **settings.STORAGES,
+            'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+            'attachment_previews': {'BACKEND': 'django.core.files.storage.FileSystemStorage',
+                                    'OPTIONS': {'location': os.path.join(self.root, 'previews')}},
+        })
+        media.enable()
+        self.addCleanup(media.disable)
+        self.storage = self.attachment_storage()
+        for model in (Post, ArchivedPost):
+            patcher = mock.patch.object(model._meta.get_field('file'), 'storage', self.storage)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        cache.clear()
+
+        User = get_user_model()
+        manager = Rank.objects.create(name='과장', level=30)
+        self.reader = User.objects.create_user('file_reader', password='x', nickname='file_reader', rank=manager)
+        self.outsider = User.objects.create_user('file_outsider', password='x', nickname='file_outsider')
+        self.board = Board.objects.create(name='files', slug='files')
+        self.board.read_access_ranks.add(manager)
+
+    def attachment_storage(self):
+        return FileSystemStorage(location=os.path.join(self.root, 'files'))
+
+    def attach(self, name, data):
+        post = Post.objects.create(board=self.board, author=self.reader, title=name, content='c',
+                                   file=SimpleUploadedFile(name, data))
+        return post, reverse('post_download', args=[post.id])
+
+
+# 첨부파일 다운로드: 게시판 읽기 권한 확인 후 ETag/Range(이어받기) 지원
+class AttachmentDownloadTests(AttachmentTestCase):
+    def setUp(self):
+        super().setUp()
+        self.data = bytes(range(256)) * 40
+        self.post, self.url = self.attach('report.pdf', self.data)
+        self.client.force_login(self.reader)
+
+    def test_download_checks_board_acl(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('attachment; filename="report.pdf"', response['Content-Disposition'])
+        self.assertEqual(b''.join(response.streaming_content), self.data)
+
+        self.client.force_login(self.outsider)
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+
+    def test_etag_and_range(self):
+        etag = self.client.get(self.url)['ETag']
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        response = self.client.get(self.url, HTTP_RANGE='bytes=100-199')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], f'bytes 100-199/{len(self.data)}')
+        self.assertEqual(b''.join(response.streaming_content), self.data[100:200])
+
+        response = self.client.get(self.url, HTTP_RANGE='bytes=-10')
+        self.assertEqual(b''.join(response.streaming_content), self.data[-10:])
+        self.assertEqual(self.client.get(self.url, HTTP_RANGE=f'bytes={len(self.data)}-').status_code, 416)
+        # 파일이 바뀌었으면(If-Range 불일치) 전체를 다시 보냄
+        self.assertEqual(self.client.get(self.url, HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE='"old"').status_code, 200)
+
+
+# 첨부 이미지 축소본은 공개 thumbs/ 가 아니라 비공개 저장소에 두고 post_download?size= 로 권한 확인 뒤 보냄
+class AttachmentPreviewTests(AttachmentTestCase):
+    def attachment_storage(self):
+        return ContentAddressedStorage(location=os.path.join(self.root, 'cas'), legacy_location=self.root)
+
+    def setUp(self):
+        super().setUp()
+        image = io.BytesIO()
+        Image.new('RGB', (1600, 1200), 'navy').save(image, 'PNG')
+        self.post, self.url = self.attach('photo.png', image.getvalue())
+
+    def test_preview_is_private_and_acl_checked(self):
+        # 업로드 직후(작업 큐) 비공개 저장소에 만들어지고 thumbs/ 에는 없음
+        self.assertTrue(os.listdir(os.path.join(self.root, 'previews', 'thumbs')))
+        self.assertFalse(os.path.exists(os.path.join(self.root, 'thumbs')))
+
+        self.client.force_login(self.reader)
+        response = self.client.get(self.url, {'size': 640})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('attachment', response['Content-Disposition'])
+        preview = Image.open(io.BytesIO(b''.join(response.streaming_content)))
+        self.assertEqual(max(preview.size), 1280)  # 640px 의 2배 (고해상도 화면)
+
+        self.client.force_login(self.outsider)
+        self.assertEqual(self.client.get(self.url, {'size': 640}).status_code, 403)
+
+    def test_preview_name_does_not_read_original(self):
+        # 캐시가 비어도 축소본 이름은 원본 이름(내용 해시)만으로 정함
+        cache.clear()
+        storage = Post._meta.get_field('file').storage
+        post = Post.objects.get(pk=self.post.pk)
+        with mock.patch.object(type(storage), 'open', side_effect=AssertionError("원본을 읽음")):
+            _, name = attachment_preview(post.file, 640)
+        self.assertIn(storage.content_digest(self.post.file.name), name)
+
+    def test_unknown_size_is_not_rendered(self):
+        self.client.force_login(self.reader)
+        self.assertEqual(self.client.get(self.url, {'size': 123}).status_code, 404)
+        self.assertEqual(self.client.get(self.url, {'size': 'big'}).status_code, 404)
+
+
+# 내용 주소 저장소 (community/storage.py): 같은 내용은 한 번만 저장, 참조가 0 이 될 때만 삭제, 로컬 읽기 캐시는 LRU
+class ContentAddressedStorageTests(TestCase):
+    def setUp(self):
+        root = tempfile.TemporaryDirectory()
+        self.addCleanup(root.cleanup)
+        self.root = root.name
+        self.storage = ContentAddressedStorage(location=os.path.join(self.root, 'cas'),
+                                               cache_location=os.path.join(self.root, 'cache'),
+                                               cache_max_bytes=250, legacy_location=self.root)
+
+    def cached(self, name):
+        return os.path.exists(self.storage._cache_path(self.storage._split(name)))
+
+    def test_same_content_is_stored_once(self):
+        first = self.storage.save('a/report.pdf', ContentFile(b'same'))
+        second = self.storage.save('b/copy.pdf', ContentFile(b'same'))
+        digest = hashlib.sha256(b'same').hexdigest()
+        self.assertEqual((first, second), (f'cas/{digest}/report.pdf', f'cas/{digest}/copy.pdf'))
+        self.assertEqual(self.storage.path(first), self.storage.path(second))
+        self.assertEqual(self.storage.ref_count(first), 2)
+        with self.storage.open(second) as f:
+            self.assertEqual(f.read(), b'same')
+        # FieldFile 처럼 닫은 파일을 다시 열 수 있어야 함 (축소본 만들 때 해시 계산 후 다시 엶)
+        f.open('rb')
+        with f:
+            self.assertEqual(f.read(), b'same')
+
+    def test_delete_unlinks_at_zero_refs(self):
+        first = self.storage.save('report.pdf', ContentFile(b'shared'))
+        second = self.storage.save('copy.pdf', ContentFile(b'shared'))
+        blob = self.storage.path(first)
+
+        self.storage.delete(first)
+        self.assertEqual(self.storage.ref_count(second), 1)
+        self.assertTrue(os.path.exists(blob))
+        self.assertTrue(self.cached(second))
+
+        self.storage.delete(second)
+        self.assertFalse(os.path.exists(blob))
+        self.assertFalse(self.cached(second))
+        self.assertFalse(self.storage.exists(second))
+        # refs 파일은 0 으로 남겨서 다음 저장이 같은 파일을 잠그고 이어서 셈
+        self.assertTrue(os.path.exists(self.storage._ref_path(self.storage._split(second))))
+        again = self.storage.save('again.pdf', ContentFile(b'shared'))
+        self.assertEqual(self.storage.ref_count(again), 1)
+        self.assertTrue(self.storage.exists(again))
+
+    def test_read_cache_evicts_least_recently_used(self):
+        names = [self.storage.save(f'{i}.bin', ContentFile(bytes([i]) * 100)) for i in range(2)]
+        old = time.time() - 60
+        for age, name in enumerate(names):  # 0.bin 이 더 최근
+            path = self.storage._cache_path(self.storage._split(name))
+            os.utime(path, (old - age, old - age))
+
+        # 세 번째 파일로 최대 용량(250)을 넘으면 가장 오래 안 쓴 1.bin 부터 90% 이하가 될 때까지 지움
+        third = self.storage.save('2.bin', ContentFile(b'\x02' * 100))
+        self.assertEqual([self.cached(name) for name in (*names, third)], [True, False, True])
+
+        # 캐시에서 빠진 파일도 원본(blob)에서 읽고 다시 캐시에 올림
+        with self.storage.open(names[1]) as f:
+            self.assertEqual(f.read(), b'\x01' * 100)
+        self.assertTrue(self.cached(names[1]))
+
+
+# 글을 지우면 첨부 참조를 반납 (community/signals.py release_attachment). 보관 테이블로 옮길 때는 반납하지 않음
+class AttachmentReleaseTests(AttachmentTestCase):
+    def attachment_storage(self):
+        return ContentAddressedStorage(location=os.path.join(self.root, 'cas'), legacy_location=self.root)
+
+    def test_blob_removed_after_last_post(self):
+        first, _ = self.attach('report.pdf', b'shared')
+        second, _ = self.attach('copy.pdf', b'shared')
+        name = second.file.name
+        self.assertEqual(self.storage.ref_count(name), 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            first.delete()
+        self.assertEqual(self.storage.ref_count(name), 1)
+        self.assertTrue(self.storage.exists(name))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            second.delete()
+        self.assertEqual(self.storage.ref_count(name), 0)
+        self.assertFalse(self.storage.exists(name))
+
+    def test_archived_post_keeps_file(self):
+        post, _ = self.attach('report.pdf', b'archived')
+        name = post.file.name
+        Post.all_objects.filter(pk=post.pk).update(created_at=timezone.now() - timedelta(days=4000))
+        with self.captureOnCommitCallbacks(execute=True):
+            archive.run(old_days=365, deleted_days=30, sleep=0)
+        self.assertEqual(self.storage.ref_count(name), 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            ArchivedPost.objects.get(pk=post.pk).delete()
+        self.assertFalse(self.storage.exists(name))
+
+
+# 분할 업로드 (community/views.py upload_*): 조각을 이어 붙여 저장소에 넣고 글에 붙임. 버려진 업로드는 ops/uploads.py 가 정리
+@override_settings(CHUNKED_UPLOAD_CHUNK_SIZE=4096, CHUNKED_UPLOAD_EXPIRE_HOURS=24)
+class ChunkedUploadTests(AttachmentTestCase):
+    def setUp(self):
+        super().setUp()
+        upload_dir = override_settings(CHUNKED_UPLOAD_DIR=os.path.join(self.root, 'upload_tmp'))
+        upload_dir.enable()
+        self.addCleanup(upload_dir.disable)
+        image = io.BytesIO()
+        Image.new('RGB', (800, 600), 'teal').save(image, 'BMP')  # 압축하지 않아 조각이 여러 개
+        self.data = image.getvalue()
+        self.client.force_login(self.reader)
+
+    def attachment_storage(self):
+        return ContentAddressedStorage(location=os.path.join(self.root, 'cas'), legacy_location=self.root)
+
+    def init(self, name='photo.bmp'):
+        response = self.client.post(reverse('upload_init', args=[self.board.slug]), {'filename': name, 'size': len(self.data)})
+        self.assertEqual(response.status_code, 201)
+        return response.json()['upload_id']
+
+    def put(self, upload_id, offset, chunk):
+        return self.client.put(f"{reverse('upload_chunk', args=[upload_id])}?offset={offset}", chunk,
+                               content_type='application/octet-stream',
+                               HTTP_X_CHUNK_SHA256=hashlib.sha256(chunk).hexdigest())
+
+    def upload(self):
+        upload_id = self.init()
+        for offset in range(0, len(self.data), 4096):
+            self.assertEqual(self.put(upload_id, offset, self.data[offset:offset + 4096]).status_code, 200)
+        self.assertEqual(self.client.post(reverse('upload_finalize', args=[upload_id])).status_code, 200)
+        return upload_id
+
+    def test_chunks_become_attachment_with_preview(self):
+        upload_id = self.upload()
+        self.client.post(reverse('post_create', args=[self.board.slug]),
+                         {'title': '큰 사진', 'content': 'c', 'upload_id': upload_id})
+        post = Post.objects.get(title='큰 사진')
+        storage = post.file.storage
+        self.assertTrue(post.file.name.startswith(f"cas/{hashlib.sha256(self.data).hexdigest()}/"))
+        self.assertEqual(storage.ref_count(post.file.name), 1)
+        self.assertFalse(UploadSession.objects.exists())
+        self.assertFalse(os.listdir(settings.CHUNKED_UPLOAD_DIR))
+        # 분할 업로드한 이미지도 축소본 작업이 들어감
+        self.assertTrue(os.listdir(os.path.join(self.root, 'previews', 'thumbs')))
+
+    def test_out_of_order_offset_is_rejected(self):
+        upload_id = self.init()
+        self.assertEqual(self.put(upload_id, 0, self.data[:4096]).status_code, 200)
+        response = self.put(upload_id, 8192, self.data[8192:12288])
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()['offset'], 4096)
+        self.assertEqual(self.client.get(reverse('upload_chunk', args=[upload_id])).json()['offset'], 4096)
+        self.assertEqual(self.client.post(reverse('upload_finalize', args=[upload_id])).status_code, 409)
+
+    def test_chunk_without_hash_is_rejected(self):
+        upload_id = self.init()
+        response = self.client.put(f"{reverse('upload_chunk', args=[upload_id])}?offset=0", self.data[:4096],
+                                   content_type='application/octet-stream')
+        self.assertEqual(response.status_code, 400)
+        response = self.client.put(f"{reverse('upload_chunk', args=[upload_id])}?offset=0", self.data[:4096],
+                                   content_type='application/octet-stream', HTTP_X_CHUNK_SHA256='0' * 64)
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(UploadSession.objects.get(pk=upload_id).received, 0)
+
+    def test_failed_post_keeps_upload_claimable(self):
+        upload_id = self.upload()
+        with mock.patch.object(Post.objects, 'create', side_effect=DatabaseError("insert failed")):
+            with self.assertRaises(DatabaseError):
+                self.client.post(reverse('post_create', args=[self.board.slug]),
+                                 {'title': 't', 'content': 'c', 'upload_id': upload_id})
+        # 업로드 행이 남아 있어서 다시 제출하거나 정리 작업(ops/uploads.py)이 참조를 돌려줄 수 있음
+        self.assertTrue(UploadSession.objects.filter(pk=upload_id).exists())
+
+    def test_finalize_twice_stores_once(self):
+        upload_id = self.upload()
+        name = UploadSession.objects.get(pk=upload_id).stored_name
+        response = self.client.post(reverse('upload_finalize', args=[upload_id]))  # 응답을 못 받고 다시 보낸 경우
+        self.assertEqual(response.json()['name'], os.path.basename(name))
+        self.assertEqual(Post._meta.get_field('file').storage.ref_count(name), 1)
+
+    def test_finalize_rechecks_write_access(self):
+        upload_id = self.init()
+        for offset in range(0, len(self.data), 4096):
+            self.put(upload_id, offset, self.data[offset:offset + 4096])
+        self.board.write_access_depts.add(Department.objects.create(name='closed'))
+        response = self.client.post(reverse('upload_finalize', args=[upload_id]))
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(UploadSession.objects.get(pk=upload_id).stored_name, '')
+
+    def test_stale_uploads_are_purged(self):
+        finalized = self.upload()
+        unfinished = self.init('other.bmp')
+        self.put(unfinished, 0, self.data[:4096])
+        stored_name = UploadSession.objects.get(pk=finalized).stored_name
+        blob = Post._meta.get_field('file').storage.path(stored_name)
+        fresh = self.init('fresh.bmp')
+        UploadSession.objects.exclude(pk=fresh).update(updated_at=timezone.now() - timedelta(hours=25))
+        orphan = os.path.join(settings.CHUNKED_UPLOAD_DIR, 'gone.part')
+        open(orphan, 'wb').close()
+        os.utime(orphan, (time.time() - 25 * 3600,) * 2)
+
+        result = uploads.run()
+        self.assertEqual((result.sessions, result.released, result.orphans), (2, 1, 1))
+        self.assertEqual(list(UploadSession.objects.values_list('pk', flat=True)), [uuid.UUID(fresh)])
+        self.assertEqual(os.listdir(settings.CHUNKED_UPLOAD_DIR), [f'{fresh}.part'])
+        self.assertFalse(os.path.exists(blob))  # 글에 붙지 않은 파일의 마지막 참조 → 삭제
+
+
+# 오브젝트 스토리지 (ops/objectstore.py) 를 로컬 stand-in 서버 (ops/objectstore_standin.py) 에 붙여서 확인. 서명(SigV4)도 실제로 검증됨
+class ObjectStoreTests(TestCase):
+    def setUp(self):
+        root = tempfile.TemporaryDirectory()
+        self.addCleanup(root.cleanup)
+        server = make_server(root.name, 'standin', 'standin-secret', port=0)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        self.endpoint = f"http://127.0.0.1:{server.server_address[1]}"
+        self.storage = self.make_storage('standin-secret')
+
+    def make_storage(self, secret_key):
+        return ObjectStorage(self.endpoint, 'cb-media', 'standin', secret_key, location='attachments',
+                             multipart_threshold=1024 * 1024, part_size=5 * 1024 * 1024, upload_workers=2)
+
+    def test_save_open_exists_delete(self):
+        name = self.storage.save('docs/report.txt', ContentFile(b'hello'))
+        self.assertTrue(self.storage.exists(name))
+        self.assertEqual(self.storage.size(name), 5)
+        with self.storage.open(name) as f:
+            self.assertEqual(f.read(), b'hello')
+        with urllib.request.urlopen(self.storage.signed_url(name, disposition='attachment')) as response:
+            self.assertEqual((response.read(), response.headers['Content-Disposition']), (b'hello', 'attachment'))
+
+        self.storage.delete(name)
+        self.assertFalse(self.storage.exists(name))
+
+    def test_multipart_upload_above_part_size(self):
+        data = os.urandom(11 * 1024 * 1024)  # 파트 최소 5MB → 5 + 5 + 1
+        with mock.patch.object(self.storage.client, 'upload_part', wraps=self.storage.client.upload_part) as upload_part:
+            name = self.storage.save('big.bin', ContentFile(data))
+        self.assertEqual(sorted(c.args[2] for c in upload_part.call_args_list), [1, 2, 3])
+        with self.storage.open(name) as f:
+            self.assertEqual(hashlib.sha256(f.read()).digest(), hashlib.sha256(data).digest())
+
+    def test_wrong_key_is_rejected(self):
+        name = self.storage.save('secret.txt', ContentFile(b'x'))
+        intruder = self.make_storage('wrong-secret')
+        with self.assertRaises(ObjectStoreError) as raised:
+            intruder.save('secret.txt', ContentFile(b'overwritten'))
+        self.assertEqual(raised.exception.status, 403)
+        with self.assertRaises(urllib.error.HTTPError) as raised:
+            urllib.request.urlopen(intruder.signed_url(name))
+        self.assertEqual(raised.exception.code, 403)
+        with self.storage.open(name) as f:
+            self.assertEqual(f.read(), b'x')
+
+
+# /metrics (ops/views.py metrics_view): 운영에서 토큰을 설정하지 않으면 닫힘
+class MetricsAccessTests(TestCase):
+    @override_settings(METRICS_TOKEN='', DEBUG=False)
+    def test_closed_without_token_in_production(self):
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 403)
+
+    @override_settings(METRICS_TOKEN='', DEBUG=True)
+    def test_open_without_token_in_debug(self):
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 200)
+
+    @override_settings(METRICS_TOKEN='scrape-secret', DEBUG=False)
+    def test_token_required(self):
+        self.assertEqual(self.client.get(reverse('metrics'), HTTP_AUTHORIZATION='Bearer wrong').status_code, 403)
+        response = self.client.get(reverse('metrics'), HTTP_AUTHORIZATION='Bearer scrape-secret')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b'# TYPE', response.content)
+
+
+# 지표 파일 (ops/metrics.py): 서버를 다시 시작해도 같이 실행 중인 run_worker 의 파일은 남기고, 종료된 프로세스 값만 합침
+class MetricsFileTests(TestCase):
+    def test_restart_keeps_live_process_files(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        live = subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(60)'])
+        self.addCleanup(live.wait)
+        self.addCleanup(live.kill)
+        dead = subprocess.Popen([sys.executable, '-c', 'pass'])
+        dead.wait()
+        key = '["c", "cb_test_total", {}]'
+        for pid, value in ((live.pid, 2), (dead.pid, 3)):
+            store = metrics.MmapStore(os.path.join(directory, f'metrics_{pid}.db'))
+            store.add(key, value)
+            store.close()
+
+        self.assertEqual(metrics.archive_dead_processes(directory), 1)  # gunicorn on_starting
+        self.assertTrue(os.path.exists(os.path.join(directory, f'metrics_{live.pid}.db')))
+        self.assertFalse(os.path.exists(os.path.join(directory, f'metrics_{dead.pid}.db')))
+        self.assertEqual(metrics.collect(directory)[key], 5)
+
+
+@override_settings(QUERY_BUDGET_MODE='raise', QUERY_BUDGET_SAMPLE_RATE=1.0, QUERY_BUDGET_DEFAULT_QUERIES=2)
+class StreamingQueryBudgetTests(TestCase):
+    def setUp(self):
+        querybudget.reset_summary()
+        self.addCleanup(querybudget.reset_summary)
+
+    def stream(self, rows):
+        def body():
+            for _ in range(rows):
+                yield str(Board.objects.count()).encode()
+        middleware = querybudget.QueryBudgetMiddleware(lambda request: StreamingHttpResponse(body()))
+        return middleware(RequestFactory().get('/export/'))
+
+    def test_counts_queries_run_while_streaming(self):
+        response = self.stream(2)
+        self.assertNotIn('X-Query-Count', response)
+        self.assertEqual(b''.join(response.streaming_content), b'00')
+        response.close()
+        self.assertEqual(querybudget.summary()['/export/']['queries_max'], 2)
+
+    def test_breach_is_logged_not_raised(self):
+        response = self.stream(3)
+        with self.assertLogs('ops.querybudget', 'WARNING'):
+            b''.join(response.streaming_content)
+            response.close()
+        self.assertEqual(querybudget.summary()['/export/']['breaches'], 1)
+
+    def test_closed_without_reading(self):
+        response = self.stream(3)
+        response.close()
+        Board.objects.count()
+        self.assertEqual(querybudget.summary()['/export/']['queries_max'], 0)
@@ -12,7 +12,12 @@ urlpatterns = [
     path('', views.board_list, name='board_list'), # /community/ 로 접속 시 게시판 목록
     path('board/<slug:board_slug>/', views.post_list, name='post_list'),
     path('board/<slug:board_slug>/create/', views.post_create, name='post_create'),
+    path('board/<slug:board_slug>/read/', views.board_mark_read, name='board_mark_read'),
+    path('board/<slug:board_slug>/upload/', views.upload_init, name='upload_init'),
+    path('upload/<uuid:upload_id>/', views.upload_chunk, name='upload_chunk'),
+    path('upload/<uuid:upload_id>/finalize/', views.upload_finalize, name='upload_finalize'),
     path('post/<int:post_id>/', views.post_detail, name='post_detail'),
+    path('post/<int:post_id>/download/', views.post_download, name='post_download'),
     path('post/<int:post_id>/comment/', views.comment_create, name='comment_create'),
     path('comment/<int:comment_id>/delete/', views.comment_delete, name='comment_delete'),
     path('post/<int:post_id>/delete/', views.post_delete, name='post_delete'),
@@ -1,11 +1,28 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth import get_user_model
-from django.http import HttpResponseForbidden
+from django.http import (
+    FileResponse, Http404, HttpResponse, HttpResponseForbidden, HttpResponseNotAllowed,
+    HttpResponseNotModified, JsonResponse,
+)
+from django.conf import settings
+from django.core.files import File
+from django.views.decorators.http import require_POST
+import hashlib
+from django.utils import timezone
+from django.utils.http import content_disposition_header, http_date
+from urllib.parse import quote
+import mimetypes
+import os
 from .models import Message, Notification
+from ops import metrics
+from ops.querybudget import query_budget
+from ops.ratelimit import rate_limit
 import re 
 from django.contrib.auth import get_user_model
 from django.core.paginator import Paginator
+from django.db import transaction
+from django.db.models import Count, F, Q
 from .models import Post
 
 User = get_user_model()
@@ -17,6 +34,13 @@ def inbox(request):
     messages = request.user.received_messages.all()
     return render(request, 'community/inbox.html', {'messages': messages})
 
+def message_notice(actors, count):
+    if count == 1:
+        return f"📩 {actors[0]}님이 쪽지를 보냈습니다."
+    if len(actors) == 1:
+        return f"📩 {actors[0]}님이 쪽지를 {count}통 보냈습니다."
+    return f"📩 {actors[0]}님 외 {len(actors) - 1}명이 쪽지를 {count}통 보냈습니다."
+
 # 2. 쪽지 보내기 (Send)
 @login_required
 def send_message(request):
@@ -28,18 +52,20 @@ def send_message(request):
             recipient = User.objects.get(id=recipient_id)
             
             # 쪽지 저장
-            Message.objects.create(
+            message = Message.objects.create(
                 sender=request.user,
                 recipient=recipient,
                 content=content
             )
             
-            # (선택) 쪽지 받았다고 알림(Notification)도 하나 꽂아줄까요?
-            Notification.objects.create(
+            # 쪽지 알림: 짧은 시간에 여러 통이 오면 알림 한 줄로 묶음 ("김부장님 외 2명이 쪽지를 5통 보냈습니다")
+            Notification.coalesce(
                 recipient=recipient,
                 sender=request.user,
-                message=f"📩 {request.user.nickname}님이 쪽지를 보냈습니다.",
-                link="/community/inbox/"
+                group_key="message",
+                render=message_notice,
+                link="/community/inbox/",
+                source=message.id,
             )
             
             return redirect('inbox') # 보낸 후 내 쪽지함으로 이동
@@ -68,11 +94,21 @@ def view_message(request, message_id):
     return render(request, 'community/view_message.html', {'message': message})
 
 from django.contrib import messages
-from .models import Board, Post
+from .models import ArchivedPost, Board, Post, ReadMarker, UploadSession
+from .storage import attachment_preview
+from .tasks import MENTION_PATTERN, notify_mentions
+from accounts.thumbnails import RENDER_ERRORS
 
 # 4. 게시판 목록 (Board List)
+@query_budget(queries=8, repeats=1)
 def board_list(request):
-    boards = Board.objects.all()
+    # 게시판마다 글 수/읽기 허용 부서를 따로 조회하지 않도록 한 번에 읽어옴
+    boards = Board.objects.annotate(
+        post_count=Count('posts', filter=Q(posts__is_active=True)),  # annotate 는 기본 매니저(숨김 제외)를 거치지 않음
+    ).prefetch_related('read_access_depts')
+    if request.user.is_authenticated:
+        # 게시판별 안 읽은 새 글 수도 같은 COUNT 쿼리에서 셈 (읽음 표시는 캐시에서, 없으면 한 번 조회)
+        boards = boards.annotate(new_count=Count('posts', filter=ReadMarker.unread_filter(request.user)))
     
     # (선택사항) 템플릿에서 권한 체크를 쉽게 하기 위해
     # 여기서 미리 필터링해서 보낼 수도 있지만, 
@@ -84,7 +120,16 @@ def board_list(request):
     return render(request, 'community/board_list.html', context)
 
 # 5. 글 목록 (Post List)
+POST_LIST_PAGE_SIZE = 20
+
+
+def _post_rows(posts):
+    # 목록 화면 공용: 작성자/소속/직급은 JOIN, 댓글 수는 COUNT 로 함께 읽음 (글마다 추가 쿼리 없음)
+    return posts.select_related('author__department', 'author__rank').annotate(comment_count=Count('comments'))
+
+
 @login_required
+@query_budget(queries=10, repeats=1)
 def post_list(request, board_slug):
     board = get_object_or_404(Board, slug=board_slug)
     
@@ -92,19 +137,32 @@ def post_list(request, board_slug):
         messages.error(request, "🚫 접근 권한이 없는 게시판입니다.")
         return redirect('board_list')
 
-    posts = board.posts.all().order_by('-created_at')
+    posts = _post_rows(board.posts.order_by('-created_at'))
+    page_obj = Paginator(posts, POST_LIST_PAGE_SIZE).get_page(request.GET.get('page'))
+    page_obj.object_list = ReadMarker.flag_new(list(page_obj.object_list), request.user)  # "N" 배지
     
     # ▼ [중요] 이 줄이 없으면 HTML이 권한을 몰라서 버튼을 숨겨버립니다!
     can_write_access = board.can_write(request.user)
 
     return render(request, 'community/post_list.html', {
         'board': board, 
-        'posts': posts,
+        'posts': page_obj,
+        'page_obj': page_obj,
         # ▼ 이 변수도 꼭 넘겨줘야 합니다!
         'can_write_access': can_write_access 
     })
 
+# 5-1. 게시판 모두 읽음 표시
 @login_required
+@require_POST
+def board_mark_read(request, board_slug):
+    board = get_object_or_404(Board, slug=board_slug)
+    if board.can_read(request.user):
+        ReadMarker.mark_board_read(request.user, board)
+    return redirect('post_list', board_slug=board.slug)
+
+@login_required
+@rate_limit('10/m', burst=3)
 def post_create(request, board_slug):
     board = get_object_or_404(Board, slug=board_slug)
     
@@ -117,28 +175,307 @@ def post_create(request, board_slug):
         title = request.POST.get('title')
         content = request.POST.get('content')
         file = request.FILES.get('file') # 파일 업로드 처리
-        
-        Post.objects.create(
-            board=board,
-            author=request.user,
-            title=title,
-            content=content,
-            file=file
-        )
+        if file:
+            metrics.UPLOAD_BYTES.inc(file.size, kind='form')
+
+        # 분할 업로드로 미리 올려둔 파일이 있으면 그 파일을 첨부
+        # 업로드 행을 지운 쪽이 저장소 참조를 가져감 (두 번 제출하거나 정리 작업 ops/uploads.py 와 겹쳐도 한 번만).
+        # 글 저장이 실패하면 행도 되살아나서 정리 작업이 참조를 돌려줄 수 있도록 한 트랜잭션으로 묶음
+        upload_id = request.POST.get('upload_id')
+        with transaction.atomic():
+            if upload_id and not file:
+                upload = UploadSession.objects.filter(
+                    id=upload_id, user=request.user, board=board,
+                ).exclude(stored_name='').first()
+                if upload and UploadSession.objects.filter(pk=upload.pk).delete()[0]:
+                    file = upload.stored_name  # 처음부터 파일 이름을 넣고 만들어야 이미지 축소본 작업(signals)도 들어감
+
+            post = Post.objects.create(
+                board=board,
+                author=request.user,
+                title=title,
+                content=content,
+                file=file
+            )
         return redirect('post_list', board_slug=board.slug)
 
-    return render(request, 'community/post_create.html', {'board': board})
+    return render(request, 'community/post_create.html', {
+        'board': board,
+        'chunk_threshold': settings.CHUNKED_UPLOAD_THRESHOLD,
+    })
+
+
+# 6-1. 분할 업로드 시작: 파일 이름/크기를 받고 업로드 id 발급
+@login_required
+@require_POST
+def upload_init(request, board_slug):
+    board = get_object_or_404(Board, slug=board_slug)
+    if not board.can_write(request.user):
+        return JsonResponse({'error': '이 게시판에 글을 쓸 권한이 없습니다.'}, status=403)
+
+    filename = os.path.basename(request.POST.get('filename', '')).strip()
+    try:
+        size = int(request.POST.get('size', ''))
+    except ValueError:
+        size = -1
+    if not filename or size <= 0:
+        return JsonResponse({'error': '파일 이름과 크기가 필요합니다.'}, status=400)
+    if size > settings.CHUNKED_UPLOAD_MAX_SIZE:
+        return JsonResponse({'error': '파일이 너무 큽니다.'}, status=413)
+
+    upload = UploadSession.objects.create(user=request.user, board=board, filename=filename[:255], size=size)
+    os.makedirs(settings.CHUNKED_UPLOAD_DIR, exist_ok=True)
+    open(upload.temp_path, 'wb').close()
+
+    return JsonResponse({
+        'upload_id': str(upload.id),
+        'offset': 0,
+        'chunk_size': settings.CHUNKED_UPLOAD_CHUNK_SIZE,
+    }, status=201)
+
+
+# 6-2. 조각 올리기 (PUT ?offset=N, 헤더 X-Chunk-SHA256) / 이어올리기 위치 확인 (GET)
+@login_required
+def upload_chunk(request, upload_id):
+    upload = get_object_or_404(UploadSession, id=upload_id, user=request.user)
+
+    if request.method == 'GET':
+        return JsonResponse({'offset': upload.received, 'size': upload.size})
+    if request.method != 'PUT':
+        return HttpResponseNotAllowed(['GET', 'PUT'])
+    if upload.stored_name:
+        return JsonResponse({'error': '이미 완료된 업로드입니다.'}, status=409)
+
+    try:
+        offset = int(request.GET.get('offset', ''))
+    except ValueError:
+        return JsonResponse({'error': 'offset이 필요합니다.'}, status=400)
+    # 끊겼다가 다시 올리는 경우: 서버가 받은 위치와 다르면 그 위치를 알려줌
+    if offset != upload.received:
+        return JsonResponse({'error': 'offset이 맞지 않습니다.', 'offset': upload.received}, status=409)
+
+    length = int(request.headers.get('Content-Length') or 0)
+    if length <= 0 or length > settings.CHUNKED_UPLOAD_CHUNK_SIZE or offset + length > upload.size:
+        return JsonResponse({'error': '조각 크기가 올바르지 않습니다.', 'offset': upload.received}, status=400)
+    # 모든 조각을 해시로 확인 (검증 없이 받은 조각이 섞이면 완성된 파일을 믿을 수 없음)
+    expected = request.headers.get('X-Chunk-SHA256', '').lower()
+    if not re.fullmatch(r'[0-9a-f]{64}', expected):
+        return JsonResponse({'error': 'X-Chunk-SHA256 헤더가 필요합니다.', 'offset': upload.received}, status=400)
+
+    # 요청 본문을 메모리에 모으지 않고 64KB씩 읽어서 임시 파일 끝에 바로 씀
+    sha = hashlib.sha256()
+    written = 0
+    with open(upload.temp_path, 'r+b') as f:
+        f.seek(offset)
+        while True:
+            block = request.read(64 * 1024)
+            if not block:
+                break
+            sha.update(block)
+            f.write(block)
+            written += len(block)
+
+        if written != length or expected != sha.hexdigest():
+            f.truncate(offset)  # 깨진 조각은 버리고 같은 offset부터 다시 받음
+            return JsonResponse({'error': '조각이 손상되었습니다.', 'offset': upload.received}, status=422)
+        f.truncate(offset + written)
+
+    # 같은 조각이 동시에 두 번 들어와도 한 번만 반영 (received가 offset일 때만 갱신)
+    updated = UploadSession.objects.filter(id=upload.id, received=offset).update(
+        received=offset + written, updated_at=timezone.now())  # 올리는 중인 업로드는 정리 대상이 아님
+    if not updated:
+        upload.refresh_from_db()
+        return JsonResponse({'error': 'offset이 맞지 않습니다.', 'offset': upload.received}, status=409)
+
+    metrics.UPLOAD_BYTES.inc(written, kind='chunk')
+    return JsonResponse({'offset': offset + written, 'size': upload.size})
+
+
+# 6-3. 업로드 완료: 임시 파일을 첨부파일 저장소로 옮김
+@login_required
+@require_POST
+def upload_finalize(request, upload_id):
+    # 같은 업로드를 동시에 두 번 완료해도 저장소에는 한 번만 넣음: 행을 잠근 요청만 저장하고,
+    # 다른 요청은 잠금이 풀린 뒤 저장된 이름을 그대로 돌려받음
+    with transaction.atomic():
+        upload = get_object_or_404(UploadSession.objects.select_for_update(), id=upload_id, user=request.user)
+        if not upload.stored_name:
+            if not upload.is_complete:
+                return JsonResponse({'error': '아직 모든 조각을 받지 못했습니다.', 'offset': upload.received}, status=409)
+            # 올리는 동안 권한이 바뀌었을 수 있으므로 저장소에 넣기 전에 다시 확인
+            if not upload.board.can_write(request.user):
+                return JsonResponse({'error': '이 게시판에 글을 쓸 권한이 없습니다.'}, status=403)
+
+            field = Post._meta.get_field('file')
+            with open(upload.temp_path, 'rb') as f:
+                upload.stored_name = field.storage.save(field.generate_filename(None, upload.filename), File(f))
+            upload.save(update_fields=['stored_name', 'updated_at'])
+            os.remove(upload.temp_path)
+
+    return JsonResponse({'upload_id': str(upload.id), 'name': os.path.basename(upload.stored_name)})
     
 # 7. 글 상세 보기
 @login_required
+@query_budget(queries=12, repeats=1)  # 새 글을 읽을 때 읽음 표시 잠금+쓰기 (게시판에서 처음이면 SAVEPOINT 포함 4개)
 def post_detail(request, post_id):
-    post = get_object_or_404(Post, id=post_id)
+    post = Post.objects.select_related('board', 'author__department', 'author__rank').filter(id=post_id).first()
+    if post is None:
+        # 보관 테이블로 옮겨진 글 (ops/archive.py): 같은 id 로 찾아서 읽기 전용으로 보여줌
+        return _archived_post_detail(request, post_id)
+    if not post.board.can_read(request.user):
+        messages.error(request, "🚫 접근 권한이 없는 게시판입니다.")
+        return redirect('board_list')
     
     # 조회수 증가 (쿠키 등을 써서 중복 방지하면 좋지만 일단 단순하게)
+    # 글 전체를 다시 저장하지 않고 UPDATE 한 번으로 올림 (동시에 읽어도 숫자가 빠지지 않음)
+    Post.objects.filter(pk=post.pk).update(view_count=F('view_count') + 1)
     post.view_count += 1
-    post.save()
-    
-    return render(request, 'community/post_detail.html', {'post': post})
+
+    # 처음 읽는 새 글일 때만 읽음 표시를 씀 (다시 열면 캐시만 확인)
+    ReadMarker.mark_read(request.user, post)
+
+    comments = list(post.comments.select_related('author__department').order_by('created_at'))
+    return render(request, 'community/post_detail.html', {'post': post, 'comments': comments})
+
+
+def _archived_post_detail(request, post_id):
+    # 삭제되어 보관된 글은 없는 글과 같음 (is_active=True 인 오래된 글만)
+    post = get_object_or_404(
+        ArchivedPost.objects.select_related('board', 'author__department', 'author__rank'), id=post_id, is_active=True,
+    )
+    if not post.board.can_read(request.user):
+        messages.error(request, "🚫 접근 권한이 없는 게시판입니다.")
+        return redirect('board_list')
+    comments = list(post.comments.select_related('author__department').order_by('created_at'))
+    return render(request, 'community/post_detail.html', {'post': post, 'comments': comments})
+
+class _RangeFile:
+    """열린 파일에서 지정한 길이만큼만 읽어주는 래퍼 (끝이 정해진 Range 요청용)"""
+    def __init__(self, f, length):
+        self.f = f
+        self.remaining = length
+
+    def read(self, size=-1):
+        if self.remaining <= 0:
+            return b''
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.f.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def close(self):
+        self.f.close()
+
+
+def _parse_range(header, size):
+    """'bytes=500-999' / 'bytes=500-' / 'bytes=-500' -> (start, end). 여러 구간은 지원하지 않음"""
+    m = re.fullmatch(r'bytes=(\d*)-(\d*)', header.strip())
+    if not m or (not m.group(1) and not m.group(2)):
+        return None
+    if m.group(1):
+        start = int(m.group(1))
+        end = int(m.group(2)) if m.group(2) else size - 1
+    else:
+        start = max(size - int(m.group(2)), 0)  # 끝에서부터 N바이트
+        end = size - 1
+    end = min(end, size - 1)
+    if start > end:
+        return None
+    return start, end
+
+
+def _download_target(post, size):
+    """(저장소, 이름, 파일명). size 가 있으면 이미지 첨부의 축소본 (만들 수 없으면 원본)"""
+    storage, name = post.file.storage, post.file.name
+    if size is None:
+        return storage, name, os.path.basename(name)
+    if size not in settings.ATTACHMENT_PREVIEW_SIZES or not post.is_image_file:
+        raise Http404("미리보기가 없습니다.")
+    try:
+        storage, name = attachment_preview(post.file, size)
+    except RENDER_ERRORS:
+        pass
+    return storage, name, os.path.basename(name)
+
+
+# 7-1. 첨부파일 다운로드 (게시판 읽기 권한 확인 후 전송)
+# ?size=640: 이미지 첨부의 축소본 (상세 화면 미리보기). 공개 thumbs/ 가 아니라 여기서 권한을 확인하고 보냄
+@login_required
+def post_download(request, post_id):
+    post = (Post.objects.select_related('board').filter(id=post_id).first()
+            or get_object_or_404(ArchivedPost.objects.select_related('board'), id=post_id, is_active=True))
+    if not post.file:
+        raise Http404("첨부파일이 없습니다.")
+    if not post.board.can_read(request.user):
+        return HttpResponseForbidden("권한이 없습니다.")
+
+    preview_size = request.GET.get('size')
+    if preview_size is not None and not preview_size.isdigit():
+        raise Http404("미리보기가 없습니다.")
+    storage, name, filename = _download_target(post, preview_size and int(preview_size))
+    as_attachment = not (request.GET.get('inline') or preview_size)
+
+    # 오브젝트 스토리지: 권한 확인 후 짧게 유효한 서명 URL로 보내서 스토리지에서 바로 내려받게 함
+    if getattr(storage, 'serves_signed_urls', False):
+        return redirect(storage.signed_url(
+            name,
+            expires=getattr(settings, 'ATTACHMENT_SIGNED_URL_EXPIRE', 300),
+            disposition=content_disposition_header(as_attachment, filename),
+        ))
+
+    # 운영 환경: 권한 확인만 하고 실제 전송은 nginx에게 맡김 (Range/캐시도 nginx가 처리)
+    accel_prefix = getattr(settings, 'ATTACHMENT_X_ACCEL_PREFIX', '')
+    if accel_prefix:
+        # 저장소의 실제 파일 위치를 MEDIA_ROOT 기준 상대 경로로 변환 (내용 해시 저장소는 이름과 위치가 다름)
+        try:
+            accel_name = os.path.relpath(storage.path(name), settings.MEDIA_ROOT)
+        except NotImplementedError:
+            accel_name = name
+        response = HttpResponse()
+        response['X-Accel-Redirect'] = accel_prefix.rstrip('/') + '/' + quote(accel_name)
+        response['Content-Type'] = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+        response['Content-Disposition'] = content_disposition_header(as_attachment, filename)
+        return response
+
+    # 로컬/nginx 없는 환경: Django가 직접 보내되 ETag, Range(이어받기)를 지원
+    size = storage.size(name)
+    mtime = storage.get_modified_time(name)
+    etag = f'"{size:x}-{int(mtime.timestamp()):x}"'
+
+    if etag in request.headers.get('If-None-Match', ''):
+        response = HttpResponseNotModified()
+        response['ETag'] = etag
+        return response
+
+    f = storage.open(name, 'rb')
+    byte_range = None
+    range_header = request.headers.get('Range')
+    if range_header and request.headers.get('If-Range', etag) == etag:
+        byte_range = _parse_range(range_header, size)
+        if byte_range is None:
+            f.close()
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{size}'
+            return response
+
+    if byte_range:
+        start, end = byte_range
+        f.seek(start)
+        length = end - start + 1
+        # 끝까지 보내는 경우(이어받기)는 파일 객체를 그대로 넘겨 sendfile(제로카피)이 가능하게 함
+        body = f if end == size - 1 else _RangeFile(f, length)
+        response = FileResponse(body, status=206, as_attachment=as_attachment, filename=filename)
+        response['Content-Length'] = length
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    else:
+        response = FileResponse(f, as_attachment=as_attachment, filename=filename)
+
+    response['Accept-Ranges'] = 'bytes'
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(mtime.timestamp())
+    response['Cache-Control'] = 'private, max-age=0'
+    return response
 
 # 10. 게시글 삭제 (Soft Delete 버전)
 @login_required
@@ -164,6 +501,7 @@ from django.contrib.auth import get_user_model
 
 # 기존 comment_create 함수를 업그레이드
 @login_required
+@rate_limit('20/m', burst=5)
 def comment_create(request, post_id):
     post = get_object_or_404(Post, id=post_id)
     if not post.board.can_read(request.user):
@@ -180,26 +518,9 @@ def comment_create(request, post_id):
                 content=content
             )
             
-            # 2. 멘션 감지 로직 (@닉네임 패턴 찾기)
-            # 예: "안녕하세요 @김부장 님" -> ['김부장'] 추출
-            mentioned_nicknames = re.findall(r'@(\w+)', content)
-            
-            # 3. 멘션된 유저들에게 알림 발송
-            User = get_user_model()
-            for nickname in set(mentioned_nicknames): # 중복 제거 (set)
-                try:
-                    target_user = User.objects.get(nickname=nickname)
-                    
-                    # 본인이 본인을 멘션한 건 알림 제외
-                    if target_user != request.user:
-                        Notification.objects.create(
-                            recipient=target_user,
-                            sender=request.user,
-                            message=f"💬 {request.user.nickname}님이 댓글에서 언급했습니다: {content[:20]}...",
-                            link=f"/community/post/{post.id}/"
-                        )
-                except User.DoesNotExist:
-                    continue # 없는 닉네임이면 무시
+            # 2. 멘션(@닉네임)이 있으면 알림은 작업 큐로 넘김 (받는 사람 조회/알림 묶기는 워커에서)
+            if MENTION_PATTERN.search(content):
+                notify_mentions.enqueue(comment.id, key=f"mention:{comment.id}")
                     
     return redirect('post_detail', post_id=post.id)
 
@@ -219,12 +540,13 @@ def comment_delete(request, comment_id):
 
 
 @login_required
+@query_budget(queries=10, repeats=1)
 def all_posts(request):
     """
     모든 게시판의 글을 최신순으로 모아보기 (전체 글 보기)
     """
     # 1. 모든 글 가져오기 (작성일 역순)
-    posts = Post.objects.all().order_by('-created_at')
+    posts = _post_rows(Post.objects.select_related('board').order_by('-created_at'))
     
     # 2. 검색어 처리 (제목 or 내용)
     q = request.GET.get('q', '')
@@ -235,6 +557,7 @@ def all_posts(request):
     paginator = Paginator(posts, 15)
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
+    page_obj.object_list = ReadMarker.flag_new(list(page_obj.object_list), request.user)
     
     return render(request, 'community/all_posts.html', {
         'page_obj': page_obj,
@@ -17,4 +17,5 @@ class MessageForm(forms.ModelForm):
         if user:
             # 나 자신에게는 쪽지 못 보내게 필터링
             User = get_user_model()
-            self.fields['receiver'].queryset = User.objects.exclude(id=user.id)
\ No newline at end of file
+            # 선택지 이름(User.__str__)에 부서/직급이 들어가므로 함께 읽음
+            self.fields['receiver'].queryset = User.objects.exclude(id=user.id).select_related('department', 'rank')
\ No newline at end of file
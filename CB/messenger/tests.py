@@ -1,3 +1,12 @@
-from django.test import TestCase
+from ops import perfsuite
 
-# Create your tests here.
+
+# 요청당 쿼리 수 (ops/perfsuite.py). 사원(restricted)은 사이드바의 부서/직급 조회 2개가 더 붙음
+class MessengerQueryCountTests(perfsuite.QueryCountTestCase):
+    urlconf = 'messenger.urls'
+    expected = {
+        'inbox': {'admin': 3, 'restricted': 5, 'norank': 3},
+        'send_message': {'admin': 3, 'restricted': 5, 'norank': 3},     # 받는 사람 목록 (부서/직급 JOIN)
+        'view_message': {'admin': 4, 'restricted': 6, 'norank': 4},     # 읽음 처리 UPDATE 포함
+        'sent_box': {'admin': 3, 'restricted': 5, 'norank': 3},
+    }
@@ -4,16 +4,22 @@ from django.utils import timezone
 from django.contrib import messages
 from .models import Message
 from .forms import MessageForm
+from ops.querybudget import query_budget
+from ops.ratelimit import rate_limit
 
 # 1. 받은 쪽지함 (Inbox)
 @login_required
+@query_budget(queries=8, repeats=1)
 def inbox(request):
     # [수정] received_messages -> messenger_received
-    messages_list = request.user.messenger_received.all() 
+    # 보낸 사람/소속을 JOIN 해서 쪽지마다 추가 쿼리가 나가지 않게 함
+    messages_list = request.user.messenger_received.select_related('sender__department')
     return render(request, 'messenger/inbox.html', {'messages_list': messages_list})
 
 # 2. 쪽지 보내기
 @login_required
+@rate_limit('30/m', burst=10)
+@query_budget(queries=8, repeats=1)
 def send_message(request):
     if request.method == 'POST':
         form = MessageForm(request.POST, user=request.user)
@@ -30,23 +36,25 @@ def send_message(request):
 
 # 3. 쪽지 읽기 (클릭 시 읽음 처리)
 @login_required
+@query_budget(queries=8, repeats=1)
 def view_message(request, message_id):
-    msg = get_object_or_404(Message, id=message_id)
+    msg = get_object_or_404(Message.objects.select_related('sender__department'), id=message_id)
     
     # 본인 확인 (내가 받은 쪽지거나, 내가 보낸 쪽지여야 함)
-    if request.user != msg.sender and request.user != msg.receiver:
+    if request.user.id not in (msg.sender_id, msg.receiver_id):
         messages.error(request, "권한이 없습니다.")
         return redirect('inbox')
 
     # 내가 받은 쪽지라면 읽음 처리(read_at 채우기)
-    if request.user == msg.receiver and msg.read_at is None:
+    if request.user.id == msg.receiver_id and msg.read_at is None:
         msg.read_at = timezone.now()
-        msg.save()
+        msg.save(update_fields=['read_at'])
         
     return render(request, 'messenger/view_message.html', {'msg': msg})
 
 @login_required
+@query_budget(queries=8, repeats=1)
 def sent_box(request):
     # 내가 보낸 메시지들 (최신순 정렬은 모델 Meta에 되어있음)
-    messages_list = request.user.messenger_sent.all()
+    messages_list = request.user.messenger_sent.select_related('receiver__department')
     return render(request, 'messenger/sent_box.html', {'messages_list': messages_list})
\ No newline at end of file
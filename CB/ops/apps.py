@@ -0,0 +1,10 @@
+from django.apps import AppConfig
+from django.db.backends.signals import connection_created
+
+
+class OpsConfig(AppConfig):
+    name = 'ops'
+
+    def ready(self):
+        from . import caches, metrics  # noqa: F401 (caches: 시스템 체크 등록)
+        connection_created.connect(metrics.install_db_wrapper, dispatch_uid='ops_metrics_db_wrapper')
@@ -0,0 +1,116 @@
+"""
+게시글 보관 (python manage.py archive_posts)
+
+게시판 목록은 모두 게시글 테이블을 훑는데, 삭제(숨김)된 글과 몇 년 지난 글도 계속 같은 테이블/인덱스에 남아 있었다.
+- 삭제된 지 POST_ARCHIVE_DELETED_AFTER_DAYS 일 지난 글, 작성된 지 POST_ARCHIVE_AFTER_DAYS 일 지난 글을
+  댓글과 함께 보관 테이블(ArchivedPost/ArchivedComment)로 옮김 → 자주 읽는 테이블과 인덱스가 작게 유지됨
+- 글 BATCH_SIZE 개씩 한 트랜잭션에서 "복사 + 삭제" 를 같이 함 → 중간에 멈춰도 옮겨진 글/안 옮겨진 글만 있음.
+  다시 실행하면 남은 글부터 이어서 처리
+- 보관 테이블에 같은 id 의 글/댓글이 이미 있으면(id 재사용 등) 그 글은 옮기지도 지우지도 않고 남겨 둠 (Result.skipped)
+- 대상 id 는 잠금 없이 고르고, 옮길 때만 그 id 의 행을 잠금. 구간 사이에 쉼
+- 보관된 글도 예전 링크로 들어오면 보관 테이블에서 읽어 보여줌 (community/views.py post_detail)
+"""
+import time
+from dataclasses import dataclass
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from community.models import ArchivedComment, ArchivedPost, Comment, Post
+from .locks import named_lock
+
+LOCK_NAME = 'cb:archive_posts'
+
+
+@dataclass
+class Result:
+    posts: int = 0        # 보관 테이블로 옮긴 글 수
+    comments: int = 0     # 함께 옮긴 댓글 수
+    batches: int = 0
+    skipped: int = 0      # 보관 테이블에 같은 id 가 있어서 남겨 둔 글 수
+    seconds: float = 0.0
+
+
+def _condition(now, old_days, deleted_days):
+    deleted = Q(is_active=False, updated_at__lt=now - timedelta(days=deleted_days))
+    old = Q(created_at__lt=now - timedelta(days=old_days))
+    return deleted | old
+
+
+def _archived_post(post, reason):
+    return ArchivedPost(
+        id=post.id, board_id=post.board_id, author_id=post.author_id, title=post.title, content=post.content,
+        is_active=post.is_active, file=post.file.name or None, view_count=post.view_count,
+        created_at=post.created_at, updated_at=post.updated_at, reason=reason,
+    )
+
+
+def _move(post_ids, condition):
+    """글과 댓글을 보관 테이블로 복사하고 원래 테이블에서 지움 (트랜잭션 안에서 호출). (글 수, 댓글 수, 남겨 둔 글 수)"""
+    # 고른 뒤에 복구/수정된 글이 있을 수 있으므로 조건을 다시 걸고, id 로 찾은 행만 잠금
+    posts = list(Post.all_objects.select_for_update().filter(condition, id__in=post_ids))
+    if not posts:
+        return 0, 0, 0
+    comments = list(Comment.objects.filter(post_id__in=[post.id for post in posts]))
+    # 보관 테이블에 이미 같은 id 가 있는 글(또는 그 글의 댓글)은 복사할 수 없으므로 원래 테이블에 그대로 둠.
+    # 복사하지 못한 행을 지우면 데이터가 사라지므로 충돌을 무시(ignore_conflicts)하지 않음
+    taken = set(ArchivedPost.objects.filter(id__in=[post.id for post in posts]).values_list('id', flat=True))
+    taken_comments = set(ArchivedComment.objects.filter(id__in=[c.id for c in comments]).values_list('id', flat=True))
+    taken |= {c.post_id for c in comments if c.id in taken_comments}
+    posts = [post for post in posts if post.id not in taken]
+    comments = [c for c in comments if c.post_id not in taken]
+    ids = [post.id for post in posts]
+    ArchivedPost.objects.bulk_create([
+        _archived_post(post, ArchivedPost.REASON_OLD if post.is_active else ArchivedPost.REASON_DELETED)
+        for post in posts
+    ])
+    ArchivedComment.objects.bulk_create([
+        ArchivedComment(id=c.id, post_id=c.post_id, author_id=c.author_id, content=c.content, created_at=c.created_at)
+        for c in comments
+    ])
+    Comment.objects.filter(post_id__in=ids).delete()
+    Post.all_objects.filter(id__in=ids).delete()
+    return len(posts), len(comments), len(taken)
+
+
+def run(old_days=None, deleted_days=None, batch_size=None, sleep=None, dry_run=False, log=None):
+    """보관 대상 글을 옮기고 Result 를 돌려줌. 다른 곳에서 실행 중이면 None"""
+    old_days = settings.POST_ARCHIVE_AFTER_DAYS if old_days is None else old_days
+    deleted_days = settings.POST_ARCHIVE_DELETED_AFTER_DAYS if deleted_days is None else deleted_days
+    batch_size = batch_size or settings.POST_ARCHIVE_BATCH_SIZE
+    sleep = settings.POST_ARCHIVE_SLEEP if sleep is None else sleep
+    log = log or (lambda message: None)
+    condition = _condition(timezone.now(), old_days, deleted_days)
+
+    with named_lock(LOCK_NAME) as acquired:
+        if not acquired:
+            return None
+        result = Result()
+        began = time.monotonic()
+        last_id = 0
+        while True:
+            post_ids = list(
+                Post.all_objects.filter(condition, id__gt=last_id).order_by('id').values_list('id', flat=True)[:batch_size]
+            )
+            if not post_ids:
+                break
+            last_id = post_ids[-1]
+            result.batches += 1
+            if dry_run:
+                result.posts += len(post_ids)
+                result.comments += Comment.objects.filter(post_id__in=post_ids).count()
+                continue
+            with transaction.atomic():
+                posts, comments, skipped = _move(post_ids, condition)
+            result.posts += posts
+            result.comments += comments
+            result.skipped += skipped
+            log(f"글 {post_ids[0]}~{last_id}: 글 {posts}개, 댓글 {comments}개 보관"
+                + (f", 보관 테이블에 같은 id 가 있어 {skipped}개 남김" if skipped else ""))
+            if sleep:
+                time.sleep(sleep)
+        result.seconds = time.monotonic() - began
+        return result
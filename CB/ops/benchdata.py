@@ -0,0 +1,198 @@
+"""
+벤치마크용 데이터 생성 (python manage.py seed_benchmark_data)
+
+부서 트리, 직급, 사원, 권한이 섞인 게시판, 글/댓글, 쪽지, 알림을 bulk_create 로 한꺼번에 만든다.
+- 같은 --seed 면 같은 데이터 → 커밋 사이의 벤치마크 결과를 비교할 수 있음
+- 만든 데이터는 모두 이름/아이디가 'bench' 로 시작 → clear() 로 그것만 지움
+- 신호(post_save)를 거치지 않으므로 생성 중에 공지 알림이 퍼지지 않음. 알림은 따로 만든다
+"""
+import random
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils import timezone
+
+from accounts.models import Department, Rank
+from community.models import Board, Comment, Notification, Post
+from messenger.models import Message
+
+PREFIX = 'bench'
+PASSWORD = 'bench-password'
+NOTICE_BOARD_NAME = '공지사항'  # community/signals.py 의 공지 알림 대상 게시판
+
+DEFAULT_RANKS = [('사원', 10), ('주임', 20), ('대리', 30), ('과장', 40), ('차장', 50), ('부장', 60), ('이사', 70)]
+# 직급이 낮을수록 인원이 많음
+RANK_WEIGHTS = [30, 20, 18, 12, 9, 7, 4]
+
+WORDS = (
+    '회의 일정 보고서 예산 출장 교육 안내 변경 공유 요청 검토 승인 프로젝트 배포 점검 서버 장애 복구 '
+    '신규 입사 휴가 복지 행사 마감 결과 분기 실적 계획 고객 계약 제안 보안 정책 업데이트 설문 '
+    '주간 월간 회고 개선 문의 답변 자료 첨부 확인 부탁 일정표 워크숍 채용 면접 평가 목표'
+).split()
+
+
+def _sentence(rng, words):
+    return ' '.join(rng.choice(WORDS) for _ in range(words))
+
+
+@contextmanager
+def _manual_timestamps(*fields):
+    """auto_now_add 필드에 직접 넣은 시각이 그대로 저장되도록 잠시 끔 (기간에 걸쳐 흩어진 데이터용)"""
+    saved = [(field, field.auto_now_add) for field in fields]
+    for field, _ in saved:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, value in saved:
+            field.auto_now_add = value
+
+
+def _spread(rng, count, days):
+    """최근 days 일 사이의 시각 count 개 (오래된 순) → id 순서와 시간 순서가 같음"""
+    now = timezone.now()
+    seconds = days * 86400
+    return [now - timedelta(seconds=s) for s in sorted((rng.uniform(0, seconds) for _ in range(count)), reverse=True)]
+
+
+def clear():
+    """bench 데이터만 삭제 (사원을 지우면 글/댓글/쪽지/알림은 CASCADE 로 같이 지워짐)"""
+    User = get_user_model()
+    with transaction.atomic():
+        deleted = {
+            'users': User.objects.filter(username__startswith=f'{PREFIX}_').delete()[0],
+            'boards': Board.objects.filter(slug__startswith=f'{PREFIX}-').delete()[0],
+            'departments': Department.objects.filter(name__startswith=f'{PREFIX}-').delete()[0],
+        }
+    return deleted
+
+
+def ensure_ranks():
+    used_names = set(Rank.objects.values_list('name', flat=True))
+    used_levels = set(Rank.objects.values_list('level', flat=True))
+    for name, level in DEFAULT_RANKS:
+        if name not in used_names and level not in used_levels:
+            Rank.objects.create(name=name, level=level)
+    return list(Rank.objects.order_by('level'))
+
+
+def create_departments(rng, count):
+    # 본부(최상위) 몇 개 아래에 팀을 붙임. 경로(path)는 save() 에서 계산되므로 하나씩 저장
+    roots = max(1, count // 6)
+    departments = []
+    for i in range(count):
+        parent = rng.choice(departments[:roots]) if i >= roots else None
+        dept = Department(name=f'{PREFIX}-dept-{i:03d}', description=_sentence(rng, 4), parent=parent)
+        dept.save()
+        departments.append(dept)
+    return departments
+
+
+def create_users(rng, count, departments, ranks, batch_size):
+    User = get_user_model()
+    password = make_password(PASSWORD)  # 해시는 한 번만 계산해서 모두 같은 값 사용
+    weights = RANK_WEIGHTS[:len(ranks)] + [1] * max(0, len(ranks) - len(RANK_WEIGHTS))
+    users = [
+        User(
+            username=f'{PREFIX}_{i:05d}',
+            nickname=f'{PREFIX}{i}',
+            email=f'{PREFIX}{i}@example.com',
+            password=password,
+            department=rng.choice(departments),
+            rank=rng.choices(ranks, weights=weights)[0],
+        )
+        for i in range(count)
+    ]
+    User.objects.bulk_create(users, batch_size=batch_size)
+    return list(User.objects.filter(username__startswith=f'{PREFIX}_').order_by('id'))
+
+
+def create_boards(rng, count, departments, ranks):
+    """권한 유형을 섞어서 생성: 전체 공개 / 부서 제한 / 쓰기 직급 제한 / 부서+직급 제한, 그리고 공지사항"""
+    roots = [d for d in departments if d.parent_id is None]
+    senior = [r for r in ranks if r.level >= ranks[len(ranks) // 2].level]
+    boards = []
+    for i in range(count):
+        board = Board.objects.create(name=f'{PREFIX}-board-{i:02d}', slug=f'{PREFIX}-{i:02d}', description=_sentence(rng, 3))
+        kind = i % 4
+        if kind in (1, 3):
+            board.read_access_depts.set(rng.sample(roots, k=min(len(roots), rng.randint(1, 2))))
+        if kind == 2:
+            board.write_access_ranks.set(senior)
+        if kind == 3:
+            board.read_access_ranks.set(ranks[1:])
+        boards.append(board)
+
+    notice = Board.objects.filter(name=NOTICE_BOARD_NAME).first()
+    if notice is None:
+        notice = Board.objects.create(name=NOTICE_BOARD_NAME, slug=f'{PREFIX}-notice', description='전사 공지')
+        notice.write_access_ranks.set(ranks[-2:])
+    boards.append(notice)
+    return boards
+
+
+def seed(departments=30, users=1000, boards=12, posts=5000, comments=20000, messages=10000,
+         notifications=20000, days=180, seed=42, batch_size=1000, log=None):
+    """bench 데이터를 만들고 종류별 생성 수를 돌려줌. 이미 있으면 먼저 clear() 하세요."""
+    rng = random.Random(seed)
+    log = log or (lambda message: None)
+    User = get_user_model()
+    if User.objects.filter(username__startswith=f'{PREFIX}_').exists():
+        raise ValueError("이미 bench 데이터가 있습니다. --clear 로 지운 뒤 다시 실행하세요.")
+
+    with transaction.atomic():
+        rank_list = ensure_ranks()
+        dept_list = create_departments(rng, departments)
+        log(f"부서 {len(dept_list)}개, 직급 {len(rank_list)}개")
+        user_list = create_users(rng, users, dept_list, rank_list, batch_size)
+        log(f"사원 {len(user_list)}명")
+        board_list = create_boards(rng, boards, dept_list, rank_list)
+        log(f"게시판 {len(board_list)}개")
+
+        with _manual_timestamps(Post._meta.get_field('created_at'), Comment._meta.get_field('created_at'),
+                                Message._meta.get_field('created_at'), Notification._meta.get_field('created_at')):
+            Post.objects.bulk_create([
+                Post(board=rng.choice(board_list), author=rng.choice(user_list),
+                     title=_sentence(rng, rng.randint(3, 8)), content=_sentence(rng, rng.randint(20, 120)),
+                     view_count=rng.randint(0, 500), created_at=created, is_active=rng.random() > 0.03)
+                for created in _spread(rng, posts, days)
+            ], batch_size=batch_size)
+            post_list = list(
+                Post.objects.filter(author__username__startswith=f'{PREFIX}_').order_by('id').values_list('id', 'created_at')
+            )
+            log(f"게시글 {len(post_list)}개")
+
+            # 댓글은 최근 글에 몰리도록 (글 목록 뒤쪽일수록 가중치 큼)
+            picks = rng.choices(post_list, weights=range(1, len(post_list) + 1), k=comments) if post_list else []
+            Comment.objects.bulk_create([
+                Comment(post_id=post_id, author=rng.choice(user_list), content=_sentence(rng, rng.randint(3, 25)),
+                        created_at=created + timedelta(minutes=rng.randint(1, 600)))
+                for post_id, created in picks
+            ], batch_size=batch_size)
+            log(f"댓글 {len(picks)}개")
+
+            Message.objects.bulk_create([
+                Message(sender=sender, receiver=rng.choice(user_list), content=_sentence(rng, rng.randint(5, 40)),
+                        created_at=created, read_at=created + timedelta(hours=1) if rng.random() < 0.7 else None)
+                for sender, created in ((rng.choice(user_list), c) for c in _spread(rng, messages, days))
+            ], batch_size=batch_size)
+            log(f"쪽지 {messages}개")
+
+            Notification.objects.bulk_create([
+                Notification(recipient=rng.choice(user_list), sender=rng.choice(user_list),
+                             message=f"💬 {_sentence(rng, 4)}", link=f"/community/post/{rng.choice(post_list)[0]}/",
+                             is_read=rng.random() < 0.7, created_at=created)
+                for created in _spread(rng, notifications if post_list else 0, days)
+            ], batch_size=batch_size)
+            log(f"알림 {notifications if post_list else 0}개")
+
+    # 권한 규칙이 바뀌었으므로 캐시를 새로 채움
+    Board.prime_acl_cache()
+    return {
+        'departments': len(dept_list), 'ranks': len(rank_list), 'users': len(user_list), 'boards': len(board_list),
+        'posts': len(post_list), 'comments': len(picks), 'messages': messages,
+        'notifications': notifications if post_list else 0,
+    }
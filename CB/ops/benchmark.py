@@ -0,0 +1,283 @@
+"""
+벤치마크 실행 (python manage.py run_benchmark)
+
+seed_benchmark_data 로 만든 데이터 위에서 실제 URLconf/미들웨어/템플릿을 그대로 거치는 요청을 여러 스레드로 보내고,
+시나리오별 p50/p95/p99 응답 시간, 요청당 쿼리 수, 처리량을 JSON 으로 남긴다. 커밋 사이 비교는 compare().
+
+- 스레드마다 테스트 Client 하나 (일반 사원으로 로그인) + 공지 작성용 Client 하나 (상위 직급)
+- 쿼리 수는 QueryBudgetMiddleware 가 붙이는 X-Query-Count 헤더를 씀 (실행 중에는 모든 요청을 측정)
+- 같은 --seed 면 같은 순서/같은 사원/같은 글로 요청 → 결과 차이는 코드 차이
+"""
+import platform
+import random
+import subprocess
+import threading
+import time
+from dataclasses import dataclass, field
+
+import django
+from django.contrib.auth import get_user_model
+from django.db import connection, connections
+from django.test import Client
+from django.urls import reverse
+from django.utils import timezone
+
+from community.models import Board, Post
+from .benchdata import NOTICE_BOARD_NAME, PREFIX, WORDS
+
+# ---------- 시나리오 ----------
+# 함수(session, rng) → 응답. 가중치는 실제 사용 비율을 대략 흉내냄
+def board_list(session, rng):
+    return session.client.get(reverse('board_list'))
+
+
+def post_list(session, rng):
+    return session.client.get(reverse('post_list', args=[rng.choice(session.boards).slug]))
+
+
+def post_detail(session, rng):
+    return session.client.get(reverse('post_detail', args=[rng.choice(session.post_ids)]))
+
+
+def search(session, rng):
+    return session.client.get(reverse('all_posts'), {'q': rng.choice(WORDS)})
+
+
+def inbox(session, rng):
+    return session.client.get(reverse('inbox'))
+
+
+def send(session, rng):
+    receiver = rng.choice(session.context.user_ids)
+    return session.client.post(reverse('send_message'), {'receiver': receiver, 'content': f'{PREFIX} {rng.choice(WORDS)}'})
+
+
+def announce(session, rng):
+    # 공지사항 게시판 글 → 작성자보다 직급이 낮은 모든 사원에게 알림 (community/signals.py)
+    notice = session.context.notice
+    return session.senior.post(reverse('post_create', args=[notice.slug]), {
+        'title': f'{PREFIX} 공지 {rng.choice(WORDS)}', 'content': ' '.join(rng.choices(WORDS, k=30)),
+    })
+
+
+SCENARIOS = {
+    'board_list': (15, board_list),
+    'post_list': (25, post_list),
+    'post_detail': (30, post_detail),
+    'search': (10, search),
+    'inbox': (10, inbox),
+    'send': (8, send),
+    'announce': (2, announce),
+}
+
+
+# ---------- 준비 ----------
+@dataclass
+class Context:
+    users: list
+    user_ids: list
+    post_ids: dict  # 게시판 id → 글 id 목록
+    boards: list
+    notice: Board
+    senior: object
+
+
+@dataclass
+class Session:
+    client: Client
+    senior: Client
+    boards: list  # 이 사원이 읽을 수 있는 게시판
+    post_ids: list  # 그 게시판들의 글
+    context: Context
+
+
+def load_context():
+    User = get_user_model()
+    users = list(User.objects.filter(username__startswith=f'{PREFIX}_').select_related('department', 'rank').order_by('id'))
+    if not users:
+        raise ValueError("bench 데이터가 없습니다. 먼저 python manage.py seed_benchmark_data 를 실행하세요.")
+    boards = list(Board.objects.filter(slug__startswith=f'{PREFIX}-').order_by('slug'))
+    notice = Board.objects.get(name=NOTICE_BOARD_NAME)
+    senior = next((u for u in sorted(users, key=lambda u: -u.rank_power) if notice.can_write(u)), None)
+    if senior is None:
+        raise ValueError("공지사항에 글을 쓸 수 있는 bench 사원이 없습니다.")
+    post_ids = {}
+    for board_id, post_id in Post.objects.filter(board__in=boards, is_active=True).values_list('board_id', 'id'):
+        post_ids.setdefault(board_id, []).append(post_id)
+    return Context(users, [u.pk for u in users], post_ids, boards, notice, senior)
+
+
+def _session(context, rng):
+    user = rng.choice(context.users)
+    readable = [b for b in context.boards if b.can_read(user) and b.pk in context.post_ids]
+    while not readable:  # 읽을 수 있는 게시판(글 있는)이 하나도 없는 사원은 건너뜀
+        user = rng.choice(context.users)
+        readable = [b for b in context.boards if b.can_read(user) and b.pk in context.post_ids]
+    # 500 응답도 예외 대신 결과로 기록
+    client = Client(raise_request_exception=False)
+    client.force_login(user)
+    senior = Client(raise_request_exception=False)
+    senior.force_login(context.senior)
+    post_ids = [post_id for board in readable for post_id in context.post_ids[board.pk]]
+    return Session(client, senior, readable, post_ids, context)
+
+
+# ---------- 실행 ----------
+@dataclass
+class Sample:
+    scenario: str
+    seconds: float
+    status: int
+    queries: int
+    error: bool
+
+
+@dataclass
+class Run:
+    samples: list = field(default_factory=list)
+    errors: list = field(default_factory=list)
+    started: list = field(default_factory=list)   # 스레드별 측정 시작/끝 (준비 요청 제외한 구간으로 처리량 계산)
+    finished: list = field(default_factory=list)
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+
+def _is_error(response):
+    # GET 은 200, 쓰기(POST)는 처리 후 이동(302)이 정상. 그 밖의 이동은 권한 거부/로그인 페이지로 튕긴 것
+    expected = 302 if response.request['REQUEST_METHOD'] == 'POST' else 200
+    return response.status_code != expected
+
+
+def _worker(index, context, names, weights, seed, deadline, budget, run):
+    rng = random.Random(seed * 1000 + index)
+    try:
+        session = _session(context, rng)
+        for name in names:  # 첫 요청(캐시/연결 준비)은 측정에서 제외
+            SCENARIOS[name][1](session, rng)
+        with run.lock:
+            run.started.append(time.perf_counter())
+        while time.perf_counter() < deadline and budget.take():
+            name = rng.choices(names, weights=weights)[0]
+            begin = time.perf_counter()
+            response = SCENARIOS[name][1](session, rng)
+            elapsed = time.perf_counter() - begin
+            queries = int(response.get('X-Query-Count', -1))
+            sample = Sample(name, elapsed, response.status_code, queries, _is_error(response))
+            with run.lock:
+                run.samples.append(sample)
+                if sample.error:
+                    run.errors.append(f"{name}: {response.status_code} {response.request['PATH_INFO']}")
+    except Exception as e:
+        with run.lock:
+            run.errors.append(f"worker {index}: {type(e).__name__}: {e}")
+    finally:
+        with run.lock:
+            run.finished.append(time.perf_counter())
+        connections.close_all()
+
+
+class _Budget:
+    """전체 요청 수 제한 (스레드들이 나눠 씀). None 이면 시간 제한만 적용"""
+
+    def __init__(self, total):
+        self.remaining = total
+        self.lock = threading.Lock()
+
+    def take(self):
+        if self.remaining is None:
+            return True
+        with self.lock:
+            if self.remaining <= 0:
+                return False
+            self.remaining -= 1
+            return True
+
+
+def run(concurrency=4, requests=500, duration=None, scenarios=None, seed=1):
+    """벤치마크를 실행하고 결과(dict, JSON 으로 저장 가능)를 돌려줌"""
+    names = list(scenarios or SCENARIOS)
+    unknown = set(names) - set(SCENARIOS)
+    if unknown:
+        raise ValueError(f"알 수 없는 시나리오: {', '.join(sorted(unknown))}")
+    weights = [SCENARIOS[name][0] for name in names]
+    context = load_context()
+
+    result = Run()
+    budget = _Budget(None if duration else requests)
+    deadline = time.perf_counter() + (duration or 10 ** 9)
+    threads = [
+        threading.Thread(target=_worker, name=f'bench-{i}',
+                         args=(i, context, names, weights, seed, deadline, budget, result))
+        for i in range(concurrency)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = max(result.finished) - min(result.started) if result.started else 0
+    return report(result, wall, concurrency, seed, names)
+
+
+# ---------- 결과 ----------
+def _percentile(sorted_values, pct):
+    if not sorted_values:
+        return None
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * pct / 100))]
+
+
+def _stats(samples, wall):
+    ms = sorted(s.seconds * 1000 for s in samples)
+    queries = [s.queries for s in samples if s.queries >= 0]
+    return {
+        'requests': len(samples),
+        'errors': sum(1 for s in samples if s.error),
+        'mean_ms': round(sum(ms) / len(ms), 2) if ms else None,
+        'p50_ms': round(_percentile(ms, 50), 2) if ms else None,
+        'p95_ms': round(_percentile(ms, 95), 2) if ms else None,
+        'p99_ms': round(_percentile(ms, 99), 2) if ms else None,
+        'queries_mean': round(sum(queries) / len(queries), 1) if queries else None,
+        'queries_max': max(queries) if queries else None,
+        'throughput_rps': round(len(samples) / wall, 1) if wall else None,
+    }
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, timeout=5, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return ''
+
+
+def report(result, wall, concurrency, seed, names):
+    by_scenario = {name: [s for s in result.samples if s.scenario == name] for name in names}
+    return {
+        'meta': {
+            'commit': _git_commit(),
+            'created': timezone.now().isoformat(timespec='seconds'),
+            'database': connection.vendor,
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'concurrency': concurrency,
+            'seed': seed,
+            'wall_seconds': round(wall, 2),
+        },
+        'total': _stats(result.samples, wall),
+        'scenarios': {name: _stats(samples, wall) for name, samples in by_scenario.items()},
+        'errors': result.errors[:50],
+    }
+
+
+def compare(before, after):
+    """두 결과의 시나리오별 p95/쿼리 수/처리량 변화 (표 한 줄씩)"""
+    lines = [f"{'시나리오':<14}{'p95 ms':>22}{'쿼리/요청':>20}{'req/s':>20}"]
+    rows = [('(전체)', before['total'], after['total'])]
+    rows += [(name, before['scenarios'].get(name) or {}, stats) for name, stats in after['scenarios'].items()]
+    for name, old, new in rows:
+        cells = []
+        for key in ('p95_ms', 'queries_mean', 'throughput_rps'):
+            a, b = old.get(key), new.get(key)
+            change = f" ({(b - a) / a * 100:+.0f}%)" if a and b is not None else ''
+            cells.append(f"{a if a is not None else '-'} → {b if b is not None else '-'}{change}")
+        lines.append(f"{name:<14}" + ''.join(f"{cell:>22}" for cell in cells))
+    return lines
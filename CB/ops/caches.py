@@ -0,0 +1,54 @@
+"""
+캐시 공유 여부 확인 (settings 3-13)
+
+권한 규칙(Board.access_rules), 읽음 표시(ReadMarker.for_user) 같은 캐시는 값이 바뀌면 signals.py 에서 지우는데, 메모리 캐시(LocMem)는 워커마다 따로라서
+지운 워커 말고 나머지 워커에는 오래된 값이 남는다 (권한을 뺏어도 다른 워커에서는 계속 보임).
+- is_shared(): Redis/memcached/DB 캐시처럼 모든 워커가 같이 보는 캐시인지
+- timeout(): 공유 캐시면 원래 시간, 아니면 LOCAL_CACHE_MAX_TIMEOUT 초로 줄인 시간 → 남은 값도 곧 사라짐
+- check_shared_cache: 운영(DEBUG=False)에서 공유 캐시가 아니면 manage.py check / 서버 시작 때 경고
+  (기본 캐시 ops.W001, 요청 제한 캐시 RATELIMIT_CACHE_ALIAS ops.W002)
+"""
+from django.conf import settings
+from django.core import checks
+
+SHARED_BACKENDS = (
+    'django.core.cache.backends.redis.RedisCache',
+    'django.core.cache.backends.memcached.PyMemcacheCache',
+    'django.core.cache.backends.memcached.PyLibMCCache',
+    'django.core.cache.backends.db.DatabaseCache',
+)
+
+
+def is_shared(alias='default'):
+    return settings.CACHES.get(alias, {}).get('BACKEND') in SHARED_BACKENDS
+
+
+def timeout(seconds, alias='default'):
+    """공유 캐시가 아니면 다른 워커에서 지울 수 없으므로 짧게만 보관"""
+    if is_shared(alias):
+        return seconds
+    return min(seconds, settings.LOCAL_CACHE_MAX_TIMEOUT)
+
+
+@checks.register(checks.Tags.caches)
+def check_shared_cache(app_configs, **kwargs):
+    if settings.DEBUG or is_shared('default'):
+        return []
+    return [checks.Warning(
+        "기본 캐시가 워커마다 따로인 메모리 캐시입니다. 게시판 권한/읽음 표시 캐시는 "
+        f"{settings.LOCAL_CACHE_MAX_TIMEOUT}초만 보관하므로 적중률이 낮습니다.",
+        hint="CACHE_URL 에 redis:// 또는 memcached:// 주소를 지정하세요.",
+        id='ops.W001',
+    )]
+
+
+@checks.register(checks.Tags.caches)
+def check_ratelimit_cache(app_configs, **kwargs):
+    if settings.DEBUG or is_shared(settings.RATELIMIT_CACHE_ALIAS):
+        return []
+    return [checks.Warning(
+        f"요청 제한 캐시({settings.RATELIMIT_CACHE_ALIAS})가 워커마다 따로인 메모리 캐시입니다. "
+        "@rate_limit 한도를 워커마다 따로 세므로 전체 한도는 워커 수만큼 커집니다.",
+        hint="CACHE_URL 또는 RATELIMIT_CACHE_ALIAS 로 Redis/memcached 캐시를 지정하세요.",
+        id='ops.W002',
+    )]
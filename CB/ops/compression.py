@@ -0,0 +1,148 @@
+"""
+응답 압축 (gzip)
+
+화면 HTML 과 JSON 응답을 압축하지 않고 보내고 있어서, 사무실 느린 회선에서는 전송 시간이 응답 시간의 대부분이었다.
+django.middleware.gzip.GZipMiddleware 와 같은 일을 하되
+- 종류별 압축 수준 (COMPRESS_LEVELS): 한 번 만들어 여러 번 받는 HTML 은 높게, 자주 오가는 작은 JSON 은 낮게
+- COMPRESS_MIN_SIZE 보다 작은 응답은 그대로 (압축 헤더가 더 큼)
+- 스트리밍 응답은 조각마다 sync flush → 앞부분이 먼저 도착하는 효과를 잃지 않음
+- 이미지/압축 파일/첨부 다운로드(FileResponse, Range 응답)는 건드리지 않음 (이미 압축돼 있거나 길이/범위가 바뀌면 안 됨)
+- CSRF 토큰이 든 HTML 을 압축하므로 Django 처럼 gzip 헤더의 파일 이름 칸에 무작위 길이 값을 넣음 (BREACH 완화)
+"""
+import random
+import re
+import string
+import struct
+import zlib
+
+from django.conf import settings
+from django.http import FileResponse
+from django.utils.cache import patch_vary_headers
+
+from . import metrics
+
+_ACCEPTS_GZIP = re.compile(r'\bgzip\b')
+_FNAME = 0x08
+
+
+class GzipWriter:
+    """raw deflate 에 gzip 헤더/꼬리를 직접 붙임 (파일 이름 칸을 채우고, 조각마다 flush 하기 위해)"""
+
+    def __init__(self, level, max_random_bytes=0):
+        self._deflate = zlib.compressobj(level, zlib.DEFLATED, -zlib.MAX_WBITS)
+        self._crc = 0
+        self._size = 0
+        self._max_random_bytes = max_random_bytes
+
+    def header(self):
+        if not self._max_random_bytes:
+            return b'\x1f\x8b\x08\x00\x00\x00\x00\x00\x00\xff'
+        length = random.randint(1, self._max_random_bytes)
+        filename = ''.join(random.choices(string.ascii_letters, k=length)).encode()
+        return b'\x1f\x8b\x08' + bytes([_FNAME]) + b'\x00\x00\x00\x00\x00\xff' + filename + b'\x00'
+
+    def compress(self, data, flush=False):
+        self._crc = zlib.crc32(data, self._crc)
+        self._size += len(data)
+        out = self._deflate.compress(data)
+        return out + self._deflate.flush(zlib.Z_SYNC_FLUSH) if flush else out
+
+    def finish(self):
+        return self._deflate.flush() + struct.pack('<II', self._crc, self._size & 0xFFFFFFFF)
+
+
+def compress_bytes(data, level, max_random_bytes=0):
+    writer = GzipWriter(level, max_random_bytes)
+    return writer.header() + writer.compress(data) + writer.finish()
+
+
+def _content_type(response):
+    return response.get('Content-Type', '').split(';', 1)[0].strip().lower()
+
+
+class CompressionMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        level = self._level(request, response)
+        if level is None:
+            return response
+        random_bytes = settings.COMPRESS_RANDOM_BYTES
+        content_type = _content_type(response)
+
+        if response.streaming:
+            writer = GzipWriter(level, random_bytes)
+            if response.is_async:
+                response.streaming_content = self._acompress(writer, response.streaming_content, content_type)
+            else:
+                response.streaming_content = self._compress(writer, response.streaming_content, content_type)
+            del response['Content-Length']
+        else:
+            original = response.content
+            compressed = compress_bytes(original, level, random_bytes)
+            if len(compressed) >= len(original):
+                return response
+            response.content = compressed
+            response['Content-Length'] = str(len(compressed))
+            self._count(content_type, len(original), len(compressed))
+
+        # 내용이 바뀌었으므로 강한 ETag 는 약한 ETag 로 (ConditionalGetMiddleware 의 비교는 그대로 동작)
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        response['Content-Encoding'] = 'gzip'
+        return response
+
+    def _level(self, request, response):
+        """압축할 응답이면 압축 수준, 아니면 None"""
+        if isinstance(response, FileResponse) or response.has_header('Content-Encoding'):
+            return None
+        if response.status_code in (204, 206, 304) or response.has_header('Content-Range'):
+            return None
+        level = settings.COMPRESS_LEVELS.get(_content_type(response))
+        if level is None:
+            return None
+        if not response.streaming and len(response.content) < settings.COMPRESS_MIN_SIZE:
+            return None
+        # 압축 여부가 Accept-Encoding 에 따라 달라지므로 앞단 캐시가 구분하도록 (압축하지 않는 요청에도)
+        patch_vary_headers(response, ('Accept-Encoding',))
+        if not _ACCEPTS_GZIP.search(request.META.get('HTTP_ACCEPT_ENCODING', '')):
+            return None
+        return level
+
+    @staticmethod
+    def _count(content_type, original, sent):
+        metrics.COMPRESSION_BYTES.inc(original, content_type=content_type, stage='original')
+        metrics.COMPRESSION_BYTES.inc(sent, content_type=content_type, stage='sent')
+
+    def _compress(self, writer, chunks, content_type):
+        original = sent = 0
+        data = writer.header()
+        yield data
+        sent += len(data)
+        for chunk in chunks:
+            original += len(chunk)
+            data = writer.compress(chunk, flush=True)
+            if data:
+                sent += len(data)
+                yield data
+        data = writer.finish()
+        yield data
+        self._count(content_type, original, sent + len(data))
+
+    async def _acompress(self, writer, chunks, content_type):
+        original = sent = 0
+        data = writer.header()
+        yield data
+        sent += len(data)
+        async for chunk in chunks:
+            original += len(chunk)
+            data = writer.compress(chunk, flush=True)
+            if data:
+                sent += len(data)
+                yield data
+        data = writer.finish()
+        yield data
+        self._count(content_type, original, sent + len(data))
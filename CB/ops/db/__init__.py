@@ -0,0 +1,108 @@
+"""
+DB 연결 재사용 계층 (settings.DATABASES 의 ENGINE 을 'ops.db.mysql' / 'ops.db.sqlite3' 로 지정)
+
+Django 기본 동작(CONN_MAX_AGE, CONN_HEALTH_CHECKS) 위에 다음을 더함
+- 연결은 워커 스레드마다 유지 (Django 연결은 원래 스레드별) → 요청마다 TCP+TLS+인증을 다시 하지 않음
+- 재사용 전 확인(ping)은 마지막 사용 후 HEALTH_CHECK_INTERVAL 초가 지났을 때만 → 바쁜 워커는 왕복 0번
+- 수명 제한(CONN_MAX_AGE)에 무작위 편차를 줘서 워커들이 한꺼번에 재연결하지 않게 함
+- RDS 장애 조치(failover)로 연결이 끊겼거나 읽기 전용 노드에 붙어 있으면, 트랜잭션 밖의 쿼리는
+  새 연결로 한 번 다시 실행 (사용자에게는 오류 없이 지나감)
+- 연결/재사용/확인/재연결 횟수를 프로세스 단위로 집계 (connection_stats)
+"""
+import random
+import threading
+import time
+from collections import Counter
+
+from django.db import DatabaseError, OperationalError
+
+from ops import metrics
+
+_counters = Counter()
+_lock = threading.Lock()
+
+
+def _count(name, amount=1):
+    with _lock:
+        _counters[name] += amount
+    metrics.DB_CONNECTION_EVENTS.inc(amount, event=name)
+
+
+def connection_stats():
+    with _lock:
+        return dict(_counters)
+
+
+def reset_connection_stats():
+    with _lock:
+        _counters.clear()
+
+
+class PersistentConnectionMixin:
+    # 이 시간(초) 안에 쓴 연결은 확인 없이 재사용 (끊겨 있었다면 아래 재시도가 처리)
+    default_health_check_interval = 5
+    # 연결 수명 편차 (CONN_MAX_AGE 의 최대 10%를 앞당김)
+    max_age_jitter = 0.1
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._last_used = 0.0
+        self.health_check_interval = self.settings_dict.get(
+            'HEALTH_CHECK_INTERVAL', self.default_health_check_interval,
+        )
+        # 가장 바깥쪽 실행 래퍼로 등록 (execute_wrapper() 로 추가되는 래퍼들은 그 안쪽에 쌓임)
+        self.execute_wrappers.append(self._retry_on_lost_connection)
+
+    # ---------- 연결 ----------
+    def connect(self):
+        super().connect()
+        _count('connects')
+        self._last_used = time.monotonic()
+        max_age = self.settings_dict['CONN_MAX_AGE']
+        if self.close_at is not None and max_age:
+            self.close_at -= random.uniform(0, max_age * self.max_age_jitter)
+
+    def close_if_unusable_or_obsolete(self):
+        had_connection = self.connection is not None
+        super().close_if_unusable_or_obsolete()
+        if had_connection and self.connection is None:
+            _count('closed_obsolete')
+
+    def close_if_health_check_failed(self):
+        # 요청에서 처음 커서를 만들 때 한 번 호출됨 (새 연결이면 health_check_done=True 라 건너뜀)
+        if self.connection is None or self.health_check_done:
+            return
+        _count('reuses')
+        if time.monotonic() - self._last_used < self.health_check_interval or not self.health_check_enabled:
+            _count('health_check_skips')
+            self.health_check_done = True
+            return
+        _count('health_checks')
+        super().close_if_health_check_failed()
+        if self.connection is None:
+            _count('health_check_failures')
+
+    def create_cursor(self, name=None):
+        self._last_used = time.monotonic()
+        return super().create_cursor(name)
+
+    # ---------- 장애 조치 재시도 ----------
+    def is_connection_lost(self, exc, sql):
+        """드라이버 오류가 '연결이 죽었음'을 뜻하고, 다시 실행해도 안전한지. 백엔드별로 구현"""
+        return False
+
+    def _retry_on_lost_connection(self, execute, sql, params, many, context):
+        try:
+            return execute(sql, params, many, context)
+        except OperationalError as e:
+            # 트랜잭션 안에서는 앞선 쿼리 결과가 사라졌으므로 다시 실행하면 안 됨
+            if self.in_atomic_block or not self.get_autocommit() or not self.is_connection_lost(e.__cause__, sql):
+                raise
+        _count('reconnects')
+        try:
+            self.close()
+        except DatabaseError:
+            self.connection = None
+        self.connect()
+        context['cursor'].cursor = self.create_cursor()
+        return execute(sql, params, many, context)
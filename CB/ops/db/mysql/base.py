@@ -0,0 +1,19 @@
+from django.db.backends.mysql import base
+
+from ops.db import PersistentConnectionMixin
+
+# 연결이 끊긴 경우 (2006: server has gone away, 2013: lost connection, 2055: lost connection / 시스템 오류)
+CONNECTION_LOST = {2006, 2013, 2055}
+# 장애 조치 후 예전 writer(이제 reader)에 붙어 있는 경우 (1290/1836: read-only)
+READ_ONLY = {1290, 1836}
+
+
+class DatabaseWrapper(PersistentConnectionMixin, base.DatabaseWrapper):
+    def is_connection_lost(self, exc, sql):
+        code = exc.args[0] if exc is not None and exc.args else None
+        if code == 2006 or code in READ_ONLY:
+            return True  # 쿼리가 서버에서 실행되지 않았음
+        if code in CONNECTION_LOST:
+            # 실행 도중 끊긴 경우는 이미 반영됐을 수 있으므로 읽기 쿼리만 다시 실행
+            return sql.lstrip()[:6].upper() == 'SELECT'
+        return False
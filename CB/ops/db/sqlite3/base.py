@@ -0,0 +1,8 @@
+from django.db.backends.sqlite3 import base
+
+from ops.db import PersistentConnectionMixin
+
+
+# 로컬 개발/벤치마크용. SQLite 는 끊길 일이 없으므로 재시도는 하지 않고 연결 재사용과 집계만 함
+class DatabaseWrapper(PersistentConnectionMixin, base.DatabaseWrapper):
+    pass
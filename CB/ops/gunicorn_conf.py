@@ -0,0 +1,92 @@
+"""
+gunicorn 설정 파일
+
+    gunicorn -c python:ops.gunicorn_conf        (보통은 python manage.py serve 로 실행)
+
+워커 종류/개수는 ops/server.py 에서 인스턴스 사양을 보고 계산한다.
+"""
+import gc
+import logging
+import os
+
+from ops.server import build_config
+
+_config = build_config()
+_plan = _config.pop('plan')
+_max_worker_rss = _config.pop('max_worker_rss')
+globals().update(_config)
+
+accesslog = '-'
+errorlog = '-'
+loglevel = os.environ.get('SERVE_LOG_LEVEL', 'info')
+
+# 이 요청 수마다 한 번씩 워커 메모리(RSS)를 확인
+RSS_CHECK_INTERVAL = 20
+
+logger = logging.getLogger('gunicorn.error')
+
+
+def current_rss():
+    """현재 프로세스가 실제로 쓰는 메모리(bytes)"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024  # Linux 기준 KB
+
+
+def on_starting(server):
+    # 이전 실행에서 종료된 워커의 파일을 archive 로 합침 (pid 가 재사용되면 새 워커가 그 파일에 이어 쓰므로).
+    # 같이 실행 중인 run_worker 등 살아 있는 프로세스의 파일은 건드리지 않음
+    from ops import metrics
+    metrics.archive_dead_processes()
+
+
+def child_exit(server, worker):
+    # 종료된 워커의 카운터는 archive 로 합치고 진행 중 요청 수 같은 게이지는 버림
+    from ops import metrics
+    metrics.archive_dead_processes()
+
+
+def when_ready(server):
+    server.log.info(
+        "워커 계획: %s x%s (threads=%s), 워커 메모리 한도 %dMB, cpu=%s mem=%dMB — %s",
+        _plan.worker_class, workers, threads, _max_worker_rss // (1024 * 1024),
+        _plan.cpus, _plan.memory // (1024 * 1024), _plan.reason,
+    )
+    # 템플릿/URL 컴파일은 마스터에서 한 번만 → fork 된 워커들이 결과를 공유
+    if preload_app:
+        from ops import warmup
+        for r in warmup.run(fork_safe_only=True, stop_on_error=False):
+            server.log.info("warm-up(master) %s: %d개 %.3fs %s", r.name, r.count, r.seconds, r.error)
+    # preload 로 읽어둔 객체를 GC 대상에서 빼서, 워커에서 GC가 돌 때 공유 페이지가 복사되지 않게 함
+    gc.collect()
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    # 마스터에서 열린 DB 연결이 있다면 워커끼리 같은 소켓을 쓰지 않도록 닫음
+    from django.db import connections
+    for conn in connections.all(initialized_only=True):
+        conn.close()
+
+
+def post_worker_init(worker):
+    # 요청을 받기 전에 준비 작업 → 끝나야 /healthz/ready 가 200
+    from ops import readiness
+    readiness.warm_up()
+
+
+def post_request(worker, req, environ, resp):
+    count = getattr(worker, '_served', 0) + 1
+    worker._served = count
+    if count % RSS_CHECK_INTERVAL:
+        return
+    rss = current_rss()
+    if rss > _max_worker_rss and worker.alive:
+        worker.log.warning(
+            "워커 %s 메모리 %dMB > 한도 %dMB → 현재 요청 후 교체",
+            worker.pid, rss // (1024 * 1024), _max_worker_rss // (1024 * 1024),
+        )
+        worker.alive = False  # 처리 중인 요청을 마치고 종료 → 마스터가 새 워커를 띄움
@@ -0,0 +1,26 @@
+"""
+여러 인스턴스에서 같은 작업이 겹치지 않게 하는 이름 잠금
+
+인스턴스마다 타이머/스케줄러가 같은 정리 작업을 띄우므로, MySQL 이름 잠금(GET_LOCK)을 잡은 한 곳에서만 실행한다.
+잠금은 DB 연결(세션)에 묶여 있어서 프로세스가 죽으면 저절로 풀림.
+"""
+from contextlib import contextmanager
+
+from django.db import connection
+
+
+@contextmanager
+def named_lock(name):
+    """잠금을 잡으면 True, 다른 곳에서 잡고 있으면 기다리지 않고 False. MySQL 이 아니면 (서버 한 대) 항상 True"""
+    if connection.vendor != 'mysql':
+        yield True
+        return
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT GET_LOCK(%s, 0)", [name])
+        acquired = cursor.fetchone()[0] == 1
+    try:
+        yield acquired
+    finally:
+        if acquired:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT RELEASE_LOCK(%s)", [name])
@@ -0,0 +1,39 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from ops import archive
+
+
+class Command(BaseCommand):
+    help = (
+        "삭제된 지 오래된 글과 아주 오래된 글을 댓글과 함께 보관 테이블로 옮깁니다. "
+        "글 여러 개씩 나눠서 옮기므로 중간에 멈춰도 다시 실행하면 남은 글부터 이어서 처리합니다."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--old-days', type=int, default=settings.POST_ARCHIVE_AFTER_DAYS,
+                            help="작성된 지 이 일수가 지난 글을 보관")
+        parser.add_argument('--deleted-days', type=int, default=settings.POST_ARCHIVE_DELETED_AFTER_DAYS,
+                            help="삭제(숨김) 처리된 지 이 일수가 지난 글을 보관")
+        parser.add_argument('--batch-size', type=int, default=settings.POST_ARCHIVE_BATCH_SIZE,
+                            help="한 트랜잭션에서 옮길 글 수")
+        parser.add_argument('--sleep', type=float, default=settings.POST_ARCHIVE_SLEEP, help="구간 사이 쉬는 시간(초)")
+        parser.add_argument('--dry-run', action='store_true', help="옮기지 않고 대상 수만 출력")
+
+    def handle(self, *args, **options):
+        result = archive.run(
+            old_days=options['old_days'], deleted_days=options['deleted_days'],
+            batch_size=options['batch_size'], sleep=options['sleep'], dry_run=options['dry_run'],
+            log=self.stdout.write if options['verbosity'] > 1 else None,
+        )
+        if result is None:
+            self.stdout.write(self.style.WARNING("다른 서버에서 이미 실행 중이라 건너뜁니다."))
+            return
+        prefix = "(dry-run) 보관 대상" if options['dry_run'] else "보관 완료"
+        self.stdout.write(self.style.SUCCESS(
+            f"{prefix}: 글 {result.posts}개, 댓글 {result.comments}개, 구간 {result.batches}, {result.seconds:.1f}초"
+        ))
+        if result.skipped:
+            self.stdout.write(self.style.WARNING(
+                f"보관 테이블에 같은 id 가 이미 있어 옮기지 않은 글 {result.skipped}개 (원래 테이블에 남겨 둠)"
+            ))
@@ -0,0 +1,73 @@
+import io
+import statistics
+import time
+
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from ops.db import connection_stats, reset_connection_stats
+
+
+class Command(BaseCommand):
+    help = "DB 연결을 요청마다 새로 여는 경우(CONN_MAX_AGE=0)와 재사용하는 경우의 요청 지연 시간을 비교합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', default='/community/', help="요청할 주소 (DB를 읽는 로그인 불필요 화면)")
+        parser.add_argument('--requests', type=int, default=300)
+        parser.add_argument('--max-age', type=int, default=300, help="재사용 쪽 CONN_MAX_AGE")
+        parser.add_argument('--connect-latency-ms', type=float, default=0,
+                            help="연결할 때마다 추가할 지연 (SQLite 로 RDS 의 TCP+TLS+인증 비용을 흉내낼 때)")
+
+    def handle(self, *args, **options):
+        conn = connections['default']
+        original_max_age = conn.settings_dict['CONN_MAX_AGE']
+        original_connect = conn.get_new_connection
+        if options['connect_latency_ms']:
+            delay = options['connect_latency_ms'] / 1000
+
+            def slow_connect(params):
+                time.sleep(delay)
+                return original_connect(params)
+            conn.get_new_connection = slow_connect
+
+        # 테스트 Client 는 요청 사이에 연결을 닫지 않으므로 실제 WSGI 핸들러(요청 시작/종료 신호 포함)로 호출
+        handler = WSGIHandler()
+        try:
+            for label, max_age in (('요청마다 연결', 0), (f'재사용 (CONN_MAX_AGE={options["max_age"]})', options['max_age'])):
+                conn.close()
+                conn.settings_dict['CONN_MAX_AGE'] = max_age
+                self._request(handler, options['path'])  # 첫 요청(템플릿/URL 준비)은 측정에서 제외
+                reset_connection_stats()
+                timings = [self._request(handler, options['path']) for _ in range(options['requests'])]
+                self._report(label, timings, connection_stats())
+        finally:
+            conn.settings_dict['CONN_MAX_AGE'] = original_max_age
+            conn.get_new_connection = original_connect
+            conn.close()
+
+    def _request(self, handler, path):
+        environ = {
+            'REQUEST_METHOD': 'GET', 'PATH_INFO': path, 'QUERY_STRING': '',
+            'SERVER_NAME': 'localhost', 'SERVER_PORT': '80', 'HTTP_HOST': 'localhost',
+            'wsgi.input': io.BytesIO(), 'wsgi.url_scheme': 'http', 'wsgi.errors': io.StringIO(),
+        }
+        begin = time.perf_counter()
+        response = handler(environ, lambda status, headers: None)
+        for _ in response:
+            pass
+        response.close()  # request_finished → CONN_MAX_AGE 에 따라 연결을 닫거나 유지
+        elapsed = time.perf_counter() - begin
+        if response.status_code >= 400:
+            self.stderr.write(f"{path} 응답 코드 {response.status_code}")
+        return elapsed
+
+    def _report(self, label, timings, stats):
+        timings.sort()
+        ms = [t * 1000 for t in timings]
+        p95 = ms[min(len(ms) - 1, int(len(ms) * 0.95))]
+        self.stdout.write(
+            f"{label:<28} 평균 {statistics.mean(ms):6.2f}ms  p50 {statistics.median(ms):6.2f}ms  "
+            f"p95 {p95:6.2f}ms  | 연결 {stats.get('connects', 0)}회, 재사용 {stats.get('reuses', 0)}회, "
+            f"ping {stats.get('health_checks', 0)}회"
+        )
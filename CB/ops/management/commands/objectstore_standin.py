@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from ops.objectstore_standin import make_server
+
+
+class Command(BaseCommand):
+    help = "개발/테스트용 S3 호환 오브젝트 스토리지를 로컬 폴더로 띄웁니다. (MEDIA_STORAGE=s3 와 함께 사용)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--root', default='objectstore', help="객체를 저장할 폴더")
+        parser.add_argument('--host', default='127.0.0.1')
+        parser.add_argument('--port', type=int, default=9000)
+        parser.add_argument('--access-key', default='standin')
+        parser.add_argument('--secret-key', default='standin-secret')
+        parser.add_argument('--region', default='ap-northeast-2')
+        parser.add_argument('--verbose', action='store_true', help="요청마다 로그 출력")
+
+    def handle(self, *args, **options):
+        server = make_server(
+            options['root'], options['access_key'], options['secret_key'],
+            host=options['host'], port=options['port'], region=options['region'], verbose=options['verbose'],
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"오브젝트 스토리지 stand-in: http://{options['host']}:{options['port']} (root={options['root']})"
+        ))
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
@@ -0,0 +1,37 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from ops import retention
+
+
+class Command(BaseCommand):
+    help = (
+        "보관 기간이 지난 알림을 정리합니다. 읽은 알림은 삭제하고, 안 읽은 알림은 사람별 요약 알림 하나로 합칩니다. "
+        "id 구간별로 조금씩 지우고 구간 사이에 쉬므로 서비스 중에 실행해도 됩니다."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--read-days', type=int, default=settings.NOTIFICATION_READ_RETENTION_DAYS,
+                            help="읽은 알림 보관 일수")
+        parser.add_argument('--unread-days', type=int, default=settings.NOTIFICATION_UNREAD_RETENTION_DAYS,
+                            help="안 읽은 알림을 요약으로 합치기 전까지 보관 일수")
+        parser.add_argument('--batch-size', type=int, default=settings.NOTIFICATION_PURGE_BATCH_SIZE,
+                            help="한 트랜잭션에서 다룰 행 수")
+        parser.add_argument('--sleep', type=float, default=settings.NOTIFICATION_PURGE_SLEEP,
+                            help="구간 사이 쉬는 시간(초)")
+        parser.add_argument('--dry-run', action='store_true', help="지우지 않고 정리 대상 수만 출력")
+
+    def handle(self, *args, **options):
+        result = retention.run(
+            read_days=options['read_days'], unread_days=options['unread_days'],
+            batch_size=options['batch_size'], sleep=options['sleep'], dry_run=options['dry_run'],
+            log=self.stdout.write if options['verbosity'] > 1 else None,
+        )
+        if result is None:
+            self.stdout.write(self.style.WARNING("다른 서버에서 이미 실행 중이라 건너뜁니다."))
+            return
+        prefix = "(dry-run) 정리 대상" if options['dry_run'] else "정리 완료"
+        self.stdout.write(self.style.SUCCESS(
+            f"{prefix}: 읽은 알림 삭제 {result.purged}, 안 읽은 알림 요약 {result.rolled_up} "
+            f"(요약 알림 {result.summaries}), 살펴본 행 {result.scanned}, 구간 {result.batches}, {result.seconds:.1f}초"
+        ))
@@ -0,0 +1,26 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from ops import sessions
+
+
+class Command(BaseCommand):
+    help = (
+        "만료된 로그인 세션을 조금씩 나눠서 지웁니다. "
+        "(clearsessions 는 DELETE 한 번으로 지워서 세션 테이블이 크면 오래 잠김)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=settings.SESSION_PURGE_BATCH_SIZE,
+                            help="한 번에 지울 세션 수")
+        parser.add_argument('--sleep', type=float, default=settings.SESSION_PURGE_SLEEP, help="구간 사이 쉬는 시간(초)")
+
+    def handle(self, *args, **options):
+        deleted = sessions.purge_expired(
+            batch_size=options['batch_size'], sleep=options['sleep'],
+            log=self.stdout.write if options['verbosity'] > 1 else None,
+        )
+        if deleted is None:
+            self.stdout.write(self.style.WARNING("다른 서버에서 이미 실행 중이라 건너뜁니다."))
+            return
+        self.stdout.write(self.style.SUCCESS(f"만료 세션 {deleted}개 삭제"))
@@ -0,0 +1,22 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from ops import uploads
+
+
+class Command(BaseCommand):
+    help = (
+        "끝내지 않은 분할 업로드와 글에 붙지 않은 업로드 파일을 정리합니다. "
+        "CHUNKED_UPLOAD_DIR 이 인스턴스 로컬 디스크면 인스턴스마다 실행하세요."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hours', type=int, default=settings.CHUNKED_UPLOAD_EXPIRE_HOURS,
+                            help="이 시간 동안 손대지 않은 업로드를 지움")
+
+    def handle(self, *args, **options):
+        result = uploads.run(hours=options['hours'])
+        self.stdout.write(self.style.SUCCESS(
+            f"정리 완료: 업로드 {result.sessions}개, 저장소 참조 {result.released}개, "
+            f"남은 임시 파일 {result.orphans}개, {result.seconds:.1f}초"
+        ))
@@ -0,0 +1,52 @@
+import json
+import logging
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+
+from ops import benchmark
+
+
+class Command(BaseCommand):
+    help = ("seed_benchmark_data 로 만든 데이터로 주요 화면(게시판 목록, 글 목록/상세, 검색, 쪽지함, 쪽지 보내기, 공지 알림)을 "
+            "여러 스레드로 호출하고 p50/p95/p99, 요청당 쿼리 수, 처리량을 JSON 으로 출력합니다.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=4, help="동시에 요청하는 스레드 수")
+        parser.add_argument('--requests', type=int, default=500, help="전체 요청 수 (--duration 이 있으면 무시)")
+        parser.add_argument('--duration', type=float, help="이 시간(초) 동안 계속 요청")
+        parser.add_argument('--scenarios', help=f"쉼표로 구분 (기본: 전체 = {','.join(benchmark.SCENARIOS)})")
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument('--output', help="결과 JSON 을 저장할 경로 (기본: 화면 출력)")
+        parser.add_argument('--compare', help="이전 결과 JSON 경로 → 시나리오별 변화를 함께 출력")
+
+    def handle(self, *args, **options):
+        scenarios = options['scenarios'].split(',') if options['scenarios'] else None
+        # 모든 요청의 쿼리 수를 재되, 예산 초과로 요청이 실패하거나 로그가 쏟아지지 않게 함
+        # 같은 사원이 짧은 시간에 글/쪽지를 계속 쓰므로 요청 제한(429)은 끔
+        logging.getLogger('ops.querybudget').setLevel(logging.ERROR)
+        with override_settings(QUERY_BUDGET_SAMPLE_RATE=1.0, QUERY_BUDGET_MODE='log', PROFILER_SLOW_MS=0,
+                               PROFILER_SAMPLE_RATE=0, RATELIMIT_ENABLED=False, ALLOWED_HOSTS=['*']):
+            try:
+                result = benchmark.run(
+                    concurrency=options['concurrency'], requests=options['requests'],
+                    duration=options['duration'], scenarios=scenarios, seed=options['seed'],
+                )
+            except ValueError as e:
+                raise CommandError(str(e))
+
+        output = json.dumps(result, ensure_ascii=False, indent=2)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as f:
+                f.write(output + '\n')
+            self.stdout.write(f"결과 저장: {options['output']}")
+        else:
+            self.stdout.write(output)
+
+        if result['errors']:
+            self.stderr.write(f"오류 {len(result['errors'])}건 (앞부분): " + ' / '.join(result['errors'][:5]))
+        if options['compare']:
+            with open(options['compare'], encoding='utf-8') as f:
+                before = json.load(f)
+            for line in benchmark.compare(before, result):
+                self.stdout.write(line)
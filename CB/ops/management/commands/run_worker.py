@@ -0,0 +1,86 @@
+import os
+import signal
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from ops import taskqueue
+
+
+class Command(BaseCommand):
+    help = (
+        "백그라운드 작업 워커를 실행합니다. 작업 큐(ops_task)에서 실행할 때가 된 작업을 가져가 실행하고, "
+        "주기 작업(정리 작업 등)도 시간이 되면 넣습니다. SIGTERM 을 받으면 실행 중인 작업을 마치고 종료합니다."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--queues', default='default,notifications,media,maintenance',
+                            help="가져갈 큐 이름 (쉼표로 구분)")
+        parser.add_argument('--threads', type=int, default=settings.TASK_WORKER_THREADS, help="프로세스당 실행 스레드 수")
+        parser.add_argument('--processes', type=int, default=1,
+                            help="워커 프로세스 수 (CPU 를 많이 쓰는 썸네일 작업이 많으면 늘림)")
+        parser.add_argument('--list', action='store_true', help="등록된 작업 목록만 출력")
+
+    def handle(self, *args, **options):
+        registry = taskqueue.discover()
+        if options['list']:
+            for name, task_function in sorted(registry.items()):
+                every = f" every={task_function.every}s" if task_function.every else ''
+                self.stdout.write(f"{name} queue={task_function.queue}{every}")
+            return
+        queues = [queue.strip() for queue in options['queues'].split(',') if queue.strip()]
+        if not queues:
+            raise CommandError("--queues 가 비어 있습니다.")
+        if options['threads'] < 1 or options['processes'] < 1:
+            raise CommandError("--threads/--processes 는 1 이상이어야 합니다.")
+
+        def run():
+            taskqueue.Worker(queues, threads=options['threads'], log=self.stdout.write).run()
+
+        if options['processes'] == 1:
+            run()
+        else:
+            self._supervise(run, options['processes'])
+
+    def _supervise(self, run, count):
+        """자식 프로세스 count 개를 띄우고, 죽으면 다시 띄움. SIGTERM 은 자식에게 전달"""
+        connections.close_all()  # 부모의 DB 연결을 자식들이 나눠 쓰지 않도록 fork 전에 닫음
+        children = set()
+        stopping = False
+
+        def spawn():
+            pid = os.fork()
+            if pid == 0:
+                try:
+                    run()
+                finally:
+                    os._exit(0)
+            children.add(pid)
+
+        def stop(*args):
+            nonlocal stopping
+            stopping = True
+            for pid in children:
+                try:
+                    os.kill(pid, signal.SIGTERM)
+                except ProcessLookupError:
+                    pass
+
+        signal.signal(signal.SIGTERM, stop)
+        signal.signal(signal.SIGINT, stop)
+        for _ in range(count):
+            spawn()
+        while children:
+            try:
+                pid, status = os.wait()
+            except ChildProcessError:
+                break
+            except InterruptedError:
+                continue
+            children.discard(pid)
+            if not stopping:
+                self.stderr.write(f"워커 프로세스 {pid} 종료 (상태 {status}), 다시 시작")
+                time.sleep(1)
+                spawn()
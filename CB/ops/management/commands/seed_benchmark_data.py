@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from ops import benchdata
+
+
+class Command(BaseCommand):
+    help = "벤치마크용 부서/직급/사원/게시판/글/댓글/쪽지/알림을 대량으로 생성합니다. (아이디/이름이 'bench' 로 시작)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--departments', type=int, default=30)
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--boards', type=int, default=12, help="공지사항 게시판은 별도로 하나 더 만듦 (없을 때)")
+        parser.add_argument('--posts', type=int, default=5000)
+        parser.add_argument('--comments', type=int, default=20000)
+        parser.add_argument('--messages', type=int, default=10000)
+        parser.add_argument('--notifications', type=int, default=20000)
+        parser.add_argument('--days', type=int, default=180, help="글/쪽지/알림 작성 시각을 최근 며칠에 흩을지")
+        parser.add_argument('--seed', type=int, default=42, help="같은 값이면 같은 데이터를 만듦")
+        parser.add_argument('--batch-size', type=int, default=1000, help="한 번에 INSERT 할 행 수")
+        parser.add_argument('--clear', action='store_true', help="기존 bench 데이터를 먼저 지움")
+        parser.add_argument('--clear-only', action='store_true', help="bench 데이터를 지우기만 함")
+
+    def handle(self, *args, **options):
+        if options['clear'] or options['clear_only']:
+            deleted = benchdata.clear()
+            self.stdout.write(f"기존 bench 데이터 삭제: 사원 {deleted['users']} / 게시판 {deleted['boards']} / "
+                              f"부서 {deleted['departments']} (연결된 행 포함)")
+            if options['clear_only']:
+                return
+
+        try:
+            counts = benchdata.seed(
+                departments=options['departments'], users=options['users'], boards=options['boards'],
+                posts=options['posts'], comments=options['comments'], messages=options['messages'],
+                notifications=options['notifications'], days=options['days'], seed=options['seed'],
+                batch_size=options['batch_size'], log=self.stdout.write,
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+        self.stdout.write(self.style.SUCCESS(
+            "생성 완료: " + ', '.join(f"{name} {count}" for name, count in counts.items())
+            + f" (로그인 비밀번호: {benchdata.PASSWORD})"
+        ))
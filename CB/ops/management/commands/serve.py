@@ -0,0 +1,64 @@
+import importlib.util
+import os
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from ops.server import MB, build_config
+
+
+class Command(BaseCommand):
+    help = "운영 서버(gunicorn)를 실행합니다. 워커 종류/개수는 인스턴스의 CPU와 메모리를 보고 정합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--bind', help="기본: 0.0.0.0:8000")
+        parser.add_argument('--worker-class', choices=['auto', 'sync', 'gthread', 'asgi'], help="기본: auto")
+        parser.add_argument('--workers', type=int, help="워커 프로세스 수 (기본: 자동 계산)")
+        parser.add_argument('--threads', type=int, help="gthread 워커의 스레드 수 (기본: 자동 계산)")
+        parser.add_argument('--max-requests', type=int, help="이 요청 수를 처리한 워커는 교체 (기본: 2000)")
+        parser.add_argument('--max-rss-mb', type=int, help="워커 메모리가 이 크기를 넘으면 교체 (기본: 자동 계산)")
+        parser.add_argument('--timeout', type=int, help="요청 처리 제한 시간(초) (기본: 30)")
+        parser.add_argument('--no-preload', action='store_true', help="워커마다 앱을 따로 읽음 (코드 자동 반영 확인용)")
+        parser.add_argument('--dry-run', action='store_true', help="계산된 설정만 출력하고 실행하지 않음")
+
+    def handle(self, *args, **options):
+        # 옵션은 환경변수로 넘겨서 gunicorn 설정 파일(ops/gunicorn_conf.py)이 같은 값을 읽게 함
+        env = {
+            'SERVE_BIND': options['bind'],
+            'SERVE_WORKER_CLASS': options['worker_class'],
+            'SERVE_WORKERS': options['workers'],
+            'SERVE_THREADS': options['threads'],
+            'SERVE_MAX_REQUESTS': options['max_requests'],
+            'SERVE_MAX_RSS_MB': options['max_rss_mb'],
+            'SERVE_TIMEOUT': options['timeout'],
+            'SERVE_PRELOAD': 'False' if options['no_preload'] else None,
+        }
+        for key, value in env.items():
+            if value is not None:
+                os.environ[key] = str(value)
+
+        config = build_config()
+        plan = config['plan']
+        db = settings.DATABASES['default']['ENGINE'].rsplit('.', 1)[-1]
+        self.stdout.write(f"모드: {'개발' if settings.DEBUG else '운영'} (DB: {db})")
+        self.stdout.write(f"인스턴스: CPU {plan.cpus}개, 메모리 {plan.memory // MB}MB — {plan.reason}")
+        self.stdout.write(
+            f"gunicorn: {config['worker_class']} 워커 {config['workers']}개 x 스레드 {config['threads']}, "
+            f"bind={config['bind']}, preload={config['preload_app']}, "
+            f"max_requests={config['max_requests']}(+{config['max_requests_jitter']}), "
+            f"max_rss={config['max_worker_rss'] // MB}MB, timeout={config['timeout']}s"
+        )
+        if options['dry_run']:
+            return
+
+        if importlib.util.find_spec('gunicorn') is None:
+            raise CommandError("gunicorn 이 설치되어 있지 않습니다. (pip install gunicorn)")
+        if config['worker_class'].startswith('uvicorn') and importlib.util.find_spec('uvicorn') is None:
+            raise CommandError("ASGI 워커를 쓰려면 uvicorn 이 필요합니다. (pip install uvicorn)")
+
+        # 현재 프로세스를 gunicorn 마스터로 교체 (systemd 가 gunicorn 프로세스를 직접 관리)
+        os.chdir(settings.BASE_DIR)
+        os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'CB.settings')
+        sys.stdout.flush()
+        os.execv(sys.executable, [sys.executable, '-m', 'gunicorn', '-c', 'python:ops.gunicorn_conf'])
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from ops import warmup
+
+
+class Command(BaseCommand):
+    help = (
+        "콜드 스타트 준비 작업(템플릿 컴파일, URL, DB 연결, 기준 데이터, 권한 캐시)을 실행하고 단계별 시간을 출력합니다. "
+        "서버 워커는 시작할 때 같은 작업을 스스로 실행하므로, 이 명령은 부팅 시 점검과 공유 캐시 채우기에 씁니다."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--keep-going', action='store_true', help="실패한 단계가 있어도 나머지 단계를 계속 실행")
+
+    def handle(self, *args, **options):
+        results = warmup.run(stop_on_error=not options['keep_going'])
+        for r in results:
+            line = f"{r.name:<15} {r.seconds * 1000:8.1f}ms  {r.count}개"
+            self.stdout.write(self.style.SUCCESS(line) if r.ok else self.style.ERROR(f"{line}  {r.error}"))
+        total = sum(r.seconds for r in results)
+        self.stdout.write(f"합계 {total * 1000:.1f}ms")
+        if any(not r.ok for r in results):
+            raise CommandError("warm-up 단계 중 실패한 것이 있습니다.")
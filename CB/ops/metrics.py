@@ -0,0 +1,391 @@
+"""
+Prometheus 형식 지표 (/metrics)
+
+gunicorn 워커는 프로세스가 여러 개라 메모리에 든 숫자를 서로 볼 수 없다.
+그래서 프로세스마다 METRICS_DIR/metrics_<pid>.db 파일을 mmap 으로 열어 값을 직접 쓰고,
+/metrics 요청을 받은 워커가 디렉터리의 파일을 모두 읽어서 합친다 → 어느 워커가 응답해도 인스턴스 전체 값
+
+- 값 쓰기는 프로세스 안의 잠금 하나 + mmap 에 8바이트 쓰기뿐 (파일 시스템 호출 없음)
+- 종료된 워커의 파일은 다음 수집 때 archive.db 에 합치고 지움 (카운터/히스토그램이 줄어들지 않게).
+  진행 중 요청 수 같은 게이지는 살아 있는 프로세스 값만 더함
+- prometheus_client 없이 표준 라이브러리로 구현 (같은 방식의 multiprocess 모드를 단순화한 것)
+"""
+import json
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows 개발 환경
+    fcntl = None
+
+INITIAL_FILE_SIZE = 64 * 1024
+ARCHIVE_NAME = 'archive.db'
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+DB_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1)
+FANOUT_BUCKETS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 5000)
+KNOWN_METHODS = {'GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS'}
+
+
+def metrics_dir():
+    from django.conf import settings
+    path = getattr(settings, 'METRICS_DIR', None) or os.path.join(tempfile.gettempdir(), 'cb-metrics')
+    os.makedirs(path, exist_ok=True)
+    return str(path)
+
+
+# ---------- mmap 파일 ----------
+# 파일 구조: [사용한 바이트 수 uint32 + 여백 4바이트] 다음에 항목이 이어짐
+# 항목: [키 길이 uint32][키 bytes][8바이트 경계까지 공백][값 double]
+def _entry(key):
+    encoded = key.encode()
+    padding = 8 - (len(encoded) + 4) % 8
+    return struct.pack(f'I{len(encoded)}s{padding}xd', len(encoded), encoded, 0.0)
+
+
+def _iter_entries(data):
+    used = struct.unpack_from('I', data, 0)[0]
+    pos = 8
+    while pos < used:
+        length = struct.unpack_from('I', data, pos)[0]
+        key = data[pos + 4:pos + 4 + length].decode()
+        pos += 4 + length
+        pos += 8 - pos % 8
+        yield key, struct.unpack_from('d', data, pos)[0], pos
+        pos += 8
+
+
+class MmapStore:
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'a+b')
+        size = os.fstat(self._file.fileno()).st_size
+        if size == 0:
+            self._file.truncate(INITIAL_FILE_SIZE)
+            size = INITIAL_FILE_SIZE
+        self._map = mmap.mmap(self._file.fileno(), size)
+        self._used = struct.unpack_from('I', self._map, 0)[0] or 8
+        self._positions = {key: pos for key, _, pos in _iter_entries(self._map)}
+
+    def _position(self, key):
+        pos = self._positions.get(key)
+        if pos is None:
+            entry = _entry(key)
+            while self._used + len(entry) > len(self._map):
+                size = len(self._map) * 2
+                self._map.close()
+                self._file.truncate(size)
+                self._map = mmap.mmap(self._file.fileno(), size)
+            self._map[self._used:self._used + len(entry)] = entry
+            self._used += len(entry)
+            struct.pack_into('I', self._map, 0, self._used)  # 항목을 다 쓴 뒤에 길이를 늘림 (읽는 쪽이 반쯤 쓴 항목을 보지 않게)
+            pos = self._positions[key] = self._used - 8
+        return pos
+
+    def add(self, key, amount):
+        pos = self._position(key)
+        value = struct.unpack_from('d', self._map, pos)[0]
+        struct.pack_into('d', self._map, pos, value + amount)
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+
+def read_file(path):
+    try:
+        with open(path, 'rb') as f:
+            data = f.read()
+    except FileNotFoundError:
+        return {}
+    if len(data) < 8:
+        return {}
+    return {key: value for key, value, _ in _iter_entries(data)}
+
+
+# ---------- 프로세스별 저장소 ----------
+_lock = threading.Lock()
+_store = None
+_store_pid = None
+
+
+def _process_store():
+    global _store, _store_pid
+    pid = os.getpid()
+    if _store_pid != pid:  # fork 된 워커는 부모의 파일을 쓰면 안 되므로 자기 파일을 새로 엶
+        _store = MmapStore(os.path.join(metrics_dir(), f'metrics_{pid}.db'))
+        _store_pid = pid
+    return _store
+
+
+def _add(key, amount):
+    with _lock:
+        _process_store().add(key, amount)
+
+
+def _key(kind, sample, labels):
+    return json.dumps([kind, sample, sorted(labels.items())], ensure_ascii=False, separators=(',', ':'))
+
+
+# ---------- 지표 종류 ----------
+REGISTRY = {}
+
+
+class _Metric:
+    kind = ''
+    prom_type = ''
+
+    def __init__(self, name, documentation):
+        self.name = name
+        self.documentation = documentation
+        REGISTRY[name] = self
+
+
+class Counter(_Metric):
+    kind, prom_type = 'c', 'counter'
+
+    def inc(self, amount=1, **labels):
+        _add(_key(self.kind, self.name, labels), amount)
+
+
+class Gauge(_Metric):
+    """살아 있는 프로세스들의 값을 더한 게이지 (진행 중 요청 수 등)"""
+    kind, prom_type = 'g', 'gauge'
+
+    def inc(self, amount=1, **labels):
+        _add(_key(self.kind, self.name, labels), amount)
+
+    def dec(self, amount=1, **labels):
+        _add(_key(self.kind, self.name, labels), -amount)
+
+
+class Histogram(_Metric):
+    kind, prom_type = 'h', 'histogram'
+
+    def __init__(self, name, documentation, buckets):
+        super().__init__(name, documentation)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        le = next((str(b) for b in self.buckets if value <= b), '+Inf')
+        with _lock:
+            store = _process_store()
+            store.add(_key(self.kind, self.name + '_bucket', {**labels, 'le': le}), 1)  # 구간별 개수 (누적은 출력할 때)
+            store.add(_key(self.kind, self.name + '_sum', labels), value)
+            store.add(_key(self.kind, self.name + '_count', labels), 1)
+
+
+class Collected(_Metric):
+    """/metrics 요청 때 함수를 불러서 값을 구하는 게이지 (DB 에서 세는 작업 큐 길이 등). 함수는 (라벨, 값) 목록을 돌려줌"""
+    prom_type = 'gauge'
+
+    def __init__(self, name, documentation, collector):
+        super().__init__(name, documentation)
+        self.collector = collector
+
+    def samples(self):
+        try:
+            return [(tuple(sorted(labels.items())), value) for labels, value in self.collector()]
+        except Exception:  # DB 장애 중에도 나머지 지표는 나가도록
+            return []
+
+
+HTTP_DURATION = Histogram('http_request_duration_seconds', "요청 처리 시간 (URL 이름/메서드별)", LATENCY_BUCKETS)
+HTTP_REQUESTS = Counter('http_requests_total', "요청 수 (URL 이름/메서드/상태 코드별)")
+HTTP_IN_FLIGHT = Gauge('http_requests_in_flight', "처리 중인 요청 수")
+DB_DURATION = Histogram('db_query_duration_seconds', "SQL 실행 시간 (DB 별칭별)", DB_BUCKETS)
+DB_CONNECTION_EVENTS = Counter('db_connection_events_total', "DB 연결 이벤트 (connects/reuses/health_checks/reconnects 등)")
+CACHE_REQUESTS = Counter('cache_requests_total', "캐시 조회 (cache=용도, result=hit/miss)")
+NOTIFICATION_FANOUT = Histogram('notification_fanout_size', "알림 한 번에 받는 사람 수 (kind별)", FANOUT_BUCKETS)
+UPLOAD_BYTES = Counter('upload_bytes_total', "업로드된 바이트 수 (kind=form/chunk)")
+SESSION_SAVES = Counter('session_saves_total', "세션 저장 요청 (result=written/skipped)")
+RATE_LIMITED = Counter('rate_limited_total', "요청 제한(429)에 걸린 요청 수 (scope=엔드포인트, path=local/shared)")
+ADMISSION_SHED = Counter('admission_shed_total', "동시 처리 한도로 돌려보낸(503) 쓰기 요청 수")
+COMPRESSION_BYTES = Counter('response_compression_bytes_total', "압축한 응답 바이트 수 (content_type, stage=original/sent)")
+TASKS_PROCESSED = Counter('tasks_processed_total', "실행한 백그라운드 작업 수 (task=이름, result=done/retry/failed)")
+TASK_DURATION = Histogram('task_duration_seconds', "백그라운드 작업 실행 시간 (task=이름)", LATENCY_BUCKETS)
+
+
+def _task_queue_depths():
+    from .taskqueue import queue_depths
+    return queue_depths()
+
+
+def _task_queue_oldest():
+    from .taskqueue import oldest_due_ages
+    return oldest_due_ages()
+
+
+TASK_QUEUE_DEPTH = Collected('task_queue_depth', "작업 큐에 남은 작업 수 (queue, status=queued/running)", _task_queue_depths)
+TASK_QUEUE_OLDEST = Collected('task_queue_oldest_due_seconds', "실행할 때가 됐는데 아직 대기 중인 가장 오래된 작업의 대기 시간 (queue별)",
+                              _task_queue_oldest)
+
+
+def cache_result(cache_name, hit):
+    CACHE_REQUESTS.inc(cache=cache_name, result='hit' if hit else 'miss')
+
+
+# ---------- 합치기 / 출력 ----------
+@contextmanager
+def _dir_lock(directory, exclusive):
+    fd = os.open(os.path.join(directory, '.lock'), os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        if fcntl:
+            fcntl.flock(fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        yield
+    finally:
+        os.close(fd)
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _dead_files(directory):
+    dead = []
+    for filename in os.listdir(directory):
+        if filename.startswith('metrics_') and filename.endswith('.db'):
+            pid = int(filename[8:-3])
+            if pid != os.getpid() and not _pid_alive(pid):
+                dead.append(os.path.join(directory, filename))
+    return dead
+
+
+def archive_dead_processes(directory=None):
+    """종료된 프로세스의 카운터/히스토그램 값을 archive.db 에 더하고 파일을 지움 (게이지는 버림)"""
+    directory = directory or metrics_dir()
+    with _dir_lock(directory, exclusive=True):
+        dead = _dead_files(directory)
+        if not dead:
+            return 0
+        archive = MmapStore(os.path.join(directory, ARCHIVE_NAME))
+        try:
+            for path in dead:
+                for key, value in read_file(path).items():
+                    if not key.startswith('["g"'):
+                        archive.add(key, value)
+                os.remove(path)
+        finally:
+            archive.close()
+        return len(dead)
+
+
+def collect(directory=None):
+    directory = directory or metrics_dir()
+    if _dead_files(directory):
+        archive_dead_processes(directory)
+    totals = {}
+    with _dir_lock(directory, exclusive=False):
+        for filename in os.listdir(directory):
+            if filename.endswith('.db'):
+                for key, value in read_file(os.path.join(directory, filename)).items():
+                    totals[key] = totals.get(key, 0.0) + value
+    return totals
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{k}="{_escape(v)}"' for k, v in labels) + '}'
+
+
+def _format_value(value):
+    return repr(int(value)) if float(value).is_integer() else repr(value)
+
+
+def render(totals=None):
+    totals = collect() if totals is None else totals
+    samples = {}
+    for key, value in totals.items():
+        kind, sample, labels = json.loads(key)
+        samples.setdefault(sample, []).append((tuple(tuple(pair) for pair in labels), value))
+
+    lines = []
+    for name, metric in REGISTRY.items():
+        lines.append(f"# HELP {name} {metric.documentation}")
+        lines.append(f"# TYPE {name} {metric.prom_type}")
+        if isinstance(metric, Histogram):
+            lines.extend(_render_histogram(metric, samples))
+        else:
+            series = metric.samples() if isinstance(metric, Collected) else samples.get(name, [])
+            for labels, value in sorted(series):
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+    return '\n'.join(lines) + '\n'
+
+
+def _render_histogram(metric, samples):
+    # 구간별 개수를 라벨 묶음마다 누적해서 le 순서대로 출력
+    series = {}
+    for labels, value in samples.get(metric.name + '_bucket', []):
+        base = tuple(pair for pair in labels if pair[0] != 'le')
+        le = dict(labels)['le']
+        series.setdefault(base, {})[le] = value
+    sums = dict(samples.get(metric.name + '_sum', []))
+    counts = dict(samples.get(metric.name + '_count', []))
+
+    lines = []
+    for base in sorted(series):
+        cumulative = 0.0
+        for bound in [str(b) for b in metric.buckets] + ['+Inf']:
+            cumulative += series[base].get(bound, 0.0)
+            lines.append(f"{metric.name}_bucket{_format_labels(base + (('le', bound),))} {_format_value(cumulative)}")
+        lines.append(f"{metric.name}_sum{_format_labels(base)} {_format_value(sums.get(base, 0.0))}")
+        lines.append(f"{metric.name}_count{_format_labels(base)} {_format_value(counts.get(base, 0.0))}")
+    return lines
+
+
+# ---------- Django 연결 ----------
+def db_execute_wrapper(alias):
+    def wrapper(execute, sql, params, many, context):
+        begin = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            DB_DURATION.observe(time.perf_counter() - begin, alias=alias)
+    return wrapper
+
+
+def install_db_wrapper(sender, connection, **kwargs):
+    """connection_created 신호 처리: 연결(스레드)마다 한 번만 SQL 시간 측정 래퍼를 붙임"""
+    if not getattr(connection, '_metrics_installed', False):
+        connection.execute_wrappers.insert(0, db_execute_wrapper(connection.alias))
+        connection._metrics_installed = True
+
+
+class MetricsMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        HTTP_IN_FLIGHT.inc()
+        begin = time.perf_counter()
+        status = 500
+        try:
+            response = self.get_response(request)
+            status = response.status_code
+            return response
+        finally:
+            elapsed = time.perf_counter() - begin
+            HTTP_IN_FLIGHT.dec()
+            match = getattr(request, 'resolver_match', None)
+            # 경로 대신 URL 이름을 라벨로 씀 (id 가 들어간 경로마다 시계열이 생기지 않도록)
+            view = match.view_name if match and match.view_name else 'unresolved'
+            method = request.method if request.method in KNOWN_METHODS else 'other'
+            HTTP_DURATION.observe(elapsed, view=view, method=method)
+            HTTP_REQUESTS.inc(view=view, method=method, status=f"{status // 100}xx")
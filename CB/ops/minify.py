@@ -0,0 +1,58 @@
+"""
+템플릿 공백 줄이기 (템플릿 로더)
+
+base.html 과 include 들이 Bootstrap 마크업을 깊게 들여쓰고 있어서, 화면 하나의 HTML 중 상당 부분이 들여쓰기 공백이다.
+- 템플릿 파일을 읽을 때 한 번만 줄이고 컴파일된 결과는 cached 로더가 들고 있음 → 요청마다 드는 비용 없음
+- 줄 앞뒤 공백, 빈 줄, {% %} 태그만 있는 줄이 남기는 줄바꿈을 지움. 줄바꿈 하나는 남기므로
+  인라인 요소 사이 띄어쓰기와 JS 의 자동 세미콜론은 그대로
+- <pre>/<textarea> 와 {% verbatim %}, {% blocktranslate %} 안은 건드리지 않음 (보이는 공백/번역 문자열이 바뀌므로)
+- .html 템플릿만 줄임 (메일 본문 .txt 등은 그대로). TEMPLATE_MINIFY=False 면 원본 그대로
+"""
+import re
+
+from django.conf import settings
+from django.template.loaders import app_directories, filesystem
+
+_PROTECTED = re.compile(
+    r'(<(pre|textarea)\b.*?</\2\s*>'
+    r'|\{%\s*verbatim\s*%\}.*?\{%\s*endverbatim\s*%\}'
+    r'|\{%\s*blocktrans(?:late)?\b.*?\{%\s*endblocktrans(?:late)?\s*%\})',
+    re.DOTALL | re.IGNORECASE,
+)
+# 보호 구간 바로 앞뒤의 공백은 띄어쓰기일 수 있으므로 줄바꿈에 붙은 공백만 지움
+_INDENT = re.compile(r'(?<=\n)[ \t]+|[ \t]+(?=\n)')
+_TAG_LINE = re.compile(r'^(\{%[^%\n]*%\})\n', re.MULTILINE)   # 태그 하나만 있는 줄 (렌더링하면 빈 줄이 됨)
+_BLANK_LINES = re.compile(r'\n{2,}')
+
+
+def _squeeze(text):
+    text = _INDENT.sub('', text)
+    text = _BLANK_LINES.sub('\n', text)
+    return _TAG_LINE.sub(r'\1', text)
+
+
+def minify(source):
+    parts = _PROTECTED.split(source)
+    # split 결과: [보통 부분, 보호 구간, 그룹(pre|textarea), 보통 부분, ...]
+    result = []
+    for i in range(0, len(parts), 3):
+        result.append(_squeeze(parts[i]))
+        if i + 1 < len(parts):
+            result.append(parts[i + 1])
+    return ''.join(result)
+
+
+class _MinifyMixin:
+    def get_contents(self, origin):
+        contents = super().get_contents(origin)
+        if settings.TEMPLATE_MINIFY and origin.name.endswith('.html'):
+            return minify(contents)
+        return contents
+
+
+class FilesystemLoader(_MinifyMixin, filesystem.Loader):
+    pass
+
+
+class AppDirectoriesLoader(_MinifyMixin, app_directories.Loader):
+    pass
@@ -0,0 +1,39 @@
+from django.db import models
+from django.utils import timezone
+
+
+# 백그라운드 작업 큐 (ops/taskqueue.py). 요청은 행 하나만 넣고, 실제 작업은 run_worker 프로세스가 가져가서 실행
+class Task(models.Model):
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = [(QUEUED, '대기'), (RUNNING, '실행 중'), (DONE, '완료'), (FAILED, '실패')]
+
+    name = models.CharField(max_length=200)                  # 등록된 작업 이름 (예: 'community.tasks.fan_out_notice')
+    queue = models.CharField(max_length=50, default='default')
+    args = models.JSONField(default=list, blank=True)
+    kwargs = models.JSONField(default=dict, blank=True)
+
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=QUEUED)
+    run_at = models.DateTimeField(default=timezone.now)      # 이 시각 이후에 실행 (예약/재시도 대기)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=5)
+    # 같은 키로 다시 넣으면 새 행을 만들지 않음 (같은 글의 공지 알림, 같은 시간대의 주기 작업 등)
+    idempotency_key = models.CharField(max_length=200, null=True, blank=True, unique=True)
+
+    locked_by = models.CharField(max_length=100, blank=True)  # 가져간 워커 (호스트:pid:스레드)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # 워커가 가져갈 작업 찾기: status='queued' AND queue IN (...) AND run_at <= now ORDER BY run_at
+            models.Index(fields=['status', 'queue', 'run_at'], name='task_claim_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.get_status_display()})"
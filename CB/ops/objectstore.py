@@ -0,0 +1,338 @@
+"""
+S3 호환 오브젝트 스토리지용 미디어 저장소
+
+- 외부 라이브러리 없이 http.client + AWS Signature V4 로 직접 요청
+- 연결은 keep-alive 로 재사용 (스레드 안전한 연결 풀)
+- 큰 파일은 멀티파트 업로드로 나눠서 스레드 풀에서 동시에 올림
+- url() 은 서명된 임시 URL(presigned URL)을 돌려줌 → 다운로드는 Django를 거치지 않음
+
+로컬/테스트에서는 ops/objectstore_standin.py (python manage.py objectstore_standin) 를 띄워서 사용
+"""
+import hashlib
+import hmac
+import http.client
+import queue
+import tempfile
+import threading
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import quote, urlsplit
+
+from django.core.files.base import File
+from django.core.files.storage import Storage
+from django.utils.deconstruct import deconstructible
+
+UNSIGNED_PAYLOAD = 'UNSIGNED-PAYLOAD'
+EMPTY_SHA256 = hashlib.sha256(b'').hexdigest()
+S3_NS = '{http://s3.amazonaws.com/doc/2006-03-01/}'
+
+
+class ObjectStoreError(Exception):
+    def __init__(self, status, body=b''):
+        self.status = status
+        super().__init__(f"오브젝트 스토리지 오류 {status}: {body[:200]!r}")
+
+
+# ---------- AWS Signature V4 ----------
+def _hmac(key, msg):
+    return hmac.new(key, msg.encode(), hashlib.sha256).digest()
+
+
+def signing_key(secret_key, datestamp, region, service='s3'):
+    k = _hmac(('AWS4' + secret_key).encode(), datestamp)
+    k = _hmac(k, region)
+    k = _hmac(k, service)
+    return _hmac(k, 'aws4_request')
+
+
+def canonical_query(params):
+    return '&'.join(
+        f"{quote(str(k), safe='~')}={quote(str(v), safe='~')}"
+        for k, v in sorted(params.items())
+    )
+
+
+def signature(secret_key, region, amz_date, method, path, params, headers, payload_hash):
+    """서명 문자열 계산. 서버(stand-in)에서 검증할 때도 같은 함수를 씀"""
+    names = sorted(h.lower() for h in headers)
+    lowered = {k.lower(): str(v).strip() for k, v in headers.items()}
+    canonical_headers = ''.join(f"{n}:{lowered[n]}\n" for n in names)
+    signed_headers = ';'.join(names)
+    canonical_request = '\n'.join([
+        method, quote(path, safe='/~'), canonical_query(params),
+        canonical_headers, signed_headers, payload_hash,
+    ])
+    scope = f"{amz_date[:8]}/{region}/s3/aws4_request"
+    string_to_sign = '\n'.join([
+        'AWS4-HMAC-SHA256', amz_date, scope, hashlib.sha256(canonical_request.encode()).hexdigest(),
+    ])
+    key = signing_key(secret_key, amz_date[:8], region)
+    return hmac.new(key, string_to_sign.encode(), hashlib.sha256).hexdigest(), signed_headers, scope
+
+
+def _amz_now():
+    return datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+
+
+# ---------- 클라이언트 ----------
+class S3Client:
+    def __init__(self, endpoint_url, bucket, access_key, secret_key, region='ap-northeast-2',
+                 max_connections=10, timeout=30):
+        parts = urlsplit(endpoint_url)
+        self.scheme = parts.scheme or 'https'
+        self.host = parts.netloc
+        self.bucket = bucket
+        self.access_key = access_key
+        self.secret_key = secret_key
+        self.region = region
+        self.timeout = timeout
+        self.endpoint_url = f"{self.scheme}://{self.host}"
+        # keep-alive 연결 풀 (가장 최근에 쓴 연결부터 재사용)
+        self._pool = queue.LifoQueue(maxsize=max_connections)
+
+    def _object_path(self, key):
+        return f"/{self.bucket}/{key.lstrip('/')}"
+
+    # 연결 풀
+    def _get_conn(self):
+        try:
+            return self._pool.get_nowait()
+        except queue.Empty:
+            cls = http.client.HTTPSConnection if self.scheme == 'https' else http.client.HTTPConnection
+            return cls(self.host, timeout=self.timeout)
+
+    def _put_conn(self, conn):
+        try:
+            self._pool.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+    def request(self, method, key, params=None, headers=None, body=b'', stream=False):
+        params = dict(params or {})
+        path = self._object_path(key) if key is not None else f"/{self.bucket}"
+        headers = dict(headers or {})
+        payload_hash = hashlib.sha256(body).hexdigest() if body else EMPTY_SHA256
+        amz_date = _amz_now()
+        headers.update({'host': self.host, 'x-amz-date': amz_date, 'x-amz-content-sha256': payload_hash})
+        sig, signed_headers, scope = signature(
+            self.secret_key, self.region, amz_date, method, path, params, headers, payload_hash,
+        )
+        headers['Authorization'] = (
+            f"AWS4-HMAC-SHA256 Credential={self.access_key}/{scope}, "
+            f"SignedHeaders={signed_headers}, Signature={sig}"
+        )
+        url = quote(path, safe='/~') + ('?' + canonical_query(params) if params else '')
+
+        # 풀에서 꺼낸 연결이 서버 쪽에서 이미 끊겼을 수 있으므로 한 번은 새 연결로 재시도
+        for attempt in range(2):
+            conn = self._get_conn()
+            try:
+                conn.request(method, url, body=body or None, headers=headers)
+                response = conn.getresponse()
+                break
+            except (http.client.RemoteDisconnected, ConnectionError, http.client.CannotSendRequest,
+                    http.client.BadStatusLine):
+                conn.close()
+                if attempt:
+                    raise
+
+        if stream and response.status < 300:
+            # 본문을 다 읽은 뒤 호출하면 연결을 풀에 돌려줌
+            def release():
+                if response.will_close or not response.isclosed():
+                    conn.close()
+                else:
+                    self._put_conn(conn)
+            response.release = release
+            return response
+
+        data = response.read()
+        if response.will_close:
+            conn.close()
+        else:
+            self._put_conn(conn)
+        if response.status >= 300:
+            raise ObjectStoreError(response.status, data)
+        response.data = data
+        return response
+
+    # 기본 동작
+    def put_object(self, key, data, content_type='application/octet-stream'):
+        return self.request('PUT', key, headers={'Content-Type': content_type}, body=data)
+
+    def get_object(self, key):
+        return self.request('GET', key, stream=True)
+
+    def head_object(self, key):
+        try:
+            return self.request('HEAD', key)
+        except ObjectStoreError as e:
+            if e.status == 404:
+                return None
+            raise
+
+    def delete_object(self, key):
+        return self.request('DELETE', key)
+
+    # 멀티파트 업로드
+    def create_multipart_upload(self, key, content_type='application/octet-stream'):
+        response = self.request('POST', key, params={'uploads': ''}, headers={'Content-Type': content_type})
+        root = ET.fromstring(response.data)
+        return root.findtext(f'{S3_NS}UploadId') or root.findtext('UploadId')
+
+    def upload_part(self, key, upload_id, part_number, data):
+        response = self.request('PUT', key, params={'partNumber': part_number, 'uploadId': upload_id}, body=data)
+        return response.getheader('ETag')
+
+    def complete_multipart_upload(self, key, upload_id, etags):
+        body = ''.join(
+            f"<Part><PartNumber>{n}</PartNumber><ETag>{etag}</ETag></Part>"
+            for n, etag in etags
+        )
+        body = f"<CompleteMultipartUpload>{body}</CompleteMultipartUpload>".encode()
+        return self.request('POST', key, params={'uploadId': upload_id}, body=body)
+
+    def abort_multipart_upload(self, key, upload_id):
+        return self.request('DELETE', key, params={'uploadId': upload_id})
+
+    # 서명된 임시 URL
+    def presigned_url(self, key, expires=3600, response_params=None):
+        path = self._object_path(key)
+        amz_date = _amz_now()
+        scope = f"{amz_date[:8]}/{self.region}/s3/aws4_request"
+        params = {
+            'X-Amz-Algorithm': 'AWS4-HMAC-SHA256',
+            'X-Amz-Credential': f"{self.access_key}/{scope}",
+            'X-Amz-Date': amz_date,
+            'X-Amz-Expires': int(expires),
+            'X-Amz-SignedHeaders': 'host',
+        }
+        params.update(response_params or {})
+        sig, _, _ = signature(
+            self.secret_key, self.region, amz_date, 'GET', path, params, {'host': self.host}, UNSIGNED_PAYLOAD,
+        )
+        params['X-Amz-Signature'] = sig
+        return f"{self.endpoint_url}{quote(path, safe='/~')}?{canonical_query(params)}"
+
+
+# ---------- Django 저장소 ----------
+@deconstructible
+class ObjectStorage(Storage):
+    def __init__(self, endpoint_url, bucket, access_key, secret_key, region='ap-northeast-2',
+                 location='', max_connections=10, multipart_threshold=8 * 1024 * 1024,
+                 part_size=8 * 1024 * 1024, upload_workers=4, querystring_expire=3600):
+        self.client = S3Client(endpoint_url, bucket, access_key, secret_key, region, max_connections)
+        self.location = location.strip('/')
+        self.multipart_threshold = multipart_threshold
+        self.part_size = max(part_size, 5 * 1024 * 1024)  # S3 최소 파트 크기 5MB
+        self.upload_workers = upload_workers
+        self.querystring_expire = querystring_expire
+        self._executor = None
+        self._executor_lock = threading.Lock()
+
+    # 이 저장소는 다운로드를 서명 URL로 직접 내려줌 (post_download 에서 확인)
+    serves_signed_urls = True
+
+    def _key(self, name):
+        name = name.replace('\\', '/').lstrip('/')
+        return f"{self.location}/{name}" if self.location else name
+
+    def _pool(self):
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.upload_workers,
+                                                    thread_name_prefix='objectstore-upload')
+            return self._executor
+
+    def _save(self, name, content):
+        key = self._key(name)
+        content_type = getattr(content, 'content_type', None) or 'application/octet-stream'
+        if hasattr(content, 'seek'):
+            content.seek(0)
+
+        first = content.read(self.multipart_threshold)
+        if len(first) < self.multipart_threshold:
+            self.client.put_object(key, first, content_type)
+            return name
+
+        # 멀티파트: 파트를 순서대로 읽되 업로드는 스레드 풀에서 동시에 진행
+        # (메모리에 동시에 올라가는 파트 수는 워커 수의 2배로 제한)
+        upload_id = self.client.create_multipart_upload(key, content_type)
+        pool = self._pool()
+        futures = []
+        limiter = threading.BoundedSemaphore(self.upload_workers * 2)
+
+        def upload(part_number, data):
+            try:
+                return part_number, self.client.upload_part(key, upload_id, part_number, data)
+            finally:
+                limiter.release()
+
+        try:
+            buffer = first
+            part_number = 1
+            while True:
+                while len(buffer) < self.part_size:
+                    more = content.read(self.part_size - len(buffer))
+                    if not more:
+                        break
+                    buffer += more
+                if not buffer:
+                    break
+                limiter.acquire()
+                futures.append(pool.submit(upload, part_number, buffer))
+                part_number += 1
+                buffer = b''
+            etags = sorted(f.result() for f in futures)
+            self.client.complete_multipart_upload(key, upload_id, etags)
+        except BaseException:
+            for f in futures:
+                f.cancel()
+            try:
+                self.client.abort_multipart_upload(key, upload_id)
+            except (ObjectStoreError, OSError):
+                pass  # 원래 오류를 그대로 올려보냄
+            raise
+        return name
+
+    def _open(self, name, mode='rb'):
+        response = self.client.get_object(self._key(name))
+        # 응답을 조금씩 받아서 임시 파일에 담음 (작은 파일은 메모리, 큰 파일은 디스크)
+        spool = tempfile.SpooledTemporaryFile(max_size=10 * 1024 * 1024)
+        try:
+            while True:
+                block = response.read(64 * 1024)
+                if not block:
+                    break
+                spool.write(block)
+        finally:
+            response.release()
+        spool.seek(0)
+        return File(spool, name=name)
+
+    def delete(self, name):
+        self.client.delete_object(self._key(name))
+
+    def exists(self, name):
+        return self.client.head_object(self._key(name)) is not None
+
+    def size(self, name):
+        head = self.client.head_object(self._key(name))
+        if head is None:
+            raise FileNotFoundError(name)
+        return int(head.getheader('Content-Length'))
+
+    def get_modified_time(self, name):
+        head = self.client.head_object(self._key(name))
+        if head is None:
+            raise FileNotFoundError(name)
+        return parsedate_to_datetime(head.getheader('Last-Modified'))
+
+    def url(self, name):
+        return self.signed_url(name)
+
+    def signed_url(self, name, expires=None, disposition=None):
+        response_params = {'response-content-disposition': disposition} if disposition else None
+        return self.client.presigned_url(self._key(name), expires or self.querystring_expire, response_params)
@@ -0,0 +1,244 @@
+"""
+로컬 파일시스템 기반 S3 호환 서버 (개발/테스트용)
+
+ObjectStorage 가 쓰는 기능만 구현:
+  PUT/GET/HEAD/DELETE 객체, 멀티파트 업로드(시작/파트/완료/취소), 서명 URL(presigned GET)
+모든 요청의 Signature V4 서명을 실제로 검증하므로 서명 코드까지 오프라인으로 확인할 수 있다.
+
+실행: python manage.py objectstore_standin --root /tmp/s3 --port 9000
+"""
+import hashlib
+import hmac
+import os
+import re
+import shutil
+import threading
+import uuid
+import xml.etree.ElementTree as ET
+from datetime import datetime, timezone
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, unquote, urlsplit
+
+from .objectstore import EMPTY_SHA256, UNSIGNED_PAYLOAD, signature
+
+AUTH_RE = re.compile(r'AWS4-HMAC-SHA256 Credential=([^/]+)/([^,]+), SignedHeaders=([^,]+), Signature=([0-9a-f]+)')
+
+
+class StandinStore:
+    def __init__(self, root, access_key, secret_key, region='ap-northeast-2'):
+        self.root = os.path.abspath(root)
+        self.access_key = access_key
+        self.secret_key = secret_key
+        self.region = region
+        self.lock = threading.Lock()
+        os.makedirs(os.path.join(self.root, '.multipart'), exist_ok=True)
+
+    def object_path(self, bucket, key):
+        path = os.path.abspath(os.path.join(self.root, bucket, key))
+        if not path.startswith(os.path.join(self.root, bucket) + os.sep) or '/.multipart' in path:
+            raise PermissionError(key)
+        return path
+
+    def upload_dir(self, upload_id):
+        if not re.fullmatch(r'[0-9a-f]{32}', upload_id):
+            raise PermissionError(upload_id)
+        return os.path.join(self.root, '.multipart', upload_id)
+
+
+class StandinHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive
+    server_version = 'ObjectStoreStandin/1.0'
+
+    @property
+    def store(self):
+        return self.server.store
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    # ---------- 공통 ----------
+    def _parse(self):
+        parts = urlsplit(self.path)
+        self.raw_path = unquote(parts.path)
+        self.params = dict(parse_qsl(parts.query, keep_blank_values=True))
+        segments = self.raw_path.lstrip('/').split('/', 1)
+        self.bucket = segments[0]
+        self.key = segments[1] if len(segments) > 1 else ''
+
+    def _body(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        return self.rfile.read(length) if length else b''
+
+    def _send(self, status, body=b'', headers=None):
+        self.send_response(status)
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if body and self.command != 'HEAD':
+            self.wfile.write(body)
+
+    def _error(self, status, code):
+        body = f"<Error><Code>{code}</Code></Error>".encode()
+        self._send(status, body, {'Content-Type': 'application/xml'})
+
+    def _authorized(self, body):
+        store = self.store
+        if 'X-Amz-Signature' in self.params:
+            # 서명 URL
+            params = {k: v for k, v in self.params.items() if k != 'X-Amz-Signature'}
+            amz_date = params.get('X-Amz-Date', '')
+            try:
+                issued = datetime.strptime(amz_date, '%Y%m%dT%H%M%SZ').replace(tzinfo=timezone.utc)
+                expires = int(params.get('X-Amz-Expires', 0))
+            except ValueError:
+                return False
+            if (datetime.now(timezone.utc) - issued).total_seconds() > expires:
+                return False
+            if not params.get('X-Amz-Credential', '').startswith(store.access_key + '/'):
+                return False
+            headers = {h: self.headers.get(h, '') for h in params.get('X-Amz-SignedHeaders', 'host').split(';')}
+            expected, _, _ = signature(store.secret_key, store.region, amz_date, self.command,
+                                       self.raw_path, params, headers, UNSIGNED_PAYLOAD)
+            return hmac.compare_digest(expected, self.params['X-Amz-Signature'])
+
+        m = AUTH_RE.match(self.headers.get('Authorization', ''))
+        if not m or m.group(1) != store.access_key:
+            return False
+        payload_hash = self.headers.get('x-amz-content-sha256', '')
+        if payload_hash != UNSIGNED_PAYLOAD:
+            actual = hashlib.sha256(body).hexdigest() if body else EMPTY_SHA256
+            if actual != payload_hash:
+                return False
+        headers = {h: self.headers.get(h, '') for h in m.group(3).split(';')}
+        expected, _, _ = signature(store.secret_key, store.region, self.headers.get('x-amz-date', ''),
+                                   self.command, self.raw_path, self.params, headers, payload_hash)
+        return hmac.compare_digest(expected, m.group(4))
+
+    def _handle(self):
+        self._parse()
+        body = self._body() if self.command in ('PUT', 'POST') else b''
+        if not self._authorized(body):
+            return self._error(403, 'SignatureDoesNotMatch')
+        try:
+            getattr(self, f'_do_{self.command.lower()}')(body)
+        except PermissionError:
+            self._error(400, 'InvalidKey')
+        except FileNotFoundError:
+            self._error(404, 'NoSuchKey' if 'uploadId' not in self.params else 'NoSuchUpload')
+
+    do_GET = do_HEAD = do_PUT = do_POST = do_DELETE = _handle
+
+    # ---------- 동작 ----------
+    def _do_put(self, body):
+        if 'uploadId' in self.params:
+            part_dir = self.store.upload_dir(self.params['uploadId'])
+            if not os.path.isdir(part_dir):
+                raise FileNotFoundError
+            number = int(self.params['partNumber'])
+            with open(os.path.join(part_dir, f"{number:05d}"), 'wb') as f:
+                f.write(body)
+            return self._send(200, headers={'ETag': f'"{hashlib.md5(body).hexdigest()}"'})
+
+        path = self.store.object_path(self.bucket, self.key)
+        self._write_object(path, [body], self.headers.get('Content-Type'))
+        self._send(200, headers={'ETag': f'"{hashlib.md5(body).hexdigest()}"'})
+
+    def _write_object(self, path, chunks, content_type):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp, 'wb') as f:
+            for chunk in chunks:
+                if isinstance(chunk, str):
+                    with open(chunk, 'rb') as part:
+                        shutil.copyfileobj(part, f)
+                else:
+                    f.write(chunk)
+        os.replace(tmp, path)
+        with open(path + '.meta', 'w') as f:
+            f.write(content_type or 'application/octet-stream')
+
+    def _do_post(self, body):
+        if 'uploads' in self.params:
+            upload_id = uuid.uuid4().hex
+            os.makedirs(self.store.upload_dir(upload_id))
+            with open(os.path.join(self.store.upload_dir(upload_id), 'target'), 'w') as f:
+                f.write(f"{self.bucket}\n{self.key}\n{self.headers.get('Content-Type', '')}")
+            xml = (f"<InitiateMultipartUploadResult><Bucket>{self.bucket}</Bucket><Key>{self.key}</Key>"
+                   f"<UploadId>{upload_id}</UploadId></InitiateMultipartUploadResult>").encode()
+            return self._send(200, xml, {'Content-Type': 'application/xml'})
+
+        if 'uploadId' in self.params:
+            part_dir = self.store.upload_dir(self.params['uploadId'])
+            if not os.path.isdir(part_dir):
+                raise FileNotFoundError
+            with open(os.path.join(part_dir, 'target')) as f:
+                bucket, key, content_type = (f.read().split('\n') + [''])[:3]
+            numbers = [int(p.findtext('PartNumber')) for p in ET.fromstring(body).iter('Part')]
+            if numbers != sorted(numbers):
+                return self._error(400, 'InvalidPartOrder')
+            parts = [os.path.join(part_dir, f"{n:05d}") for n in numbers]
+            self._write_object(self.store.object_path(bucket, key), parts, content_type)
+            shutil.rmtree(part_dir)
+            xml = f"<CompleteMultipartUploadResult><Key>{key}</Key></CompleteMultipartUploadResult>".encode()
+            return self._send(200, xml, {'Content-Type': 'application/xml'})
+
+        self._error(400, 'InvalidRequest')
+
+    def _do_delete(self, body):
+        if 'uploadId' in self.params:
+            shutil.rmtree(self.store.upload_dir(self.params['uploadId']), ignore_errors=True)
+            return self._send(204)
+        path = self.store.object_path(self.bucket, self.key)
+        for p in (path, path + '.meta'):
+            if os.path.exists(p):
+                os.remove(p)
+        self._send(204)
+
+    def _do_get(self, body):
+        path = self.store.object_path(self.bucket, self.key)
+        if not os.path.isfile(path):
+            raise FileNotFoundError
+        headers = self._object_headers(path)
+        if 'response-content-disposition' in self.params:
+            headers['Content-Disposition'] = self.params['response-content-disposition']
+        self.send_response(200)
+        for k, v in headers.items():
+            self.send_header(k, v)
+        self.end_headers()
+        with open(path, 'rb') as f:
+            shutil.copyfileobj(f, self.wfile)
+
+    def _do_head(self, body):
+        path = self.store.object_path(self.bucket, self.key)
+        if not os.path.isfile(path):
+            raise FileNotFoundError
+        self.send_response(200)
+        for k, v in self._object_headers(path).items():
+            self.send_header(k, v)
+        self.end_headers()
+
+    def _object_headers(self, path):
+        st = os.stat(path)
+        try:
+            with open(path + '.meta') as f:
+                content_type = f.read() or 'application/octet-stream'
+        except FileNotFoundError:
+            content_type = 'application/octet-stream'
+        return {
+            'Content-Length': str(st.st_size),
+            'Content-Type': content_type,
+            'Last-Modified': formatdate(st.st_mtime, usegmt=True),
+            'ETag': f'"{st.st_size:x}-{int(st.st_mtime):x}"',
+        }
+
+
+def make_server(root, access_key, secret_key, host='127.0.0.1', port=9000, region='ap-northeast-2',
+                verbose=False):
+    server = ThreadingHTTPServer((host, port), StandinHandler)
+    server.daemon_threads = True
+    server.store = StandinStore(root, access_key, secret_key, region)
+    server.verbose = verbose
+    return server
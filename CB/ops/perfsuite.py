@@ -0,0 +1,162 @@
+"""
+성능 회귀 테스트 도구 (accounts/community/messenger 의 tests.py 에서 사용)
+(파일 이름이 test 로 시작하면 테스트 실행기가 이 모듈의 기본 클래스까지 테스트로 실행하므로 perfsuite)
+
+고정된 데이터(ops/benchdata.py 를 작게 돌린 것)와 사용자 유형(persona) 세 가지로
+앱의 이름 붙은 URL 을 모두 GET 해서 요청당 쿼리 수를 확인한다.
+
+- admin: 관리자 (부서/직급 없음, 모든 게시판 통과)
+- restricted: 자기 부서 전용 게시판이 있고, 다른 부서 전용 게시판은 못 읽는 사원
+- norank: 부서/직급이 없는 사원
+
+앱의 tests.py 에서 QueryCountTestCase 를 상속하고 expected = {URL 이름: 쿼리 수} 를 적어둔다.
+값은 정수(정확히) / (최소, 최대) / 유형별 dict.
+URL 이 새로 생기면 기대값이 없어서 실패하므로, 쿼리 수를 확인해서 추가해야 한다.
+지금 열리지 않는 화면(템플릿 없음 등)은 broken = {URL 이름: 이유} 에 적으면 요청하지 않고 건너뛴다.
+데이터를 10배로 늘려도 쿼리 수가 같아야 한다 (행 수에 따라 늘면 N+1).
+로그인 세션은 캐시에서 읽으므로(ops/sessions.py) 세션 조회는 세지 않는다. 로그인 사용자 조회 1개는 기본으로 포함.
+"""
+from importlib import import_module
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, reverse
+
+from accounts.models import Department, Rank
+from community.models import Board, Comment, Post, UploadSession
+from messenger.models import Message
+from . import benchdata
+
+PERSONAS = ('admin', 'restricted', 'norank')
+PERSONA_PREFIX = 'perf'
+OPEN_BOARD_SLUG = f'{benchdata.PREFIX}-00'  # benchdata 의 첫 게시판은 전체 공개
+
+BASE_DATA = {
+    'departments': 6, 'users': 20, 'boards': 4, 'posts': 60, 'comments': 200,
+    'messages': 60, 'notifications': 60, 'seed': 7,
+}
+SCALED_KEYS = ('departments', 'users', 'boards', 'posts', 'comments', 'messages', 'notifications')
+
+
+def build_fixture(scale=1):
+    """bench 데이터 + 유형별 사용자와 그 사용자의 글/댓글/쪽지/업로드를 만듦"""
+    benchdata.seed(**{key: value * scale if key in SCALED_KEYS else value for key, value in BASE_DATA.items()})
+    User = get_user_model()
+    ranks = list(Rank.objects.order_by('level'))
+    dept = Department.objects.create(name=f'{PERSONA_PREFIX}-restricted')
+    restricted_board = Board.objects.create(name=f'{PERSONA_PREFIX}-restricted', slug=f'{PERSONA_PREFIX}-restricted')
+    restricted_board.read_access_depts.set([dept])
+
+    users = {
+        'admin': User.objects.create_superuser(f'{PERSONA_PREFIX}_admin', password=benchdata.PASSWORD, nickname='perfadmin'),
+        'restricted': User.objects.create_user(
+            f'{PERSONA_PREFIX}_restricted', password=benchdata.PASSWORD, nickname='perfrestricted',
+            department=dept, rank=ranks[0],
+        ),
+        'norank': User.objects.create_user(f'{PERSONA_PREFIX}_norank', password=benchdata.PASSWORD, nickname='perfnorank'),
+    }
+    open_board = Board.objects.get(slug=OPEN_BOARD_SLUG)
+    others = list(User.objects.filter(username__startswith=f'{benchdata.PREFIX}_')[:5 * scale])
+    for user in users.values():
+        post = Post.objects.create(board=open_board, author=user, title=f'{user.username} post', content='perf')
+        Comment.objects.create(post=post, author=user, content='perf')
+        Comment.objects.bulk_create(Comment(post=post, author=other, content='perf') for other in others)
+        Message.objects.create(sender=others[0], receiver=user, content='perf')
+        UploadSession.objects.create(user=user, board=open_board, filename='perf.bin', size=1024)
+    return users
+
+
+def clear_fixture():
+    User = get_user_model()
+    benchdata.clear()
+    User.objects.filter(username__startswith=f'{PERSONA_PREFIX}_').delete()
+    Board.objects.filter(slug__startswith=f'{PERSONA_PREFIX}-').delete()
+    Department.objects.filter(name__startswith=f'{PERSONA_PREFIX}-').delete()
+
+
+def url_kwargs(user):
+    """URL 인자 이름 → 이 사용자로 열어볼 값 (자기 글/댓글/받은 쪽지/업로드)"""
+    post = Post.objects.filter(author=user, board__slug=OPEN_BOARD_SLUG).latest('id')
+    return {
+        'board_slug': OPEN_BOARD_SLUG,
+        'post_id': post.pk,
+        'comment_id': Comment.objects.filter(post=post, author=user).latest('id').pk,
+        'message_id': Message.objects.filter(receiver=user).latest('id').pk,
+        'upload_id': UploadSession.objects.filter(user=user).latest('created_at').pk,
+        'user_id': get_user_model().objects.filter(username__startswith=f'{benchdata.PREFIX}_').earliest('id').pk,
+    }
+
+
+def named_urls(urlconf):
+    """urls.py 모듈의 이름 붙은 URL → 인자 이름 목록 (같은 이름이 두 번 있으면 처음 것)"""
+    names = {}
+    for pattern in import_module(urlconf).urlpatterns:
+        if isinstance(pattern, URLPattern) and pattern.name and pattern.name not in names:
+            names[pattern.name] = list(pattern.pattern.converters)
+    return names
+
+
+# 뷰의 @query_budget 도 예외로 확인되도록 모든 요청을 측정
+@override_settings(QUERY_BUDGET_MODE='raise', QUERY_BUDGET_SAMPLE_RATE=1.0, PROFILER_SLOW_MS=0, PROFILER_SAMPLE_RATE=0)
+class QueryCountTestCase(TestCase):
+    urlconf = None
+    expected = {}
+    broken = {}
+
+    @classmethod
+    def setUpTestData(cls):
+        build_fixture()
+
+    def setUp(self):
+        self._warm_cache()
+
+    def _warm_cache(self):
+        # 운영 워커처럼 게시판 권한 캐시를 채운 상태에서 측정 (ops/warmup.py)
+        cache.clear()
+        Board.prime_acl_cache()
+
+    def measure(self):
+        counts = {}
+        urls = {name: params for name, params in named_urls(self.urlconf).items() if name not in self.broken}
+        for persona in PERSONAS:
+            user = get_user_model().objects.get(username=f'{PERSONA_PREFIX}_{persona}')
+            kwargs = url_kwargs(user)
+            self.client.force_login(user)
+            for name, params in urls.items():
+                url = reverse(name, kwargs={param: kwargs[param] for param in params})
+                with CaptureQueriesContext(connection) as queries:
+                    response = self.client.get(url)
+                self.assertLess(response.status_code, 500, f"{name} ({persona}): {url}")
+                counts[name, persona] = len(queries)
+            self.client.logout()
+        return counts
+
+    def test_query_counts(self):
+        self.assertFalse(set(self.broken) & set(self.expected), "broken 과 expected 에 같이 있는 URL")
+        counts = self.measure()
+        missing = sorted({name for name, _ in counts} - set(self.expected))
+        self.assertFalse(missing, "쿼리 수 기대값이 없는 URL: " + ', '.join(
+            f"{name}={[counts[name, p] for p in PERSONAS]}" for name in missing
+        ))
+        wrong = []
+        for (name, persona), count in counts.items():
+            expected = self.expected[name]
+            if isinstance(expected, dict):
+                expected = expected[persona]
+            low, high = expected if isinstance(expected, tuple) else (expected, expected)
+            if not low <= count <= high:
+                wrong.append(f"{name} ({persona}): {count}개, 기대 {expected}")
+        self.assertFalse(wrong, '\n'.join(wrong))
+
+    def test_query_counts_constant_at_10x_data(self):
+        small = self.measure()
+        clear_fixture()
+        build_fixture(scale=10)
+        self._warm_cache()
+        large = self.measure()
+        grown = [f"{name} ({persona}): {small[name, persona]} → {large[name, persona]}"
+                 for name, persona in small if large[name, persona] != small[name, persona]]
+        self.assertFalse(grown, "데이터 10배에서 쿼리 수가 달라짐:\n" + '\n'.join(grown))
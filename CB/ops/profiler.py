@@ -0,0 +1,424 @@
+"""
+요청 프로파일러 (느린 요청의 원인 찾기)
+
+운영에서 all_posts, org_chart 같은 화면이 느릴 때 어디서 시간이 드는지 보기 위한 도구. 평소에는 꺼져 있고
+다음 중 하나에 해당하는 요청만 프로파일한다.
+
+- 서명된 헤더: 관리자 센터 > 성능 프로파일 화면에서 받은 토큰을 'X-Profile: <토큰>' 헤더로 보냄
+  (토큰마다 모드가 정해져 있음: sample / cprofile)
+- 무작위 표본: PROFILER_SAMPLE_RATE 비율의 요청
+- 느린 요청: PROFILER_SLOW_MS 를 넘긴 요청은 자동 저장 (켜져 있으면 모든 요청을 가볍게 표본 추출하다가
+  빨리 끝난 요청은 버림)
+
+모드
+- sample: 프로세스에 하나뿐인 표본 추출 스레드가 PROFILER_INTERVAL_MS 마다 대상 요청 스레드의 호출 스택을 읽음.
+  요청 코드에는 손대지 않으므로 부하가 작고, 결과는 flamegraph.pl / speedscope 에 그대로 넣을 수 있는
+  접힌 스택(collapsed stack) 형식으로 저장
+- cprofile: 요청 하나를 cProfile 로 감쌈. 함수별 정확한 호출 수/시간을 얻지만 요청이 2~3배 느려짐
+
+둘 다 SQL 실행 횟수/시간을 따로 재고, 시간이 SQL / ORM / 템플릿 / 나머지 파이썬 중 어디에 쓰였는지 나눠서 보여준다.
+결과는 PROFILER_DIR 에 파일로 쌓이고 PROFILER_KEEP 개를 넘으면 오래된 것부터 지운다 (모든 워커가 같은 폴더를 씀).
+"""
+import cProfile
+import io
+import json
+import marshal
+import os
+import pstats
+import random
+import re
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core import signing
+from django.db import connections
+
+HEADER = 'X-Profile'
+MODES = ('sample', 'cprofile')
+TOKEN_SALT = 'ops.profiler'
+MAX_DEPTH = 200
+FILE_EXTENSIONS = ('json', 'folded', 'prof', 'txt')
+
+_ID_RE = re.compile(r'^[0-9a-f]{16}-\d+$')
+_THIS_FILE = __file__
+
+# 가장 안쪽(잎)에서부터 올라가며 처음 만나는 분류로 표본을 나눔
+# (템플릿 안에서 실행된 쿼리는 'sql', 쿼리 생성/모델 객체 만들기는 'orm')
+_CATEGORY_PATTERNS = (
+    ('sql', ('django/db/backends/', 'MySQLdb/', 'ops/db/')),
+    ('orm', ('django/db/',)),
+    ('template', ('django/template/',)),
+)
+CATEGORIES = ('sql', 'orm', 'template', 'python')
+
+
+# ---------- 토큰 ----------
+def make_token(mode='sample'):
+    """X-Profile 헤더에 넣을 서명된 토큰 (PROFILER_TOKEN_MAX_AGE 초 동안 유효)"""
+    return signing.dumps(mode, salt=TOKEN_SALT)
+
+
+def verify_token(token):
+    max_age = getattr(settings, 'PROFILER_TOKEN_MAX_AGE', 3600)
+    try:
+        mode = signing.loads(token, salt=TOKEN_SALT, max_age=max_age)
+    except signing.BadSignature:
+        return None
+    return mode if mode in MODES else None
+
+
+# ---------- 호출 스택 ----------
+_code_info = {}
+_path_prefixes = None
+
+
+def _short_path(filename):
+    global _path_prefixes
+    if _path_prefixes is None:
+        prefixes = [p for p in sys.path if p and 'packages' in p]
+        prefixes.append(str(settings.BASE_DIR))
+        _path_prefixes = sorted({os.path.join(p, '') for p in prefixes}, key=len, reverse=True)
+    for prefix in _path_prefixes:
+        if filename.startswith(prefix):
+            return filename[len(prefix):]
+    return filename
+
+
+def _category(path):
+    for name, patterns in _CATEGORY_PATTERNS:
+        if any(p in path for p in patterns):
+            return name
+    return None
+
+
+def _describe(code):
+    """코드 객체 → (스택에 찍을 이름, 분류). 코드 객체마다 한 번만 계산"""
+    info = _code_info.get(code)
+    if info is None:
+        path = _short_path(code.co_filename)
+        label = f"{code.co_name} ({path}:{code.co_firstlineno})".replace(';', ':')
+        info = _code_info[code] = (label, _category(path))
+    return info
+
+
+class Capture:
+    """요청 하나의 표본(접힌 스택별 개수)과 SQL 실행 기록"""
+
+    def __init__(self):
+        self.stacks = Counter()
+        self.categories = Counter()
+        self.samples = 0
+        self.sql_count = 0
+        self.sql_seconds = 0.0
+
+    def add(self, frame):
+        labels = []
+        category = None
+        depth = 0
+        while frame is not None and depth < MAX_DEPTH:
+            code = frame.f_code
+            if code in _STOP_CODES:
+                break  # 미들웨어 바깥(gunicorn 루프 등)은 모든 요청에 같으므로 생략
+            if code.co_filename != _THIS_FILE:
+                label, frame_category = _describe(code)
+                labels.append(label)
+                if category is None:
+                    category = frame_category
+            frame = frame.f_back
+            depth += 1
+        if not labels:
+            return
+        labels.reverse()
+        self.stacks[';'.join(labels)] += 1
+        self.categories[category or 'python'] += 1
+        self.samples += 1
+
+    # connection.execute_wrapper 로 SQL 횟수/시간 기록
+    def __call__(self, execute, sql, params, many, context):
+        begin = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql_seconds += time.perf_counter() - begin
+            self.sql_count += 1
+
+
+class Sampler:
+    """프로세스에 하나뿐인 표본 추출 스레드. 대상 요청이 없으면 잠들어 있음"""
+
+    def __init__(self):
+        self.interval = 0.005
+        self._targets = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._pid = None
+
+    def track(self, capture):
+        with self._lock:
+            # gunicorn 은 마스터에서 미들웨어를 만든 뒤 fork 하므로, 스레드는 워커마다 처음 쓸 때 시작
+            if self._pid != os.getpid():
+                self._pid = os.getpid()
+                threading.Thread(target=self._run, name='profiler-sampler', daemon=True).start()
+            self._targets[threading.get_ident()] = capture
+        self._wake.set()
+
+    def untrack(self):
+        with self._lock:
+            self._targets.pop(threading.get_ident(), None)
+
+    def _run(self):
+        while True:
+            if not self._targets:
+                self._wake.wait()
+                self._wake.clear()
+                continue
+            time.sleep(self.interval)
+            frames = sys._current_frames()
+            with self._lock:
+                targets = list(self._targets.items())
+            for ident, capture in targets:
+                frame = frames.get(ident)
+                if frame is not None:
+                    capture.add(frame)
+            del frames, targets
+
+
+_sampler = Sampler()
+_cprofile_lock = threading.Lock()  # cProfile 은 한 프로세스에서 동시에 하나만 켤 수 있음
+
+
+def _recording_sql(capture):
+    stack = ExitStack()
+    for conn in connections.all():
+        stack.enter_context(conn.execute_wrapper(capture))
+    return stack
+
+
+def _percentages(counter):
+    total = sum(counter.values())
+    if not total:
+        return {}
+    return {name: round(counter.get(name, 0) * 100 / total, 1) for name in CATEGORIES}
+
+
+# ---------- 미들웨어 ----------
+class ProfilerMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.sample_rate = getattr(settings, 'PROFILER_SAMPLE_RATE', 0)
+        self.slow_ms = getattr(settings, 'PROFILER_SLOW_MS', 0)
+        _sampler.interval = getattr(settings, 'PROFILER_INTERVAL_MS', 5) / 1000
+
+    def __call__(self, request):
+        reason, mode = self._trigger(request)
+        if reason is None:
+            return self.get_response(request)
+        if mode == 'cprofile' and _cprofile_lock.acquire(blocking=False):
+            try:
+                return self._run_cprofile(request, reason)
+            finally:
+                _cprofile_lock.release()
+        return self._run_sampled(request, reason)
+
+    def _trigger(self, request):
+        token = request.headers.get(HEADER)
+        if token:
+            mode = verify_token(token)
+            if mode:
+                return 'header', mode
+        if self.sample_rate and random.random() < self.sample_rate:
+            return 'sample', 'sample'
+        if self.slow_ms:
+            return 'slow', 'sample'
+        return None, None
+
+    def _run_sampled(self, request, reason):
+        capture = Capture()
+        begin = time.perf_counter()
+        _sampler.track(capture)
+        try:
+            with _recording_sql(capture):
+                response = self.get_response(request)
+        finally:
+            _sampler.untrack()
+        elapsed_ms = (time.perf_counter() - begin) * 1000
+        if reason == 'slow' and elapsed_ms < self.slow_ms:
+            return response
+
+        folded = '\n'.join(f"{stack} {n}" for stack, n in capture.stacks.most_common())
+        meta = self._meta(request, response, reason, 'sample', elapsed_ms, capture)
+        meta.update(samples=capture.samples, interval_ms=_sampler.interval * 1000,
+                    categories=_percentages(capture.categories))
+        response['X-Profile-Id'] = save(meta, {'folded': folded})
+        return response
+
+    def _run_cprofile(self, request, reason):
+        capture = Capture()
+        profile = cProfile.Profile()
+        begin = time.perf_counter()
+        with _recording_sql(capture):
+            profile.enable()
+            try:
+                response = self.get_response(request)
+            finally:
+                profile.disable()
+        elapsed_ms = (time.perf_counter() - begin) * 1000
+
+        stats = pstats.Stats(profile)
+        # 함수 자체 시간(tottime)을 파일 위치로 분류
+        categories = Counter()
+        for (filename, _, _), (_, _, tottime, _, _) in stats.stats.items():
+            categories[_category(_short_path(filename)) or 'python'] += tottime
+        report = io.StringIO()
+        pstats.Stats(profile, stream=report).strip_dirs().sort_stats('cumulative').print_stats(80)
+
+        meta = self._meta(request, response, reason, 'cprofile', elapsed_ms, capture)
+        meta.update(categories=_percentages(categories))
+        # .prof 는 pstats.dump_stats 와 같은 형식 (snakeviz, python -m pstats 로 열 수 있음)
+        response['X-Profile-Id'] = save(meta, {'prof': marshal.dumps(stats.stats), 'txt': report.getvalue()})
+        return response
+
+    def _meta(self, request, response, reason, mode, elapsed_ms, capture):
+        match = getattr(request, 'resolver_match', None)
+        user = getattr(request, 'user', None)
+        return {
+            'created': time.time(),
+            'pid': os.getpid(),
+            'method': request.method,
+            'path': request.get_full_path()[:300],
+            'view': (match.view_name if match else '') or '',
+            'status': response.status_code,
+            'user': user.get_username() if user is not None and user.is_authenticated else '',
+            'reason': reason,
+            'mode': mode,
+            'duration_ms': round(elapsed_ms, 1),
+            'sql_count': capture.sql_count,
+            'sql_ms': round(capture.sql_seconds * 1000, 1),
+        }
+
+
+# 표본의 호출 스택은 이 함수들 아래부터 기록
+_STOP_CODES = {ProfilerMiddleware._run_sampled.__code__}
+
+
+# ---------- 디스크 보관 (링 버퍼) ----------
+def profile_dir():
+    path = getattr(settings, 'PROFILER_DIR', None) or os.path.join(tempfile.gettempdir(), 'cb-profiles')
+    os.makedirs(path, exist_ok=True)
+    return str(path)
+
+
+def _write_atomic(path, data):
+    mode = 'wb' if isinstance(data, bytes) else 'w'
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.tmp-')
+    with os.fdopen(fd, mode, **({} if mode == 'wb' else {'encoding': 'utf-8'})) as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def save(meta, files):
+    """프로파일을 저장하고 id 를 돌려줌. id 는 시각 순으로 정렬되므로 목록/정리에 그대로 씀"""
+    directory = profile_dir()
+    profile_id = f"{time.time_ns():016x}-{os.getpid()}"
+    meta = {'id': profile_id, **meta, 'files': sorted(files)}
+    for ext, data in files.items():
+        _write_atomic(os.path.join(directory, f"{profile_id}.{ext}"), data)
+    # 목록은 .json 기준이므로 가장 나중에 씀
+    _write_atomic(os.path.join(directory, f"{profile_id}.json"), json.dumps(meta, ensure_ascii=False))
+    _trim(directory)
+    return profile_id
+
+
+def _trim(directory):
+    keep = getattr(settings, 'PROFILER_KEEP', 100)
+    names = sorted(n for n in os.listdir(directory) if n.endswith('.json'))
+    for name in names[:-keep] if keep else names:
+        profile_id = name[:-len('.json')]
+        for ext in FILE_EXTENSIONS:
+            try:
+                os.unlink(os.path.join(directory, f"{profile_id}.{ext}"))
+            except FileNotFoundError:
+                pass  # 다른 워커가 먼저 지움
+
+
+def list_profiles():
+    directory = profile_dir()
+    result = []
+    for name in sorted((n for n in os.listdir(directory) if n.endswith('.json')), reverse=True):
+        try:
+            with open(os.path.join(directory, name), encoding='utf-8') as f:
+                result.append(json.load(f))
+        except (OSError, ValueError):
+            continue  # 정리 중에 지워진 파일
+    return result
+
+
+def load(profile_id):
+    meta = read(profile_id, 'json')
+    return json.loads(meta) if meta is not None else None
+
+
+def read(profile_id, ext):
+    if not _ID_RE.match(profile_id) or ext not in FILE_EXTENSIONS:
+        return None
+    try:
+        with open(os.path.join(profile_dir(), f"{profile_id}.{ext}"), 'rb') as f:
+            data = f.read()
+    except FileNotFoundError:
+        return None
+    return data if ext == 'prof' else data.decode('utf-8')
+
+
+# ---------- 화면용 분석 ----------
+def parse_folded(text):
+    stacks = Counter()
+    for line in text.splitlines():
+        stack, _, count = line.rpartition(' ')
+        if stack and count.isdigit():
+            stacks[stack] += int(count)
+    return stacks
+
+
+def hot_frames(stacks, limit=25):
+    """자체 시간(스택의 맨 안쪽)이 많은 함수 순"""
+    total = sum(stacks.values()) or 1
+    leaves = Counter()
+    for stack, n in stacks.items():
+        leaves[stack.rsplit(';', 1)[-1]] += n
+    return [{'label': label, 'samples': n, 'pct': round(n * 100 / total, 1)} for label, n in leaves.most_common(limit)]
+
+
+def flame_nodes(stacks, min_pct=0.5, row_height=18):
+    """접힌 스택 → 화면에 그릴 아이시클(위에서 아래로 자라는 flame graph) 상자 목록"""
+    total = sum(stacks.values())
+    if not total:
+        return [], 0
+    root = {}
+    for stack, n in stacks.items():
+        node = root
+        for label in stack.split(';'):
+            entry = node.setdefault(label, [0, {}])
+            entry[0] += n
+            node = entry[1]
+
+    boxes = []
+    depth_max = 0
+    pending = [(root, 0, 0.0)]
+    while pending:
+        children, depth, left = pending.pop()
+        for label, (count, grandchildren) in sorted(children.items()):
+            width = count * 100 / total
+            if width >= min_pct:
+                boxes.append({
+                    'label': label, 'samples': count, 'top': depth * row_height,
+                    'left': round(left, 3), 'width': round(width, 3), 'pct': round(width, 1),
+                })
+                depth_max = max(depth_max, depth + 1)
+                pending.append((grandchildren, depth + 1, left))
+            left += width
+    return boxes, depth_max * row_height
@@ -0,0 +1,226 @@
+"""
+쿼리 예산(query budget) 측정
+
+- 요청마다 실행된 쿼리 수, SQL 시간, 반복된 쿼리(숫자/문자열 값을 지운 SQL 모양 기준)를 URL 이름별로 기록
+- 같은 모양의 쿼리가 QUERY_BUDGET_REPEAT_THRESHOLD 번을 넘으면 N+1 의심으로 표시
+- 뷰에 @query_budget(queries=10) 처럼 예산을 달아두면 넘었을 때 로그를 남기거나(운영) 예외를 냄(개발)
+- 운영에서는 QUERY_BUDGET_SAMPLE_RATE 비율의 요청만 측정하고, 결과를 응답 헤더(X-Query-*)와
+  메모리 요약(summary(), /healthz/queries)에 남김
+- 스트리밍 응답(CSV 내보내기 등)은 본문을 만들면서 쿼리를 실행하므로 스트림이 끝날(닫힐) 때까지 세고 그때 검사.
+  헤더는 이미 나갔으므로 X-Query-* 헤더는 없고, 예산을 넘으면 raise 모드에서도 로그만 남김.
+  비동기 스트리밍 응답은 쿼리가 다른 스레드에서 실행되어 셀 수 없으므로 뷰 안의 쿼리까지만 셈
+"""
+import logging
+import random
+import re
+import threading
+import time
+from collections import Counter, defaultdict, deque
+from contextlib import ExitStack
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+# URL 이름별로 최근 몇 개의 요청을 기억할지
+SUMMARY_WINDOW = 200
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+@dataclass(frozen=True)
+class Budget:
+    queries: int = None
+    time_ms: float = None
+    repeats: int = None  # 같은 모양의 쿼리를 최대 몇 번까지 허용할지
+
+
+def query_budget(queries=None, time_ms=None, repeats=None):
+    """뷰에 쿼리 예산을 선언. 예: @query_budget(queries=8, repeats=2)"""
+    budget = Budget(queries, time_ms, repeats)
+
+    def decorator(view):
+        # login_required 등 functools.wraps 를 쓰는 데코레이터는 이 속성도 복사하므로 순서는 상관없음
+        view.query_budget = budget
+        return view
+    return decorator
+
+
+# ---------- SQL 모양(fingerprint) ----------
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r'\b\d+(?:\.\d+)?\b')
+_IN_LIST_RE = re.compile(r'\bIN\s*\((?:\s*(?:%s|\?)\s*,?)+\)', re.IGNORECASE)
+_SPACE_RE = re.compile(r'\s+')
+
+
+def fingerprint(sql):
+    sql = _STRING_RE.sub('?', sql)
+    sql = _NUMBER_RE.sub('?', sql)
+    sql = sql.replace('%s', '?')
+    sql = _IN_LIST_RE.sub('IN (...)', sql)
+    return _SPACE_RE.sub(' ', sql).strip()
+
+
+class QueryRecorder:
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.shapes = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        begin = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.seconds += time.perf_counter() - begin
+            self.count += 1
+            self.shapes[fingerprint(sql)] += 1
+
+    @property
+    def time_ms(self):
+        return self.seconds * 1000
+
+    def repeated(self, threshold):
+        return [(shape, n) for shape, n in self.shapes.most_common() if n > threshold]
+
+    def max_repeat(self):
+        return self.shapes.most_common(1)[0][1] if self.shapes else 0
+
+
+# ---------- 메모리 요약 ----------
+_summary_lock = threading.Lock()
+_samples = defaultdict(lambda: deque(maxlen=SUMMARY_WINDOW))
+_suspects = defaultdict(Counter)
+_breaches = Counter()
+
+
+def _record(name, recorder, breached, threshold):
+    with _summary_lock:
+        _samples[name].append((recorder.count, recorder.time_ms))
+        for shape, n in recorder.repeated(threshold):
+            _suspects[name][shape] = max(_suspects[name][shape], n)
+        if breached:
+            _breaches[name] += 1
+
+
+def _percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct))]
+
+
+def summary():
+    """URL 이름별 최근 요청의 쿼리 수/시간 분포와 N+1 의심 쿼리"""
+    with _summary_lock:
+        result = {}
+        for name, samples in _samples.items():
+            counts = [c for c, _ in samples]
+            times = [t for _, t in samples]
+            result[name] = {
+                'requests': len(samples),
+                'queries_p50': _percentile(counts, 0.5),
+                'queries_p95': _percentile(counts, 0.95),
+                'queries_max': max(counts),
+                'sql_ms_p50': round(_percentile(times, 0.5), 2),
+                'sql_ms_p95': round(_percentile(times, 0.95), 2),
+                'breaches': _breaches[name],
+                'repeated': dict(_suspects[name].most_common(5)),
+            }
+        return result
+
+
+def reset_summary():
+    with _summary_lock:
+        _samples.clear()
+        _suspects.clear()
+        _breaches.clear()
+
+
+# ---------- 미들웨어 ----------
+class _StreamingMeasure:
+    """스트리밍 본문을 감쌈. 끝까지 읽거나 close() 될 때 한 번만 측정을 끝냄
+    (StreamingHttpResponse 가 close 를 등록하므로 본문을 읽지 않고 닫혀도 실행 래퍼가 남지 않음)"""
+
+    def __init__(self, chunks, stack, finish):
+        self._chunks = iter(chunks)
+        self._stack = stack
+        self._finish = finish
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        try:
+            return next(self._chunks)
+        except StopIteration:
+            self.close()
+            raise
+
+    def close(self):
+        if self._stack is None:
+            return
+        stack, self._stack = self._stack, None
+        stack.close()
+        self._finish()
+
+
+class QueryBudgetMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.mode = getattr(settings, 'QUERY_BUDGET_MODE', 'log')            # off / log / raise
+        self.sample_rate = getattr(settings, 'QUERY_BUDGET_SAMPLE_RATE', 1.0)
+        self.threshold = getattr(settings, 'QUERY_BUDGET_REPEAT_THRESHOLD', 5)
+        self.default = Budget(queries=getattr(settings, 'QUERY_BUDGET_DEFAULT_QUERIES', None))
+
+    def __call__(self, request):
+        if self.mode == 'off' or random.random() >= self.sample_rate:
+            return self.get_response(request)
+
+        recorder = QueryRecorder()
+        stack = ExitStack()
+        with stack:
+            for conn in connections.all():
+                stack.enter_context(conn.execute_wrapper(recorder))
+            response = self.get_response(request)
+            if response.streaming and not response.is_async:
+                # 측정은 스트림을 다 보내거나 응답을 닫을 때 끝냄 (WSGI 는 같은 스레드에서 본문을 읽으므로 같은 연결)
+                response.streaming_content = _StreamingMeasure(
+                    response.streaming_content, stack.pop_all(), lambda: self._finish(request, recorder))
+                return response
+
+        self._finish(request, recorder, response)
+        return response
+
+    def _finish(self, request, recorder, response=None):
+        match = getattr(request, 'resolver_match', None)
+        name = (match.view_name if match else None) or request.path
+        budget = getattr(match.func, 'query_budget', self.default) if match else self.default
+        problems = self._check(budget, recorder)
+
+        if response is not None:
+            response['X-Query-Count'] = str(recorder.count)
+            response['X-Query-Time-Ms'] = f"{recorder.time_ms:.1f}"
+            response['X-Query-Max-Repeat'] = str(recorder.max_repeat())
+        _record(name, recorder, bool(problems), self.threshold)
+
+        repeated = recorder.repeated(self.threshold)
+        if repeated:
+            logger.info("N+1 의심 [%s] %s", name, '; '.join(f"{n}x {shape[:120]}" for shape, n in repeated[:3]))
+        if problems:
+            message = f"쿼리 예산 초과 [{name}]: " + ', '.join(problems)
+            if self.mode == 'raise' and response is not None:
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+
+    def _check(self, budget, recorder):
+        problems = []
+        if budget.queries is not None and recorder.count > budget.queries:
+            problems.append(f"쿼리 {recorder.count}개 > {budget.queries}개")
+        if budget.time_ms is not None and recorder.time_ms > budget.time_ms:
+            problems.append(f"SQL {recorder.time_ms:.1f}ms > {budget.time_ms}ms")
+        if budget.repeats is not None and recorder.max_repeat() > budget.repeats:
+            problems.append(f"같은 쿼리 {recorder.max_repeat()}번 > {budget.repeats}번")
+        return problems
@@ -0,0 +1,223 @@
+"""
+요청 제한 (rate limit) 과 동시 처리 제한 (admission control)
+
+쓰기 요청(쪽지/댓글/글 작성, 로그인) 하나가 INSERT 와 알림을 여러 개 만들기 때문에, 스크립트 하나가 버튼을 연타하면
+적은 수의 gunicorn 워커가 그 요청에 묶이고 RDS 가 먼저 바빠진다.
+
+1) @rate_limit('10/m', key='user') — 뷰별 토큰 버킷 (사용자/IP/임의 키 + 엔드포인트별)
+   - 빠른 경로: 프로세스 안의 버킷에서 먼저 확인 → 넘으면 캐시/DB 를 건드리지 않고 바로 429
+   - 느린 경로: RATELIMIT_CACHE_ALIAS 캐시의 시간 구간 카운터로 합계를 확인 (incr 한 번)
+     CACHE_URL 로 Redis/memcached 를 지정했을 때만 모든 서버/워커의 합계. 메모리 캐시면 워커마다 따로 세므로
+     실제 한도는 (워커 수 × 한도) 까지 늘어남 → 운영에서는 시스템 체크가 경고 (ops.W002)
+   - 429 응답은 템플릿 없이 짧은 본문 + Retry-After 헤더
+2) AdmissionMiddleware — 인스턴스 전체에서 동시에 처리 중인 쓰기 요청 수를 ADMISSION_MAX_WRITES 개로 제한
+   - 자리(slot)는 파일 잠금(flock)이라 워커 프로세스/스레드 모두 합쳐서 셈. 프로세스가 죽으면 잠금도 풀림
+   - 잠깐(ADMISSION_QUEUE_TIMEOUT) 기다려도 자리가 없으면 503 + Retry-After 로 바로 돌려보냄 (DB 가 밀리기 전에)
+"""
+import functools
+import logging
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+
+from . import metrics
+
+try:
+    import fcntl
+except ImportError:  # Windows (개발 환경) → 동시 처리 제한 없음
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+# 프로세스 안에서 기억할 버킷 수 (넘으면 가장 오래 안 쓴 것부터 버림)
+LOCAL_MAX_KEYS = 10000
+
+
+def parse_rate(rate):
+    """'10/m' → (10, 60). '5/10s' 처럼 구간 길이도 쓸 수 있음"""
+    count, _, period = rate.partition('/')
+    unit = period[-1]
+    length = int(period[:-1] or 1)
+    return int(count), length * PERIODS[unit]
+
+
+def client_ip(request):
+    # 앞단 프록시(ALB/nginx)가 RATELIMIT_PROXY_COUNT 개면 X-Forwarded-For 의 뒤에서 그 번째가 실제 접속 주소
+    proxies = settings.RATELIMIT_PROXY_COUNT
+    forwarded = request.META.get('HTTP_X_FORWARDED_FOR', '')
+    if proxies and forwarded:
+        hops = [hop.strip() for hop in forwarded.split(',')]
+        return hops[-proxies] if len(hops) >= proxies else hops[0]
+    return request.META.get('REMOTE_ADDR', '')
+
+
+KEYS = {
+    'ip': client_ip,
+    'user': lambda request: f'u{request.user.pk}' if request.user.is_authenticated else f'ip{client_ip(request)}',
+    'username': lambda request: (request.POST.get('username') or '').strip().lower(),  # 로그인 시도 대상 계정
+}
+
+
+# ---------- 빠른 경로: 프로세스 안의 토큰 버킷 ----------
+class LocalBuckets:
+    def __init__(self, max_keys=LOCAL_MAX_KEYS):
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()  # key → (남은 토큰, 마지막 갱신 시각)
+        self._lock = threading.Lock()
+
+    def take(self, key, per_second, capacity, now=None):
+        """토큰 하나를 쓰면 0, 모자라면 다음 토큰까지 기다릴 초"""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated) * per_second)
+            wait = 0.0
+            if tokens >= 1:
+                tokens -= 1
+            else:
+                wait = (1 - tokens) / per_second
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+            return wait
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+
+
+_local = LocalBuckets()
+
+
+def reset():
+    """이 프로세스의 버킷을 비움 (테스트용)"""
+    _local.clear()
+
+
+# ---------- 느린 경로: 공유 캐시의 구간 카운터 ----------
+def _shared_take(key, count, period, now=None):
+    """서버 전체에서 이번 구간에 count 개를 넘었으면 구간이 끝날 때까지 남은 초, 아니면 0"""
+    now = time.time() if now is None else now
+    window = int(now // period)
+    cache_key = f'ratelimit:{key}:{window}'
+    cache = caches[settings.RATELIMIT_CACHE_ALIAS]
+    try:
+        cache.add(cache_key, 0, period + 1)
+        used = cache.incr(cache_key)
+    except ValueError:  # add 와 incr 사이에 만료됨
+        cache.set(cache_key, 1, period + 1)
+        used = 1
+    except Exception:
+        # 캐시 서버 장애로 쓰기 요청을 모두 막지는 않음 (프로세스 안의 제한은 계속 적용됨)
+        logger.warning("요청 제한 공유 카운터를 읽지 못함: %s", cache_key, exc_info=True)
+        return 0.0
+    return (window + 1) * period - now if used > count else 0.0
+
+
+def too_many_requests(retry_after):
+    response = HttpResponse(
+        "요청이 너무 많습니다. 잠시 후 다시 시도해 주세요.\n", status=429, content_type='text/plain; charset=utf-8',
+    )
+    response['Retry-After'] = str(max(1, math.ceil(retry_after)))
+    return response
+
+
+def rate_limit(rate, key='user', burst=None, methods=('POST',), scope=None):
+    """
+    뷰에 요청 제한을 선언. 예: @rate_limit('10/m') — 사용자별 분당 10번 (처음에는 burst 개까지 연달아 허용)
+    key: 'user'(로그인 안 했으면 IP) / 'ip' / 'username'(로그인 폼의 아이디) / request → 문자열 함수
+    여러 개를 겹쳐 달면 모두 통과해야 함
+    """
+    count, period = parse_rate(rate)
+    capacity = burst or count
+    per_second = count / period
+    key_func = KEYS[key] if isinstance(key, str) else key
+
+    def decorator(view):
+        name = scope or f'{view.__module__}.{view.__qualname__}'
+
+        @functools.wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if settings.RATELIMIT_ENABLED and request.method in methods:
+                bucket = f'{name}:{key_func(request)}'
+                wait = _local.take(bucket, per_second, capacity)
+                if wait:
+                    metrics.RATE_LIMITED.inc(scope=name, path='local')
+                    return too_many_requests(wait)
+                wait = _shared_take(bucket, count, period)
+                if wait:
+                    metrics.RATE_LIMITED.inc(scope=name, path='shared')
+                    return too_many_requests(wait)
+            return view(request, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# ---------- 동시 처리 제한 ----------
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS', 'TRACE')
+
+
+class _Slots:
+    """디렉터리 안의 잠금 파일 N 개 = 인스턴스 전체의 동시 처리 자리"""
+
+    def __init__(self, directory, size):
+        self.directory = directory
+        self.size = size
+        self._ready_pid = None
+
+    def _ensure_dir(self):
+        if self._ready_pid != os.getpid():
+            os.makedirs(self.directory, exist_ok=True)
+            self._ready_pid = os.getpid()
+
+    def acquire(self, timeout):
+        """잡은 자리의 파일 디스크립터, timeout 안에 못 잡으면 None"""
+        self._ensure_dir()
+        deadline = time.monotonic() + timeout
+        start = os.getpid() % self.size  # 프로세스마다 다른 자리부터 찾아서 앞 번호에 몰리지 않게
+        while True:
+            for i in range(self.size):
+                path = os.path.join(self.directory, f'slot-{(start + i) % self.size}.lock')
+                fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+                try:
+                    fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    return fd
+                except BlockingIOError:
+                    os.close(fd)
+            if time.monotonic() >= deadline:
+                return None
+            time.sleep(0.01)
+
+    @staticmethod
+    def release(fd):
+        os.close(fd)  # 닫으면 flock 도 풀림
+
+
+class AdmissionMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.slots = _Slots(settings.ADMISSION_DIR, settings.ADMISSION_MAX_WRITES) if fcntl else None
+
+    def __call__(self, request):
+        if self.slots is None or not self.slots.size or request.method in SAFE_METHODS:
+            return self.get_response(request)
+        fd = self.slots.acquire(settings.ADMISSION_QUEUE_TIMEOUT)
+        if fd is None:
+            metrics.ADMISSION_SHED.inc()
+            response = HttpResponse(
+                "지금은 요청이 많아 처리할 수 없습니다. 잠시 후 다시 시도해 주세요.\n",
+                status=503, content_type='text/plain; charset=utf-8',
+            )
+            response['Retry-After'] = '1'
+            return response
+        try:
+            return self.get_response(request)
+        finally:
+            self.slots.release(fd)
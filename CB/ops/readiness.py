@@ -0,0 +1,52 @@
+"""
+준비 상태(readiness) 플래그
+
+워커는 시작하자마자 요청을 받을 수 있지만, 첫 요청들은 URL/템플릿/DB 연결을 준비하느라 느리다.
+warm_up() (단계는 ops/warmup.py) 이 끝나야 /healthz/ready 가 200을 돌려주므로 로드밸런서는 준비된 인스턴스에만 트래픽을 보낸다.
+
+- gunicorn: 워커가 fork 된 직후(post_worker_init) warm_up() 을 실행 (ops/gunicorn_conf.py)
+- runserver 등 그 밖의 서버: 첫 readiness 요청 때 백그라운드에서 warm_up() 을 시작
+"""
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+_ready = threading.Event()
+_started = threading.Lock()
+_state = {'started': False, 'error': None, 'seconds': None, 'steps': {}}
+
+
+def is_ready():
+    return _ready.is_set()
+
+
+def state():
+    return {'ready': is_ready(), **_state}
+
+
+def warm_up():
+    """준비 작업(ops/warmup.py)을 실행하고 성공하면 ready 로 표시. 이미 실행 중이거나 끝났으면 아무것도 안 함"""
+    from . import warmup
+
+    with _started:
+        if _state['started']:
+            return
+        _state['started'] = True
+
+    begin = time.monotonic()
+    results = warmup.run()
+    _state['steps'] = {r.name: round(r.seconds, 3) for r in results}
+    failed = [r for r in results if not r.ok]
+    if failed:
+        _state.update(started=False, error=f"{failed[0].name}: {failed[0].error}")  # 다음 readiness 요청 때 다시 시도
+        return
+    _state.update(error=None, seconds=round(time.monotonic() - begin, 3))
+    logger.info("warm-up 완료 (%.3fs): %s", _state['seconds'], _state['steps'])
+    _ready.set()
+
+
+def warm_up_in_background():
+    if not _state['started'] and not is_ready():
+        threading.Thread(target=warm_up, name='warm-up', daemon=True).start()
@@ -0,0 +1,126 @@
+"""
+알림 보관 기간 관리 (python manage.py purge_notifications)
+
+공지 한 건마다 아래 직급 사원 수만큼 알림이 생기고 지우는 곳이 없어서, 시간이 갈수록 알림 테이블만 커진다.
+- 읽은 알림: NOTIFICATION_READ_RETENTION_DAYS 일이 지나면 삭제
+- 안 읽은 알림: NOTIFICATION_UNREAD_RETENTION_DAYS 일이 지나면 사람별 요약 알림 한 줄(rollup_count)로 합침
+- 테이블을 오래 잠그지 않도록 id 순서로 BATCH_SIZE 행씩 잘라서 짧은 트랜잭션으로 처리하고, 구간 사이에 쉼
+- id 순서 ≈ 작성 순서이므로 기준 시각보다 새 알림이 나오는 구간에서 멈춤 (최근 데이터는 읽지 않음)
+- 인스턴스마다 타이머가 돌아도 이름 잠금(ops/locks.py)으로 한 곳에서만 실행
+"""
+import time
+from collections import Counter
+from dataclasses import dataclass
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from community.models import Notification
+from .locks import named_lock
+
+LOCK_NAME = 'cb:purge_notifications'
+
+
+@dataclass
+class Result:
+    scanned: int = 0      # 살펴본 알림 수
+    purged: int = 0       # 삭제한 읽은 알림 수
+    rolled_up: int = 0    # 요약으로 합치고 지운 안 읽은 알림 행 수
+    summaries: int = 0    # 요약 알림을 받은(갱신된) 사람 수
+    batches: int = 0
+    seconds: float = 0.0
+
+
+def summary_message(count):
+    return f"📦 확인하지 않은 오래된 알림 {count}개를 정리했습니다."
+
+
+def _batches(horizon, batch_size):
+    """id 순서로 batch_size 행씩 (id, 받는 사람, 읽음, 작성 시각, 요약 여부). horizon 보다 새 행이 나온 구간까지만"""
+    last_id = 0
+    while True:
+        rows = list(
+            Notification.objects.filter(id__gt=last_id).order_by('id')
+            .values_list('id', 'recipient_id', 'is_read', 'created_at', 'rollup_count')[:batch_size]
+        )
+        if not rows:
+            return
+        yield rows
+        if rows[-1][3] >= horizon:
+            return
+        last_id = rows[-1][0]
+
+
+def _roll_up(candidate_ids):
+    """안 읽은 알림을 지우고 받는 사람별 요약 알림에 개수를 더함 (트랜잭션 안에서 호출)"""
+    # 고르는 사이에 읽음 처리된 알림은 빼고, 지울 행만 잠금 (id 로 찾으므로 행 잠금만 걸림)
+    locked = list(
+        Notification.objects.select_for_update()
+        .filter(id__in=candidate_ids, is_read=False, rollup_count=0)
+        .values_list('id', 'recipient_id', 'count')
+    )
+    if not locked:
+        return 0, set()
+    per_recipient = Counter()
+    for _, recipient_id, count in locked:  # 묶음 알림은 합쳐진 수만큼 셈
+        per_recipient[recipient_id] += count
+    Notification.objects.filter(id__in=[pk for pk, _, _ in locked]).delete()
+    for recipient_id, count in per_recipient.items():
+        summary = (Notification.objects.select_for_update()
+                   .filter(recipient_id=recipient_id, rollup_count__gt=0, is_read=False).first())
+        if summary is None:
+            Notification.objects.create(recipient_id=recipient_id, message=summary_message(count), rollup_count=count)
+        else:
+            summary.rollup_count += count
+            summary.message = summary_message(summary.rollup_count)
+            summary.save(update_fields=['rollup_count', 'message'])
+    return len(locked), set(per_recipient)
+
+
+def run(read_days=None, unread_days=None, batch_size=None, sleep=None, dry_run=False, log=None):
+    """보관 기간이 지난 알림을 정리하고 Result 를 돌려줌. 다른 곳에서 실행 중이면 None"""
+    read_days = settings.NOTIFICATION_READ_RETENTION_DAYS if read_days is None else read_days
+    unread_days = settings.NOTIFICATION_UNREAD_RETENTION_DAYS if unread_days is None else unread_days
+    batch_size = batch_size or settings.NOTIFICATION_PURGE_BATCH_SIZE
+    sleep = settings.NOTIFICATION_PURGE_SLEEP if sleep is None else sleep
+    log = log or (lambda message: None)
+
+    now = timezone.now()
+    read_cutoff = now - timedelta(days=read_days)
+    unread_cutoff = now - timedelta(days=unread_days)
+    horizon = max(read_cutoff, unread_cutoff)
+
+    with named_lock(LOCK_NAME) as acquired:
+        if not acquired:
+            return None
+        result = Result()
+        recipients = set()
+        began = time.monotonic()
+        for rows in _batches(horizon, batch_size):
+            result.batches += 1
+            result.scanned += len(rows)
+            read_ids = [pk for pk, _, is_read, created, _ in rows if is_read and created < read_cutoff]
+            unread_ids = [pk for pk, _, is_read, created, rollup in rows
+                          if not is_read and not rollup and created < unread_cutoff]
+            if not read_ids and not unread_ids:
+                continue
+            if dry_run:
+                result.purged += len(read_ids)
+                result.rolled_up += len(unread_ids)
+                continue
+            with transaction.atomic():
+                if read_ids:
+                    # 알림을 가리키는 FK 가 없어서 DELETE 한 번으로 끝남 (CASCADE 조회 없음)
+                    result.purged += Notification.objects.filter(id__in=read_ids, is_read=True).delete()[0]
+                if unread_ids:
+                    rolled_up, summarized = _roll_up(unread_ids)
+                    result.rolled_up += rolled_up
+                    recipients |= summarized
+            log(f"구간 {rows[0][0]}~{rows[-1][0]}: 삭제 {len(read_ids)}, 요약 {len(unread_ids)}")
+            if sleep:
+                time.sleep(sleep)  # 복제 지연/다른 요청의 잠금 대기가 쌓이지 않게 구간 사이에 쉼
+        result.summaries = len(recipients)
+        result.seconds = time.monotonic() - began
+        return result
@@ -0,0 +1,149 @@
+"""
+운영 서버(gunicorn) 설정 계산
+
+- 인스턴스의 CPU 수와 메모리를 읽어서 워커 종류/개수를 정함 (t3.micro: 2 vCPU, 1GB)
+- 메모리가 넉넉하면 sync 워커를 CPU*2+1 개, 부족하면 워커 수를 줄이고 gthread 스레드로 동시 처리량을 채움
+- 값은 모두 SERVE_* 환경변수로 덮어쓸 수 있음 (python manage.py serve 옵션도 환경변수로 넘어옴)
+
+이 모듈은 gunicorn 설정 파일(ops/gunicorn_conf.py)에서 Django 설정 전에 읽히므로 Django를 import 하지 않는다.
+"""
+import math
+import os
+from dataclasses import asdict, dataclass
+
+MB = 1024 * 1024
+
+# 워커 하나가 차지하는 메모리 추정치 (Django + Pillow + mysqlclient, preload 로 공유되는 부분 제외)
+WORKER_MEMORY_ESTIMATE = 150 * MB
+# OS, nginx, EFS 클라이언트 등에 남겨둘 메모리
+SYSTEM_RESERVE = 256 * MB
+MAX_THREADS = 8
+
+ASGI_WORKER_CLASS = 'uvicorn.workers.UvicornWorker'
+
+
+@dataclass
+class ServerPlan:
+    worker_class: str
+    workers: int
+    threads: int
+    max_worker_rss: int       # 이 크기(bytes)를 넘은 워커는 요청 처리 후 교체
+    cpus: int
+    memory: int
+    reason: str
+
+    def as_dict(self):
+        return asdict(self)
+
+
+def _read_int(path):
+    try:
+        with open(path) as f:
+            value = f.read().strip()
+    except OSError:
+        return None
+    return int(value) if value.isdigit() else None
+
+
+def detect_cpus():
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    # 컨테이너(cgroup v2) CPU 제한
+    try:
+        with open('/sys/fs/cgroup/cpu.max') as f:
+            quota, period = f.read().split()
+        if quota != 'max':
+            cpus = min(cpus, max(1, math.ceil(int(quota) / int(period))))
+    except (OSError, ValueError):
+        pass
+    return cpus
+
+
+def detect_memory():
+    total = None
+    try:
+        with open('/proc/meminfo') as f:
+            for line in f:
+                if line.startswith('MemTotal:'):
+                    total = int(line.split()[1]) * 1024
+                    break
+    except OSError:
+        pass
+    # 컨테이너 메모리 제한 (cgroup v2 / v1)
+    for path in ('/sys/fs/cgroup/memory.max', '/sys/fs/cgroup/memory/memory.limit_in_bytes'):
+        limit = _read_int(path)
+        if limit and (total is None or limit < total):
+            total = limit
+    return total or 1024 * MB
+
+
+def plan(cpus=None, memory=None, worker_class='auto', per_worker=WORKER_MEMORY_ESTIMATE,
+         reserve=SYSTEM_RESERVE):
+    cpus = cpus or detect_cpus()
+    memory = memory or detect_memory()
+
+    budget = max(memory - reserve, per_worker)
+    by_cpu = cpus * 2 + 1
+    by_memory = max(1, budget // per_worker)
+
+    if worker_class == 'auto':
+        if by_memory >= by_cpu:
+            worker_class, workers, threads = 'sync', by_cpu, 1
+            reason = f"메모리 여유 있음 → sync 워커 CPU*2+1={by_cpu}개"
+        else:
+            # 메모리가 부족하면 프로세스 수를 줄이고, DB/EFS 대기 시간은 스레드로 채움
+            workers = max(1, min(by_memory, cpus + 1))
+            threads = min(MAX_THREADS, max(2, math.ceil(by_cpu * 2 / workers)))
+            worker_class = 'gthread'
+            reason = f"메모리 기준 최대 {by_memory}개 < {by_cpu}개 → gthread {workers}x{threads}"
+    elif worker_class == 'asgi':
+        worker_class, workers, threads = ASGI_WORKER_CLASS, max(1, min(by_memory, cpus)), 1
+        reason = "ASGI 지정 → 코어당 이벤트 루프 하나"
+    elif worker_class == 'gthread':
+        workers = max(1, min(by_memory, cpus + 1))
+        threads = min(MAX_THREADS, max(2, math.ceil(by_cpu * 2 / workers)))
+        reason = "gthread 지정"
+    else:
+        workers, threads = max(1, min(by_memory, by_cpu)), 1
+        reason = f"{worker_class} 지정"
+
+    max_worker_rss = max(per_worker, min(per_worker * 2, budget // workers))
+    return ServerPlan(worker_class, int(workers), int(threads), int(max_worker_rss), cpus, memory, reason)
+
+
+def _env_int(name, default):
+    value = os.environ.get(name)
+    return int(value) if value else default
+
+
+def build_config():
+    """gunicorn 설정 값(dict). SERVE_* 환경변수가 있으면 계산값 대신 사용"""
+    p = plan(
+        worker_class=os.environ.get('SERVE_WORKER_CLASS', 'auto'),
+        per_worker=_env_int('SERVE_WORKER_MEMORY_MB', WORKER_MEMORY_ESTIMATE // MB) * MB,
+    )
+    workers = _env_int('SERVE_WORKERS', p.workers)
+    threads = _env_int('SERVE_THREADS', p.threads)
+    max_requests = _env_int('SERVE_MAX_REQUESTS', 2000)
+    is_asgi = p.worker_class == ASGI_WORKER_CLASS
+
+    return {
+        'wsgi_app': 'CB.asgi:application' if is_asgi else 'CB.wsgi:application',
+        'bind': os.environ.get('SERVE_BIND', '0.0.0.0:8000'),
+        'worker_class': p.worker_class,
+        'workers': workers,
+        'threads': threads,
+        # 앱을 마스터에서 한 번만 읽고 fork → 워커끼리 메모리 페이지를 copy-on-write 로 공유
+        'preload_app': os.environ.get('SERVE_PRELOAD', 'True') == 'True',
+        # 메모리 누수 대비: 일정 요청 수마다 교체 (jitter 로 워커들이 동시에 재시작되지 않게)
+        'max_requests': max_requests,
+        'max_requests_jitter': max_requests // 10,
+        'timeout': _env_int('SERVE_TIMEOUT', 30),
+        'graceful_timeout': _env_int('SERVE_GRACEFUL_TIMEOUT', 30),
+        # ALB 유휴 타임아웃(60초)보다 길게 잡아야 LB가 끊긴 연결로 요청을 보내지 않음
+        'keepalive': _env_int('SERVE_KEEPALIVE', 75),
+        'max_worker_rss': _env_int('SERVE_MAX_RSS_MB', p.max_worker_rss // MB) * MB,
+        'plan': p,
+    }
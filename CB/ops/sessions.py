@@ -0,0 +1,103 @@
+"""
+쓰기를 줄인 세션 저장소 (SESSION_ENGINE = 'ops.sessions')
+
+django.contrib.sessions 의 cached_db 와 같이 캐시에서 먼저 읽고 없으면 DB(django_session)에서 읽는다. 달라진 점:
+- 내용이 바뀌지 않았으면 저장하지 않음. 만료 시각만 늘리는 저장은 SESSION_REFRESH_INTERVAL 초에 한 번만 DB 에 씀
+  (SESSION_SAVE_EVERY_REQUEST 로 요청마다 save() 가 불려도 대부분 아무것도 하지 않음 → 로그인 상태가 계속 연장됨)
+- 캐시는 워커 프로세스마다 따로라서(locmem), 다른 워커에서 로그아웃한 세션을 오래 믿지 않도록
+  캐시 유지 시간을 SESSION_CACHE_TIMEOUT 초로 짧게 둠
+- 만료된 세션은 purge_expired() 로 조금씩 지움 (python manage.py purge_sessions)
+"""
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.sessions.backends import cached_db
+from django.contrib.sessions.backends.db import SessionStore as DBStore
+from django.contrib.sessions.models import Session
+from django.utils import timezone
+
+from . import metrics
+from .locks import named_lock
+
+LOCK_NAME = 'cb:purge_sessions'
+
+
+class SessionStore(cached_db.SessionStore):
+    cache_key_prefix = 'ops.sessions'
+
+    def __init__(self, session_key=None):
+        super().__init__(session_key)
+        self._loaded = None       # 읽어 온 시점의 내용 (저장할 때 바뀌었는지 비교)
+        self._expires_at = None   # DB 에 적혀 있는 만료 시각 (timestamp)
+
+    def _remember(self, data, expires_at):
+        self._loaded = dict(data)
+        self._expires_at = expires_at
+        timeout = min(settings.SESSION_CACHE_TIMEOUT, int(expires_at - time.time()))
+        if timeout > 0:
+            try:
+                self._cache.set(self.cache_key, (data, expires_at), timeout)
+            except Exception:
+                cached_db.logger.exception("Error saving to cache (%s)", self._cache)
+
+    def load(self):
+        try:
+            cached = self._cache.get(self.cache_key)
+        except Exception:
+            cached = None  # 잘못된 키 등 (cached_db 와 같음)
+        metrics.cache_result('session', cached is not None)
+        if cached is not None:
+            data, expires_at = cached
+            self._loaded, self._expires_at = dict(data), expires_at
+            return data
+        s = self._get_session_from_db()
+        if s is None:
+            return {}
+        data = self.decode(s.session_data)
+        self._remember(data, s.expire_date.timestamp())
+        return data
+
+    def _unchanged(self):
+        if self._loaded is None or self._session != self._loaded:
+            return False
+        # 만료 시각을 늘린 지 SESSION_REFRESH_INTERVAL 초가 안 지났으면 그대로 둠
+        return self.get_expiry_date().timestamp() - self._expires_at < settings.SESSION_REFRESH_INTERVAL
+
+    def save(self, must_create=False):
+        if not must_create and self.session_key is not None and self._unchanged():
+            metrics.SESSION_SAVES.inc(result='skipped')
+            return
+        DBStore.save(self, must_create)
+        self._remember(self._session, self.get_expiry_date().timestamp())
+        metrics.SESSION_SAVES.inc(result='written')
+
+    # 캐시에 넣는 값의 모양이 cached_db 와 다르므로 비동기 경로도 같은 코드를 씀
+    async def aload(self):
+        return await sync_to_async(self.load)()
+
+    async def asave(self, must_create=False):
+        return await sync_to_async(self.save)(must_create)
+
+
+def purge_expired(batch_size=None, sleep=None, log=None):
+    """만료된 세션을 batch_size 행씩 지우고 지운 수를 돌려줌. 다른 곳에서 실행 중이면 None"""
+    batch_size = batch_size or settings.SESSION_PURGE_BATCH_SIZE
+    sleep = settings.SESSION_PURGE_SLEEP if sleep is None else sleep
+    log = log or (lambda message: None)
+    now = timezone.now()
+    with named_lock(LOCK_NAME) as acquired:
+        if not acquired:
+            return None
+        deleted = 0
+        while True:
+            # expire_date 인덱스로 골라서 기본 키로 지움 (한 번에 큰 DELETE 를 하지 않음)
+            keys = list(Session.objects.filter(expire_date__lt=now).values_list('session_key', flat=True)[:batch_size])
+            if not keys:
+                return deleted
+            deleted += Session.objects.filter(session_key__in=keys).delete()[0]
+            log(f"만료 세션 {deleted}개 삭제")
+            if len(keys) < batch_size:
+                return deleted
+            if sleep:
+                time.sleep(sleep)
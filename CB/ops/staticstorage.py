@@ -0,0 +1,140 @@
+"""
+정적 파일 저장소 (python manage.py collectstatic)
+
+예전에는 base.html 에서 style.css 뒤에 ?v=1.2 를 손으로 올려 가며 캐시를 깨고, 정적 파일은 캐시 헤더 없이 나갔다.
+- 파일 이름에 내용 해시를 넣고(style.css → style.3f2a9c1b7d4e.css) staticfiles.json(manifest)에 기록
+  → 내용이 바뀌면 이름이 바뀌므로 브라우저는 1년 동안 다시 묻지 않아도 됨 (Cache-Control: immutable)
+- PNG 는 픽셀을 바꾸지 않고 다시 압축해서 더 작을 때만 바꿈. JPEG 는 jpegtran 이 있으면 허프만 테이블만 최적화 (무손실)
+- css/js/svg 등은 같은 폴더에 .gz 를 미리 만들어 둠 (nginx gzip_static / static_file 뷰가 그대로 보냄)
+- STATIC_ROOT/nginx-static.conf: nginx 를 앞에 둘 때 server 블록에서 include 할 설정.
+  nginx 가 없으면 Django 가 같은 헤더로 직접 보냄 (ops/views.py static_file, STATIC_SERVE)
+"""
+import gzip
+import io
+import os
+import shutil
+import subprocess
+import tempfile
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow 가 없으면 이미지는 그대로 복사
+    Image = None
+
+GZIP_EXTENSIONS = ('.css', '.js', '.mjs', '.map', '.svg', '.json', '.txt', '.html', '.xml', '.ico', '.ttf', '.eot', '.otf')
+HASHED_PATTERN = r'\.[0-9a-f]{12}\.[A-Za-z0-9]+'   # ManifestStaticFilesStorage 가 붙이는 해시 (12자리)
+NGINX_INCLUDE = 'nginx-static.conf'
+IMMUTABLE = 'public, max-age=31536000, immutable'
+REVALIDATE = 'public, max-age=3600'                   # 해시 없는 이름 (예전 링크, 관리자 화면 일부)
+
+
+def _optimize_png(data):
+    image = Image.open(io.BytesIO(data))
+    if getattr(image, 'is_animated', False):
+        return data
+    out = io.BytesIO()
+    options = {key: image.info[key] for key in ('transparency', 'icc_profile', 'dpi', 'gamma') if key in image.info}
+    image.save(out, format='PNG', optimize=True, **options)
+    return out.getvalue()
+
+
+def _optimize_jpeg(data):
+    jpegtran = shutil.which('jpegtran')
+    if not jpegtran:
+        return data
+    result = subprocess.run([jpegtran, '-copy', 'icc', '-optimize', '-progressive'],
+                            input=data, capture_output=True, timeout=60)
+    return result.stdout if result.returncode == 0 and result.stdout else data
+
+
+def optimize_image(name, data):
+    """무손실로 다시 압축해서 더 작아졌으면 그 결과, 아니면 원본"""
+    lower = name.lower()
+    try:
+        if lower.endswith('.png') and Image is not None:
+            optimized = _optimize_png(data)
+        elif lower.endswith(('.jpg', '.jpeg')):
+            optimized = _optimize_jpeg(data)
+        else:
+            return data
+    except Exception:  # 깨진 이미지 등은 손대지 않고 그대로 복사
+        return data
+    return optimized if len(optimized) < len(data) else data
+
+
+def static_prefix():
+    url = settings.STATIC_URL
+    return url if url.startswith('/') else '/' + url
+
+
+def nginx_include(root):
+    """해시 붙은 이름은 1년 immutable, 나머지는 1시간. 둘 다 .gz 가 있으면 그것을 보냄"""
+    prefix = static_prefix()
+    root = str(root).rstrip('/')
+    return f"""# collectstatic 이 만든 파일입니다. server {{ }} 안에서 include 하세요.
+location ~ "^{prefix}(.+{HASHED_PATTERN})$" {{
+    alias {root}/$1;
+    gzip_static on;
+    add_header Vary Accept-Encoding;
+    add_header Cache-Control "{IMMUTABLE}";
+    access_log off;
+}}
+location {prefix} {{
+    alias {root}/;
+    gzip_static on;
+    add_header Vary Accept-Encoding;
+    add_header Cache-Control "{REVALIDATE}";
+}}
+"""
+
+
+class CompressedManifestStorage(ManifestStaticFilesStorage):
+    def stored_name(self, name):
+        # collectstatic 을 아직 안 돌린 환경(개발/테스트)은 manifest 가 없으므로 원래 이름을 씀.
+        # manifest 가 있는데 항목이 없으면 오타이므로 그대로 오류
+        if not self.hashed_files:
+            return name
+        return super().stored_name(name)
+
+    def _save(self, name, content):
+        # 원본 복사 단계에서 최적화 → 해시도 최적화된 내용으로 계산됨
+        if name.lower().endswith(('.png', '.jpg', '.jpeg')):
+            data = content.read()
+            content = ContentFile(optimize_image(name, data))
+        return super()._save(name, content)
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run=dry_run, **options)
+        if dry_run:
+            return
+        for name in sorted(set(self.hashed_files.values()) | set(paths)):
+            if name.lower().endswith(GZIP_EXTENSIONS) and self.exists(name):
+                if self._write_gzip(name):
+                    yield name, f'{name}.gz', True
+        self._write_text(NGINX_INCLUDE, nginx_include(self.location))
+
+    def _write_gzip(self, name):
+        path = self.path(name)
+        with open(path, 'rb') as f:
+            data = f.read()
+        compressed = gzip.compress(data, compresslevel=9, mtime=0)
+        if len(compressed) >= len(data):
+            return False
+        self._write_atomic(f'{path}.gz', compressed)
+        return True
+
+    def _write_text(self, name, text):
+        self._write_atomic(self.path(name), text.encode())
+
+    @staticmethod
+    def _write_atomic(path, data):
+        # 서비스 중인 파일을 덮어쓰므로 임시 파일에 쓴 뒤 이름만 바꿈 (반쯤 쓴 파일을 보내지 않게)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.tmp-')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, path)
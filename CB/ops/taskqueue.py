@@ -0,0 +1,296 @@
+"""
+DB 기반 백그라운드 작업 큐 (python manage.py run_worker)
+
+공지 알림 퍼뜨리기, 멘션 알림, 썸네일 생성, 정리 작업처럼 요청 안에서 기다릴 필요가 없는 일은
+ops_task 테이블에 행 하나만 넣고(enqueue) 응답하고, 워커 프로세스가 가져가서 실행한다.
+
+- 작업 정의: 앱의 tasks.py 에 @task 를 단 함수. 인자는 JSON 으로 저장되므로 모델 객체 대신 id 를 넘김
+    @task(queue='notifications')
+    def fan_out_notice(post_id): ...
+    fan_out_notice.enqueue(post.id, key=f'notice:{post.id}')
+- 가져가기(claim): MySQL 은 SELECT ... FOR UPDATE SKIP LOCKED → 워커끼리 같은 행을 기다리지 않음.
+  SQLite 는 쓰기가 한 번에 하나뿐이라 "queued 일 때만 running 으로" UPDATE 가 성공한 행만 가져감 (compare-and-set)
+- 실패하면 backoff * 2^(시도-1) 초 뒤에 다시 (max_attempts 번까지), 그 뒤에는 failed 로 남김
+- key: 같은 키의 작업이 이미 있으면 새로 넣지 않음 (unique 제약). 재시도/중복 신호로 같은 일이 두 번 들어가지 않게
+- 주기 작업: @task(every=86400, offset=...) → 워커들이 시간 구간마다 'periodic:<이름>:<구간>' 키로 넣으므로
+  워커가 여러 대여도 구간당 한 번만 실행됨
+- 워커가 죽어서 running 으로 남은 작업은 TASK_LEASE_SECONDS 가 지나면 다시 queued 로 돌림 → 작업은 두 번 실행돼도
+  결과가 같도록 작성
+- TASK_ALWAYS_EAGER (개발/테스트 기본값): enqueue 하는 자리에서 바로 실행
+"""
+import json
+import logging
+import os
+import random
+import signal
+import socket
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, close_old_connections, connection, transaction
+from django.db.models import Count, F, Min
+from django.utils import timezone
+from django.utils.module_loading import autodiscover_modules
+
+from . import metrics
+from .models import Task
+
+logger = logging.getLogger(__name__)
+
+REGISTRY = {}   # 이름 → TaskFunction
+
+
+class TaskFunction:
+    def __init__(self, func, name, queue, max_attempts, backoff, every, offset):
+        self.func = func
+        self.name = name
+        self.queue = queue
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.every = every
+        self.offset = offset
+        self.__doc__ = func.__doc__
+
+    def __call__(self, *args, **kwargs):
+        return self.func(*args, **kwargs)
+
+    def __repr__(self):
+        return f'<task {self.name}>'
+
+    def enqueue(self, *args, key=None, run_at=None, **kwargs):
+        """작업을 넣고 Task 행을 돌려줌. 같은 key 가 이미 있으면 그 행 (eager 모드에서는 바로 실행하고 None)"""
+        # 저장했다가 꺼낼 때와 같은 값이 되도록 JSON 으로 한 번 거침 (직렬화 안 되는 인자는 여기서 바로 오류)
+        args, kwargs = json.loads(json.dumps([list(args), kwargs]))
+        if settings.TASK_ALWAYS_EAGER:
+            _run_eager(self, args, kwargs)
+            return None
+        fields = {
+            'name': self.name, 'queue': self.queue, 'args': args, 'kwargs': kwargs,
+            'run_at': run_at or timezone.now(), 'max_attempts': self.max_attempts,
+        }
+        if key is None:
+            return Task.objects.create(**fields)
+        task, _ = Task.objects.get_or_create(idempotency_key=key, defaults=fields)
+        return task
+
+    def retry_delay(self, attempts):
+        delay = min(settings.TASK_MAX_BACKOFF, self.backoff * 2 ** max(0, attempts - 1))
+        return delay * random.uniform(0.9, 1.1)  # 여러 작업이 같은 순간에 다시 몰리지 않게
+
+    def periodic_key(self, now):
+        slot = int((now.timestamp() - self.offset) // self.every)
+        return slot, f'periodic:{self.name}:{slot}'
+
+
+def task(name=None, queue='default', max_attempts=5, backoff=30, every=None, offset=0):
+    """
+    작업 등록. every(초)를 주면 주기 작업: 구간 [offset + k*every, ...) 마다 한 번 (offset 은 UTC 기준)
+    """
+    def decorator(func):
+        task_name = name or f'{func.__module__}.{func.__qualname__}'
+        wrapped = TaskFunction(func, task_name, queue, max_attempts, backoff, every, offset)
+        REGISTRY[task_name] = wrapped
+        return wrapped
+    return decorator
+
+
+def discover():
+    """설치된 앱의 tasks.py 를 모두 읽어서 작업을 등록 (워커 시작 시)"""
+    autodiscover_modules('tasks')
+    return REGISTRY
+
+
+def _run_eager(task_function, args, kwargs):
+    begin = time.perf_counter()
+    try:
+        task_function(*args, **kwargs)
+    except Exception:
+        # 워커에서 실패한 것과 같이 요청은 계속 진행 (재시도는 없음)
+        logger.exception("작업 실패 (eager): %s", task_function.name)
+        metrics.TASKS_PROCESSED.inc(task=task_function.name, result='failed')
+    else:
+        metrics.TASKS_PROCESSED.inc(task=task_function.name, result='done')
+    finally:
+        metrics.TASK_DURATION.observe(time.perf_counter() - begin, task=task_function.name)
+
+
+# ---------- 가져가기 / 결과 기록 ----------
+def claim(queues, limit, worker_name):
+    """실행할 때가 된 작업을 최대 limit 개 가져가서 running 으로 바꿈"""
+    if limit <= 0:
+        return []
+    now = timezone.now()
+    due = Task.objects.filter(status=Task.QUEUED, queue__in=queues, run_at__lte=now).order_by('run_at', 'id')
+    running = {'status': Task.RUNNING, 'locked_by': worker_name, 'locked_at': now, 'attempts': F('attempts') + 1}
+    if connection.features.has_select_for_update_skip_locked:
+        with transaction.atomic():
+            # 다른 워커가 잠근 행은 건너뛰고 다음 행을 잠금 → 워커 수가 늘어도 서로 기다리지 않음
+            tasks = list(due.select_for_update(skip_locked=True)[:limit])
+            Task.objects.filter(pk__in=[t.pk for t in tasks]).update(**running)
+    else:
+        tasks = [t for t in due[:limit] if Task.objects.filter(pk=t.pk, status=Task.QUEUED).update(**running)]
+    for t in tasks:
+        t.status, t.locked_by, t.locked_at, t.attempts = Task.RUNNING, worker_name, now, t.attempts + 1
+    return tasks
+
+
+def execute(task_row):
+    """가져간 작업 하나를 실행하고 결과(done/retry/failed)를 기록"""
+    task_function = REGISTRY.get(task_row.name)
+    begin = time.perf_counter()
+    close_old_connections()
+    try:
+        if task_function is None:
+            raise LookupError(f"등록되지 않은 작업: {task_row.name}")
+        task_function(*task_row.args, **task_row.kwargs)
+    except Exception:
+        error = traceback.format_exc()
+        retry = task_function is not None and task_row.attempts < task_row.max_attempts
+        if retry:
+            update = {'status': Task.QUEUED,
+                      'run_at': timezone.now() + timedelta(seconds=task_function.retry_delay(task_row.attempts))}
+            logger.warning("작업 실패, 다시 시도 예정 (%d/%d): %s\n%s",
+                           task_row.attempts, task_row.max_attempts, task_row.name, error)
+        else:
+            update = {'status': Task.FAILED, 'finished_at': timezone.now()}
+            logger.error("작업 실패 (더 이상 재시도 안 함): %s\n%s", task_row.name, error)
+        result = 'retry' if retry else 'failed'
+        Task.objects.filter(pk=task_row.pk).update(last_error=error[-5000:], **update)
+    else:
+        result = 'done'
+        Task.objects.filter(pk=task_row.pk).update(status=Task.DONE, finished_at=timezone.now(), last_error='')
+    finally:
+        metrics.TASK_DURATION.observe(time.perf_counter() - begin, task=task_row.name)
+        close_old_connections()
+    metrics.TASKS_PROCESSED.inc(task=task_row.name, result=result)
+    return result
+
+
+def requeue_stale(lease=None):
+    """
+    TASK_LEASE_SECONDS 넘게 running 인 작업(워커가 죽은 것)을 다시 queued 로. 다시 넣은 수를 돌려줌
+    attempts 는 가져갈 때 이미 올렸으므로, 횟수를 다 쓴 작업은 failed 로 (워커를 죽게 만드는 작업이 끝없이 돌지 않게)
+    """
+    lease = settings.TASK_LEASE_SECONDS if lease is None else lease
+    now = timezone.now()
+    stale = Task.objects.filter(status=Task.RUNNING, locked_at__lt=now - timedelta(seconds=lease))
+    failed = stale.filter(attempts__gte=F('max_attempts')).update(
+        status=Task.FAILED, locked_by='', finished_at=now,
+        last_error=f"워커가 {lease}초 안에 끝내지 못함 (시도 횟수 초과)")
+    if failed:
+        logger.error("오래 실행 중으로 남은 작업 %d개를 실패로 처리 (시도 횟수 초과)", failed)
+    return stale.update(status=Task.QUEUED, locked_by='')
+
+
+def schedule_periodic(now=None, seen=None):
+    """주기 작업 중 이번 구간 것이 아직 없으면 넣음. seen: 이미 넣은 구간을 기억해서 같은 구간에 다시 조회하지 않음"""
+    now = now or timezone.now()
+    seen = {} if seen is None else seen
+    enqueued = []
+    for task_function in REGISTRY.values():
+        if not task_function.every:
+            continue
+        slot, key = task_function.periodic_key(now)
+        if seen.get(task_function.name) == slot:
+            continue
+        try:
+            _, created = Task.objects.get_or_create(idempotency_key=key, defaults={
+                'name': task_function.name, 'queue': task_function.queue, 'max_attempts': task_function.max_attempts,
+            })
+        except IntegrityError:
+            created = False
+        seen[task_function.name] = slot
+        if created:
+            enqueued.append(task_function.name)
+    return enqueued
+
+
+def purge_finished(done_hours=None, failed_days=None):
+    """끝난 작업 행 정리 (완료는 TASK_KEEP_DONE_HOURS, 실패는 TASK_KEEP_FAILED_DAYS 동안 보관)"""
+    now = timezone.now()
+    done_hours = settings.TASK_KEEP_DONE_HOURS if done_hours is None else done_hours
+    failed_days = settings.TASK_KEEP_FAILED_DAYS if failed_days is None else failed_days
+    deleted = 0
+    for status, cutoff in ((Task.DONE, now - timedelta(hours=done_hours)), (Task.FAILED, now - timedelta(days=failed_days))):
+        while True:
+            ids = list(Task.objects.filter(status=status, finished_at__lt=cutoff).values_list('id', flat=True)[:1000])
+            if not ids:
+                break
+            deleted += Task.objects.filter(id__in=ids).delete()[0]
+    return deleted
+
+
+def queue_depths():
+    """/metrics 용: (라벨, 값) 목록 — 큐/상태별 작업 수"""
+    rows = (Task.objects.filter(status__in=[Task.QUEUED, Task.RUNNING])
+            .values('queue', 'status').annotate(count=Count('id')).order_by())
+    return [({'queue': row['queue'], 'status': row['status']}, row['count']) for row in rows]
+
+
+def oldest_due_ages():
+    """/metrics 용: 큐별로 실행할 때가 됐는데 아직 안 가져간 가장 오래된 작업의 대기 시간(초)"""
+    now = timezone.now()
+    rows = (Task.objects.filter(status=Task.QUEUED, run_at__lte=now)
+            .values('queue').annotate(oldest=Min('run_at')).order_by())
+    return [({'queue': row['queue']}, (now - row['oldest']).total_seconds()) for row in rows]
+
+
+# ---------- 워커 ----------
+class Worker:
+    """스레드 threads 개로 작업을 실행. 메인 스레드는 가져오기/주기 작업 넣기/죽은 작업 되돌리기만 함"""
+
+    def __init__(self, queues, threads=4, poll_interval=None, log=None):
+        self.queues = list(queues)
+        self.threads = threads
+        self.poll_interval = settings.TASK_POLL_INTERVAL if poll_interval is None else poll_interval
+        self.log = log or logger.info
+        self.name = f'{socket.gethostname()}:{os.getpid()}'
+        self._stop = threading.Event()
+        self._busy = 0
+        self._busy_lock = threading.Lock()
+
+    def stop(self, *args):
+        self._stop.set()
+
+    def _done(self, future):
+        with self._busy_lock:
+            self._busy -= 1
+
+    def run_once(self, executor, seen):
+        schedule_periodic(seen=seen)
+        with self._busy_lock:
+            free = self.threads - self._busy
+        tasks = claim(self.queues, free, self.name)
+        for t in tasks:
+            with self._busy_lock:
+                self._busy += 1
+            executor.submit(execute, t).add_done_callback(self._done)
+        return len(tasks)
+
+    def run(self):
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            signal.signal(sig, self.stop)
+        self.log(f"워커 시작: {self.name} queues={','.join(self.queues)} threads={self.threads}")
+        seen = {}
+        last_requeue = 0.0
+        with ThreadPoolExecutor(self.threads, thread_name_prefix='task') as executor:
+            while not self._stop.is_set():
+                try:
+                    if time.monotonic() - last_requeue > 60:
+                        if requeue_stale():
+                            self.log("오래 실행 중으로 남은 작업을 다시 대기열에 넣음")
+                        last_requeue = time.monotonic()
+                    claimed = self.run_once(executor, seen)
+                except Exception:
+                    # DB 재시작 등: 잠시 쉬고 연결을 새로 맺어서 계속
+                    logger.exception("작업 가져오기 실패")
+                    close_old_connections()
+                    claimed = 0
+                if not claimed:
+                    self._stop.wait(self.poll_interval)
+            self.log("종료 요청: 실행 중인 작업이 끝나기를 기다림")
+        self.log("워커 종료")
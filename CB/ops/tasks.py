@@ -0,0 +1,48 @@
+"""
+주기 정리 작업 (run_worker 가 시간이 되면 알아서 넣음)
+
+예전에는 AMI 의 cb-maintenance 타이머가 인스턴스마다 관리 명령을 실행했는데, 이제 워커가 구간마다 한 번만 넣으므로
+인스턴스가 몇 대든 한 번씩만 실행된다. 관리 명령(purge_notifications 등)은 수동 실행용으로 그대로 둠
+"""
+import logging
+
+from . import archive, retention, sessions, uploads
+from .taskqueue import purge_finished, task
+
+logger = logging.getLogger(__name__)
+
+DAY = 86400
+# 새벽 4시(KST) 전후 = UTC 19시. 정리 작업끼리 겹치지 않게 10분씩 띄움
+NIGHTLY = 19 * 3600
+
+
+def _report(name, result):
+    if result is None:
+        logger.info("%s: 다른 곳에서 실행 중이라 건너뜀", name)
+    else:
+        logger.info("%s: %s", name, result)
+
+
+@task(queue='maintenance', max_attempts=2, every=DAY, offset=NIGHTLY)
+def purge_notifications():
+    _report('purge_notifications', retention.run())
+
+
+@task(queue='maintenance', max_attempts=2, every=DAY, offset=NIGHTLY + 600)
+def archive_posts():
+    _report('archive_posts', archive.run())
+
+
+@task(queue='maintenance', max_attempts=2, every=DAY, offset=NIGHTLY + 1200)
+def purge_sessions():
+    _report('purge_sessions', sessions.purge_expired())
+
+
+@task(queue='maintenance', max_attempts=2, every=3600, offset=1800)
+def purge_uploads():
+    _report('purge_uploads', uploads.run())
+
+
+@task(queue='maintenance', max_attempts=1, every=3600)
+def purge_finished_tasks():
+    logger.info("끝난 작업 행 %d개 삭제", purge_finished())
@@ -0,0 +1,77 @@
+"""
+버려진 분할 업로드 정리 (python manage.py purge_uploads, 작업 큐가 한 시간마다 실행)
+
+분할 업로드(community/views.py upload_*)를 시작만 하고 끝내지 않거나, finalize 까지 하고 글을 쓰지 않으면
+UploadSession 행과 CHUNKED_UPLOAD_DIR 의 .part 파일, 첨부 저장소의 참조(refs)가 그대로 남았다.
+- CHUNKED_UPLOAD_EXPIRE_HOURS 동안 손대지 않은 업로드를 지움. finalize 된 업로드는 저장소 참조도 돌려줌
+  (마지막 참조면 파일이 지워짐)
+- 행을 지운 쪽이 참조를 가져감: 글 작성(post_create)과 겹쳐도 둘 중 한 곳에서만 처리됨
+- 행 없이 남은 오래된 .part 파일도 지움. CHUNKED_UPLOAD_DIR 이 인스턴스 로컬 디스크면 다른 인스턴스의 파일은
+  보이지 않으므로 인스턴스마다 관리 명령을 실행
+"""
+import os
+import time
+from dataclasses import dataclass
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from community.models import Post, UploadSession
+
+
+@dataclass
+class Result:
+    sessions: int = 0    # 지운 업로드 행
+    released: int = 0    # 돌려준 저장소 참조 (finalize 했지만 글에 붙지 않은 파일)
+    orphans: int = 0     # 행 없이 남은 .part 파일
+    seconds: float = 0.0
+
+
+def run(hours=None, now=None):
+    begin = time.monotonic()
+    hours = settings.CHUNKED_UPLOAD_EXPIRE_HOURS if hours is None else hours
+    cutoff = (now or timezone.now()) - timedelta(hours=hours)
+    storage = Post._meta.get_field('file').storage
+    result = Result()
+
+    stale = UploadSession.objects.filter(updated_at__lt=cutoff).values_list('pk', 'stored_name')
+    for pk, stored_name in stale.iterator():
+        deleted, _ = UploadSession.objects.filter(pk=pk, updated_at__lt=cutoff).delete()
+        if not deleted:
+            continue  # 그 사이에 글에 붙었거나 조각이 더 들어옴
+        result.sessions += 1
+        _remove(os.path.join(settings.CHUNKED_UPLOAD_DIR, f"{pk}.part"))
+        if stored_name:
+            storage.delete(stored_name)
+            result.released += 1
+
+    result.orphans = _purge_orphan_parts(cutoff.timestamp())
+    result.seconds = time.monotonic() - begin
+    return result
+
+
+def _purge_orphan_parts(before):
+    directory = settings.CHUNKED_UPLOAD_DIR
+    if not os.path.isdir(directory):
+        return 0
+    live = {f"{pk}.part" for pk in UploadSession.objects.values_list('pk', flat=True)}
+    removed = 0
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if not entry.name.endswith('.part') or entry.name in live:
+                continue
+            try:
+                if entry.stat().st_mtime < before:
+                    os.remove(entry.path)
+                    removed += 1
+            except FileNotFoundError:
+                pass
+    return removed
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
@@ -0,0 +1,12 @@
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path('live', views.live, name='healthz_live'),
+    path('ready', views.ready, name='healthz_ready'),
+    path('db', views.db_stats, name='healthz_db'),
+    path('queries', views.query_summary, name='healthz_queries'),
+    path('profiles/', views.profile_list, name='profile_list'),
+    path('profiles/<str:profile_id>/', views.profile_detail, name='profile_detail'),
+    path('profiles/<str:profile_id>/download', views.profile_download, name='profile_download'),
+]
@@ -0,0 +1,137 @@
+import hmac
+import mimetypes
+import os
+import re
+
+from django.conf import settings
+from django.contrib.auth.decorators import user_passes_test
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseForbidden, HttpResponseNotModified, JsonResponse
+from django.shortcuts import render
+from django.utils._os import safe_join
+from django.utils.cache import patch_vary_headers
+from django.utils.http import http_date
+from django.views.static import was_modified_since
+from django.views.decorators.cache import never_cache
+
+from accounts.views import is_manager
+from . import metrics, profiler, querybudget, readiness, staticstorage
+from .db import connection_stats
+
+
+# 로드밸런서 헬스체크용 (로그인 불필요)
+@never_cache
+def live(request):
+    # 프로세스가 살아서 요청을 처리할 수 있으면 항상 200
+    return JsonResponse({'status': 'ok'})
+
+
+@never_cache
+def ready(request):
+    # 준비 작업(warm-up)이 끝난 워커만 200, 아니면 503 → LB가 아직 트래픽을 보내지 않음
+    if not readiness.is_ready():
+        readiness.warm_up_in_background()
+        return JsonResponse(readiness.state(), status=503)
+    return JsonResponse(readiness.state())
+
+
+@never_cache
+@user_passes_test(is_manager)
+def db_stats(request):
+    # 이 워커 프로세스의 DB 연결 재사용 통계 (연결/재사용/ping/재연결 횟수)
+    return JsonResponse({'pid': os.getpid(), 'connections': connection_stats()})
+
+
+@never_cache
+@user_passes_test(is_manager)
+def query_summary(request):
+    # 이 워커 프로세스가 측정한 URL 이름별 쿼리 수/SQL 시간과 N+1 의심 쿼리
+    return JsonResponse({'pid': os.getpid(), 'views': querybudget.summary()}, json_dumps_params={'ensure_ascii': False})
+
+
+_HASHED = re.compile(staticstorage.HASHED_PATTERN + '$')
+
+
+def static_file(request, path):
+    # nginx 가 없을 때 STATIC_ROOT 의 파일을 nginx-static.conf 와 같은 헤더로 보냄 (STATIC_SERVE)
+    try:
+        full_path = safe_join(settings.STATIC_ROOT, path)
+    except ValueError:
+        raise Http404
+    if not os.path.isfile(full_path):
+        raise Http404
+    content_type, _ = mimetypes.guess_type(full_path)
+    send_path, encoding = full_path, None
+    if 'gzip' in request.headers.get('Accept-Encoding', '') and os.path.isfile(full_path + '.gz'):
+        send_path, encoding = full_path + '.gz', 'gzip'
+
+    stat = os.stat(send_path)
+    if not was_modified_since(request.headers.get('If-Modified-Since'), stat.st_mtime):
+        response = HttpResponseNotModified()
+    else:
+        response = FileResponse(open(send_path, 'rb'), content_type=content_type or 'application/octet-stream')
+        response['Last-Modified'] = http_date(stat.st_mtime)
+        if encoding:
+            response['Content-Encoding'] = encoding
+    response['Cache-Control'] = staticstorage.IMMUTABLE if _HASHED.search(path) else staticstorage.REVALIDATE
+    patch_vary_headers(response, ('Accept-Encoding',))
+    return response
+
+
+@never_cache
+def metrics_view(request):
+    # Prometheus 수집용. 모든 워커 프로세스의 값을 합쳐서 돌려줌
+    # 토큰이 없으면 개발(DEBUG) 환경에서만 열어 둠. 운영에서 설정을 빠뜨려도 URL/쿼리 정보가 밖으로 나가지 않게 닫힘
+    token = getattr(settings, 'METRICS_TOKEN', '')
+    if not token:
+        if not settings.DEBUG:
+            return HttpResponseForbidden("METRICS_TOKEN 이 설정되지 않았습니다.")
+    elif not hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}'):
+        return HttpResponseForbidden()
+    return HttpResponse(metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+@never_cache
+@user_passes_test(is_manager)
+def profile_list(request):
+    # 최근 프로파일 목록 + X-Profile 헤더에 넣을 토큰
+    return render(request, 'ops/profile_list.html', {
+        'profiles': profiler.list_profiles(),
+        'tokens': {mode: profiler.make_token(mode) for mode in profiler.MODES},
+        'header': profiler.HEADER,
+        'token_max_age': getattr(settings, 'PROFILER_TOKEN_MAX_AGE', 3600),
+        'sample_rate': getattr(settings, 'PROFILER_SAMPLE_RATE', 0),
+        'slow_ms': getattr(settings, 'PROFILER_SLOW_MS', 0),
+    })
+
+
+@never_cache
+@user_passes_test(is_manager)
+def profile_detail(request, profile_id):
+    meta = profiler.load(profile_id)
+    if meta is None:
+        raise Http404("프로파일이 없습니다. (오래되어 지워졌을 수 있습니다)")
+    context = {'profile': meta}
+    if meta['mode'] == 'sample':
+        stacks = profiler.parse_folded(profiler.read(profile_id, 'folded') or '')
+        context['hot_frames'] = profiler.hot_frames(stacks)
+        context['flame'], context['flame_height'] = profiler.flame_nodes(stacks)
+    else:
+        context['report'] = profiler.read(profile_id, 'txt')
+    return render(request, 'ops/profile_detail.html', context)
+
+
+@never_cache
+@user_passes_test(is_manager)
+def profile_download(request, profile_id):
+    # sample → 접힌 스택(flamegraph.pl, speedscope) / cprofile → .prof (snakeviz, python -m pstats)
+    meta = profiler.load(profile_id)
+    if meta is None:
+        raise Http404
+    ext = 'folded' if meta['mode'] == 'sample' else 'prof'
+    data = profiler.read(profile_id, ext)
+    if data is None:
+        raise Http404
+    content_type = 'text/plain; charset=utf-8' if ext == 'folded' else 'application/octet-stream'
+    response = HttpResponse(data, content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="{profile_id}.{ext}"'
+    return response
@@ -0,0 +1,147 @@
+"""
+콜드 스타트 준비 작업 (warm-up)
+
+새 인스턴스의 첫 요청들이 템플릿 컴파일, URL 패턴 컴파일, ORM 초기화, 빈 캐시 비용을 떠안지 않도록
+요청을 받기 전에 미리 실행한다. 단계별 소요 시간을 기록한다.
+
+- fork_safe 단계(템플릿, URL)는 gunicorn 마스터에서 preload 직후 한 번 실행 → 워커들이 결과를 공유
+- 나머지(DB 연결, 캐시)는 워커마다 실행 (DB 소켓은 fork 후에 열어야 함)
+"""
+import logging
+import os
+import time
+import uuid
+from dataclasses import dataclass
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE_EXTENSIONS = ('.html', '.txt', '.xml')
+
+
+@dataclass
+class StepResult:
+    name: str
+    seconds: float
+    count: int = 0
+    error: str = ''
+
+    @property
+    def ok(self):
+        return not self.error
+
+
+# ---------- 단계 ----------
+def precompile_templates():
+    """templates/ 와 각 앱의 templates/ 아래 파일을 모두 읽어서 cached loader 에 올림"""
+    from django.template import TemplateSyntaxError, engines
+    from django.template.autoreload import get_template_directories
+
+    directories = sorted(get_template_directories())
+    count = 0
+    for engine in engines.all():
+        for directory in directories:
+            for root, _, files in os.walk(directory):
+                for filename in files:
+                    if not filename.endswith(TEMPLATE_EXTENSIONS):
+                        continue
+                    name = os.path.relpath(os.path.join(root, filename), directory).replace(os.sep, '/')
+                    try:
+                        engine.get_template(name)
+                        count += 1
+                    except (TemplateSyntaxError, UnicodeDecodeError) as e:
+                        logger.warning("템플릿 컴파일 실패 (%s): %s", name, e)
+    return count
+
+
+_SAMPLE_VALUES = {
+    'IntConverter': '1',
+    'UUIDConverter': str(uuid.UUID(int=0)),
+}
+
+
+def _sample_kwargs(params, converters):
+    return {p: _SAMPLE_VALUES.get(type(converters.get(p)).__name__, 'a') for p in params}
+
+
+def resolve_urls():
+    """이름이 붙은 URL을 모두 reverse → resolve 해서 패턴 컴파일과 resolver 캐시를 채움"""
+    from django.urls import NoReverseMatch, Resolver404, get_resolver, resolve, reverse
+
+    root = get_resolver()
+    names = [(None, name, root) for name in root.reverse_dict if isinstance(name, str)]
+    for namespace, (_, sub) in root.namespace_dict.items():
+        names += [(namespace, name, sub) for name in sub.reverse_dict if isinstance(name, str)]
+
+    count = 0
+    for namespace, name, resolver in names:
+        for possibility, _, defaults, converters in resolver.reverse_dict.getlist(name):
+            _, params = possibility[0]
+            kwargs = _sample_kwargs([p for p in params if p not in defaults], converters)
+            full_name = f"{namespace}:{name}" if namespace else name
+            try:
+                resolve(reverse(full_name, kwargs=kwargs))
+                count += 1
+            except (NoReverseMatch, Resolver404):
+                pass  # 특수한 변환기를 쓰는 URL 은 건너뜀
+    return count
+
+
+def connect_databases():
+    from django.db import connections
+
+    count = 0
+    for conn in connections.all():
+        with conn.cursor() as cursor:
+            cursor.execute('SELECT 1')
+        count += 1
+    return count
+
+
+def load_reference_data():
+    """모델마다 첫 쿼리를 한 번 실행(ORM 초기화)하고, 화면마다 쓰는 부서/직급/게시판 목록을 미리 읽음"""
+    from django.apps import apps
+
+    from accounts.models import Department, Rank
+    from community.models import Board
+
+    count = 0
+    for model in apps.get_models():
+        list(model._default_manager.all()[:1])
+        count += 1
+    list(Department.objects.order_by('path'))
+    list(Rank.objects.all())
+    list(Board.objects.all())
+    return count
+
+
+def prime_acl_cache():
+    from community.models import Board
+    return Board.prime_acl_cache()
+
+
+# (이름, 함수, fork 전에 실행해도 되는지)
+STEPS = [
+    ('templates', precompile_templates, True),
+    ('urls', resolve_urls, True),
+    ('database', connect_databases, False),
+    ('reference_data', load_reference_data, False),
+    ('acl_cache', prime_acl_cache, False),
+]
+
+
+def run(fork_safe_only=False, stop_on_error=True):
+    """모든 단계를 순서대로 실행하고 StepResult 목록을 돌려줌"""
+    results = []
+    for name, step, fork_safe in STEPS:
+        if fork_safe_only and not fork_safe:
+            continue
+        begin = time.monotonic()
+        try:
+            count = step() or 0
+            results.append(StepResult(name, time.monotonic() - begin, count))
+        except Exception as e:
+            logger.exception("warm-up 단계 실패: %s", name)
+            results.append(StepResult(name, time.monotonic() - begin, error=str(e)))
+            if stop_on_error:
+                break
+    return results
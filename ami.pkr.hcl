@@ -66,29 +66,30 @@ build {
 
   provisioner "shell" {
     inline = [
-      "echo '[1/9] Updating apt packages...'",
+      "echo '[1/10] Updating apt packages...'",
       "sudo apt update -y",
       "sudo apt install -y python3 python3-venv python3-pip nginx curl unzip nfs-common pkg-config libmariadb-dev build-essential",
 
-      "echo '[2/9] Installing AWS CLI v2...'",
+      "echo '[2/10] Installing AWS CLI v2...'",
       "curl 'https://awscli.amazonaws.com/awscli-exe-linux-x86_64.zip' -o '/tmp/awscliv2.zip'",
       "unzip /tmp/awscliv2.zip -d /tmp",
       "sudo /tmp/aws/install",
 
-      "echo '[3/9] Setting up Django app directory...'",
+      "echo '[3/10] Setting up Django app directory...'",
       "sudo mkdir -p /home/ubuntu/django_work/CBt",
       "sudo aws s3 cp s3://${var.s3_bucket}/CB-deploy.zip /home/ubuntu/CB-deploy.zip",
       "cd /home/ubuntu/django_work/CB && sudo unzip /home/ubuntu/CB-deploy.zip -d .",
 
-      "echo '[4/9] Setting up Python venv & dependencies...'",
+      "echo '[4/10] Setting up Python venv & dependencies...'",
       "python3 -m venv /home/ubuntu/venv",
-      "bash -c 'source /home/ubuntu/venv/bin/activate && pip install --upgrade pip && pip install django gunicorn mysqlclient'",
+      "bash -c 'source /home/ubuntu/venv/bin/activate && pip install --upgrade pip && pip install django gunicorn mysqlclient redis'",
 
-      "echo '[5/9] Setting permissions for ubuntu user...'",
+      "echo '[5/10] Setting permissions for ubuntu user...'",
       "sudo chown -R ubuntu:ubuntu /home/ubuntu/django_work",
       "sudo chmod -R 755 /home/ubuntu/django_work",
+      "sudo -u ubuntu bash -c 'cd /home/ubuntu/django_work/CB && /home/ubuntu/venv/bin/python manage.py collectstatic --noinput'",
 
-      "echo '[6/9] Writing environment variables to /etc/environment...'",
+      "echo '[6/10] Writing environment variables to /etc/environment...'",
       "sudo tee /etc/environment > /dev/null <<EOF",
       "DB_NAME=${var.db_name}",
       "DB_USER=${var.db_user}",
@@ -96,7 +97,7 @@ build {
       "DB_HOST=${var.db_host}",
       "EOF",
 
-      "echo '[7/9] Creating Gunicorn systemd service file...'",
+      "echo '[7/10] Creating Gunicorn systemd service file...'",
       "sudo tee /etc/systemd/system/gunicorn.service > /dev/null <<EOF",
       "[Unit]",
       "Description=Gunicorn Daemon for Django",
@@ -108,14 +109,15 @@ build {
       "WorkingDirectory=/home/ubuntu/django_work/CB",
       "Environment=\"PATH=/home/ubuntu/venv/bin\"",
       "EnvironmentFile=/etc/environment",
-      "ExecStart=/home/ubuntu/venv/bin/gunicorn --workers 3 --bind 0.0.0.0:8000 CB.wsgi:application",
+      "ExecStart=/home/ubuntu/venv/bin/python manage.py serve --bind 0.0.0.0:8000",
+      "TimeoutStopSec=40",
       "Restart=always",
       "",
       "[Install]",
       "WantedBy=multi-user.target",
       "EOF",
 
-      "echo '[8/9] Creating EFS mount systemd service...'",
+      "echo '[8/10] Creating EFS mount systemd service...'",
       "sudo tee /etc/systemd/system/mount-efs.service > /dev/null <<EOF",
       "[Unit]",
       "Description=Mount EFS on startup",
@@ -131,10 +133,33 @@ build {
       "WantedBy=multi-user.target",
       "EOF",
 
-      "echo '[9/9] Enabling services...'",
+      "echo '[9/10] Creating background task worker systemd service...'",
+      "sudo tee /etc/systemd/system/cb-worker.service > /dev/null <<EOF",
+      "[Unit]",
+      "Description=Background task worker (notifications, thumbnails, nightly cleanup)",
+      "After=network-online.target mount-efs.service",
+      "",
+      "[Service]",
+      "User=ubuntu",
+      "Group=ubuntu",
+      "WorkingDirectory=/home/ubuntu/django_work/CB",
+      "Environment=\"PATH=/home/ubuntu/venv/bin\"",
+      "EnvironmentFile=/etc/environment",
+      "ExecStart=/home/ubuntu/venv/bin/python manage.py run_worker",
+      "KillSignal=SIGTERM",
+      "TimeoutStopSec=120",
+      "Restart=always",
+      "Nice=5",
+      "",
+      "[Install]",
+      "WantedBy=multi-user.target",
+      "EOF",
+
+      "echo '[10/10] Enabling services...'",
       "sudo systemctl daemon-reload",
       "sudo systemctl enable gunicorn",
       "sudo systemctl enable mount-efs",
+      "sudo systemctl enable cb-worker",
       "echo 'Build process complete!'"
     ]
   }